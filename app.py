@@ -7,16 +7,39 @@ CONFIGURACIÓN REQUERIDA (en .streamlit/secrets.toml):
     [supabase]
     url = "https://xxxx.supabase.co"
     key = "tu_anon_key_aqui"
+
+BACKEND LOCAL OPCIONAL (sin red, SQLite embebido):
+    [storage]
+    backend = "sqlite"
+    ruta    = "la_polla.db"
 """
 
 import streamlit as st
 from supabase import create_client, Client
-from datetime import datetime
-from typing import Optional, List, Dict
+from postgrest.exceptions import APIError
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Optional, List, Dict, Tuple
+import functools
+import itertools
+import logging
+import re
+import threading
 import requests
 import time
+import uuid
+import altair as alt
+import numpy as np
 import pandas as pd
 
+from avisos import BusAvisos, BusRealtime
+from backend_sqlite import ClienteSQLite
+from football_data import CacheHTTP, ClienteFootballData, fecha_utc, ventanas_alrededor
+from instrumentacion import ClienteInstrumentado, Instrumentacion
+from trabajador_liquidacion import TrabajadorLiquidacion
+
+log = logging.getLogger(__name__)
+
 # Configuración de página
 st.set_page_config(
     page_title="⚽ La Polla - Liga Española",
@@ -86,9 +109,52 @@ API_CONFIG = {
     "competition": "PD",
 }
 
-TEMPORADA = "2025-2026"
+TEMPORADA = "2025-2026"   # temporada en curso: la que muestra por defecto el selector
 PUNTOS_INICIALES = 100
 OPCIONES_APUESTA = [5, 10, 15, 20]
+TAM_LOTE_UPSERT  = 500   # filas por petición en escrituras masivas
+TAM_PAGINA       = 1000  # filas por página en lecturas largas (max-rows de PostgREST)
+BLOQUE_PUNTUACION = 50 * TAM_PAGINA   # apuestas por pasada del kernel de puntuación
+CACHE_TTL_SEG    = 30    # vigencia de las lecturas cacheadas en GestorLiga
+CACHE_MAX_ENTRADAS = 256
+LIQUIDACION = {
+    "en_app":        True,        # hilo trabajador dentro de la app (False si corre trabajador_liquidacion.py aparte)
+    "hilos":         1,
+    "tam_bloque":    TAM_PAGINA,  # apuestas por checkpoint
+    "caducidad_seg": 60,          # sin latido en este tiempo, otro trabajador puede retomar el trabajo
+    "espera_seg":    2,           # pausa entre sondeos con la cola vacía
+    "max_intentos":  5,
+    "refresco_seg":  2,           # sondeo del progreso en Administración
+}
+AVISOS = {
+    "realtime":      True,   # con el backend Supabase, difundir los avisos por Supabase Realtime
+    "canal":         "la_polla",
+    "refresco_seg":  3,      # cada cuánto mira cada sesión si llegó un aviso (sin consultar la base)
+    "ttl_cache_seg": 600,    # vigencia de la caché cuando los avisos llegan de todos los procesos
+}
+# Páginas que se vuelven a pintar solas al llegar un aviso
+PAGINAS_EN_VIVO = {"dashboard", "jornadas", "apuestas", "clasificacion"}
+INSTRUMENTACION = {"activa": False, "max_ejecuciones": 200}   # se activa también desde Administración
+CACHE_HTTP = {
+    "directorio": ".cache/football_data",
+    "max_mb":     50,
+    # TTL por endpoint (segundos); gana el primer patrón que coincide con ruta?query
+    "ttls": {
+        r"/competitions/\w+/teams$": 7 * 24 * 3600,   # plantillas: casi nunca cambian
+        r"dateFrom=":                60,               # resultados recientes (sincronización)
+        r"/matches":                 10 * 60,          # calendario de jornadas y equipos
+    },
+}
+SINCRO_MAX_PETICIONES  = 3   # peticiones a la API por sincronización (plan gratuito: 10/min)
+SINCRO_DIAS_CORRECCION = 3   # días tras un partido en los que aún se aceptan correcciones
+
+# Estado de football-data.org → estado local (el resto de estados no se sincroniza).
+# Un aplazado sale de la sincronización por fechas hasta que la API lo reprograma.
+ESTADOS_API = {
+    "FINISHED":  "finalizado", "IN_PLAY":   "en_juego", "PAUSED": "en_juego",
+    "POSTPONED": "aplazado",   "SUSPENDED": "aplazado", "CANCELLED": "aplazado",
+    "SCHEDULED": "programado", "TIMED":     "programado",
+}
 
 REGLAS = {
     "resultado":   {"label": "Resultado",          "mult": 2,  "desc": "Predice si gana local, empate o visitante.  Acierto → apuestado × 2"},
@@ -96,6 +162,18 @@ REGLAS = {
     "goles_total": {"label": "Total de Goles",     "bonus": 5, "desc": "¿Habrá 2 o menos goles (Bajo) o 3 o más (Alto)?  Acierto → apuestado + 5"},
 }
 
+# Formato válido de la predicción de cada tipo de apuesta
+PREDICCIONES = {"resultado": r"[1X2]", "marcador": r"\d{1,2}-\d{1,2}", "goles_total": r"bajo|alto"}
+
+# Columnas de un partido que viajan en los avisos de resultados
+CAMPOS_RESULTADO = ("estado", "goles_local", "goles_visitante", "fecha_hora", "actualizado_api")
+
+# Columnas de un trabajo de liquidación para consultar su estado (sin el bloque pendiente)
+COLUMNAS_TRABAJO = ("id, jornada_id, temporada, estado, fase, total, procesadas, resumen, "
+                    "trabajador, intentos, error, creado_en, latido, terminado_en")
+
+COLUMNAS_EQUIPO = ["id", "nombre", "nombre_corto", "estadio"]
+
 EQUIPOS_DEMO = [
     {"id": 81,  "nombre": "FC Barcelona",               "nombre_corto": "BAR", "estadio": "Spotify Camp Nou"},
     {"id": 86,  "nombre": "Real Madrid CF",              "nombre_corto": "RMA", "estadio": "Santiago Bernabéu"},
@@ -121,7 +199,7 @@ EQUIPOS_DEMO = [
 
 
 # =============================================================================
-# CLIENTE SUPABASE
+# CLIENTE DE DATOS (SUPABASE / SQLITE)
 # =============================================================================
 
 @st.cache_resource
@@ -131,14 +209,276 @@ def get_supabase() -> Client:
     return create_client(url, key)
 
 
+@st.cache_resource
+def get_almacen():
+    """
+    Cliente de datos según ``[storage] backend`` en secrets: ``"supabase"``
+    (por defecto) o ``"sqlite"``. Ambos exponen la misma interfaz
+    ``table()...execute()`` / ``rpc()`` que usa GestorLiga.
+    """
+    cfg = st.secrets.get("storage", {})
+    if cfg.get("backend", "supabase") == "sqlite":
+        return ClienteSQLite(cfg.get("ruta", "la_polla.db"))
+    return get_supabase()
+
+
+@st.cache_resource
+def get_avisos() -> BusAvisos:
+    """
+    Bus de avisos de cambios: Supabase Realtime con el backend Supabase (llega
+    a todos los procesos); dentro del proceso con SQLite o si Realtime no conecta.
+    """
+    cfg = st.secrets.get("storage", {})
+    if cfg.get("backend", "supabase") == "sqlite" or not AVISOS["realtime"]:
+        return BusAvisos()
+    try:
+        return BusRealtime(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"], AVISOS["canal"])
+    except Exception:
+        log.warning("Supabase Realtime no disponible: avisos solo dentro del proceso", exc_info=True)
+        return BusAvisos()
+
+
+# =============================================================================
+# CACHÉ DE LECTURAS
+# =============================================================================
+
+class CacheLecturas:
+    """
+    Caché de consultas de lectura con TTL y tamaño máximo (LRU).
+
+    Cada entrada recuerda de qué tablas depende; los métodos de escritura del
+    gestor invalidan por tabla. Los valores devueltos se comparten entre
+    llamadas, así que no deben mutarse.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL_SEG, max_entradas: int = CACHE_MAX_ENTRADAS,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.ttl          = ttl
+        self.max_entradas = max_entradas
+        self._reloj       = reloj
+        self._lock        = threading.Lock()
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.aciertos       = 0
+        self.fallos         = 0
+        self.invalidaciones = 0
+        self.parches        = 0
+
+    def obtener(self, clave: tuple, tablas: tuple, cargar: Callable[[], Any]) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > self._reloj():
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[2]
+            self.fallos += 1
+        valor = cargar()
+        with self._lock:
+            self._entradas[clave] = (self._reloj() + self.ttl, frozenset(tablas), valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def invalidar(self, *tablas: str):
+        with self._lock:
+            for clave in [c for c, (_, deps, _) in self._entradas.items() if deps.intersection(tablas)]:
+                del self._entradas[clave]
+            self.invalidaciones += 1
+
+    def parchear(self, tablas: tuple, parche: Callable[[tuple, Any], Any]):
+        """
+        Aplica ``parche(clave, valor)`` a las entradas que dependen de ``tablas``:
+        lo que devuelve sustituye al valor (con la misma caducidad) y ``None``
+        descarta la entrada. ``parche`` no debe mutar el valor recibido.
+        """
+        with self._lock:
+            for clave, (caduca, deps, valor) in list(self._entradas.items()):
+                if not deps.intersection(tablas):
+                    continue
+                nuevo = parche(clave, valor)
+                if nuevo is None:
+                    del self._entradas[clave]
+                elif nuevo is not valor:
+                    self._entradas[clave] = (caduca, deps, nuevo)
+                    self.parches += 1
+
+    def descartar(self, clave: tuple):
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas":       len(self._entradas),
+                "aciertos":       self.aciertos,
+                "fallos":         self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "parches":        self.parches,
+                "tasa_acierto":   self.aciertos / total if total else 0.0,
+            }
+
+
+def _cacheado(*tablas: str):
+    """Cachea el resultado del método en ``self.cache`` según sus argumentos."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(self, *args, **kwargs):
+            clave = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            return self.cache.obtener(clave, tablas, lambda: fn(self, *args, **kwargs))
+        return envoltura
+    return decorador
+
+
+def _invalida(*tablas: str, avisa: bool = False):
+    """
+    Invalida las lecturas de ``tablas`` tras ejecutar el método, en la caché de
+    todos los procesos (``GestorLiga._invalidar``). Con ``avisa`` el método
+    publica al terminar su propio aviso, más fino: la invalidación solo se
+    difunde si falla y, si no, se queda en ``self.cache``.
+    """
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(self, *args, **kwargs):
+            try:
+                resultado = fn(self, *args, **kwargs)
+            except BaseException:
+                self._invalidar(*tablas)
+                raise
+            if avisa:
+                self.cache.invalidar(*tablas)
+            else:
+                self._invalidar(*tablas)
+            return resultado
+        return envoltura
+    return decorador
+
+
+# =============================================================================
+# PUNTUACIÓN VECTORIZADA
+# =============================================================================
+
+COLUMNAS_PUNTUACION = ["tipo_apuesta", "prediccion", "puntos_apostados",
+                       "estado", "goles_local", "goles_visitante"]
+
+
+def _tabla_predicciones(predicciones: list) -> Dict[str, np.ndarray]:
+    """Decodifica cada predicción distinta una sola vez (hay pocas: "1", "2-1", "bajo"…)."""
+    def gol(txt: str) -> int:
+        # -2 representa un gol desconocido ("None"); -3 nunca coincide con un marcador
+        if txt == "None":
+            return -2
+        return int(txt) if txt.isascii() and txt.isdigit() and str(int(txt)) == txt else -3
+
+    marcadores = [p.split("-") if isinstance(p, str) and p.count("-") == 1 else ["", ""]
+                  for p in predicciones]
+    return {
+        "local":     np.array([p == "1" for p in predicciones], dtype=bool),
+        "empate":    np.array([p == "X" for p in predicciones], dtype=bool),
+        "visitante": np.array([p == "2" for p in predicciones], dtype=bool),
+        "sin_res":   np.array([p == "-" for p in predicciones], dtype=bool),
+        "bajo":      np.array([p == "bajo" for p in predicciones], dtype=bool),
+        "gl":        np.array([gol(a) for a, _ in marcadores], dtype=np.int64),
+        "gv":        np.array([gol(b) for _, b in marcadores], dtype=np.int64),
+    }
+
+
+def puntuar_apuestas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Puntúa un lote de apuestas unidas al resultado de su partido.
+
+    Recibe las columnas de ``COLUMNAS_PUNTUACION`` y devuelve, con el mismo
+    índice, ``acerto`` (booleano con nulos: pendiente o no evaluable),
+    ``puntos_obtenidos`` y ``puntos_netos``. Equivale fila a fila a
+    ``GestorLiga._acerto_apuesta``, ``_puntos_obtenidos`` y ``_calcular_puntos_netos``.
+    """
+    n = len(df)
+    # factorize marca los nulos con -1, que indexa la última entrada (la del nulo)
+    tipos, tipos_unicos = pd.factorize(df["tipo_apuesta"])
+    preds, preds_unicas = pd.factorize(df["prediccion"])
+    tabla = {k: v[preds] for k, v in _tabla_predicciones(list(preds_unicas) + [None]).items()}
+
+    gl = pd.to_numeric(df["goles_local"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    gv = pd.to_numeric(df["goles_visitante"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    sin_gl, sin_gv = np.isnan(gl), np.isnan(gv)
+    gl_cod = np.where(sin_gl, -2, np.nan_to_num(gl)).astype(np.int64)
+    gv_cod = np.where(sin_gv, -2, np.nan_to_num(gv)).astype(np.int64)
+    hay_resultado = ~(sin_gl | sin_gv)
+    total = gl + gv
+
+    acierto_resultado = np.where(
+        hay_resultado,
+        (tabla["local"] & (gl > gv)) | (tabla["visitante"] & (gl < gv)) | (tabla["empate"] & (gl == gv)),
+        tabla["sin_res"])
+    acierto_marcador = (tabla["gl"] == gl_cod) & (tabla["gv"] == gv_cod)
+    acierto_goles    = np.where(tabla["bajo"], total <= 2, total >= 3)
+
+    mult  = np.ones(len(tipos_unicos) + 1, dtype=np.int64)
+    bonus = np.zeros(len(tipos_unicos) + 1, dtype=np.int64)
+    for i, t in enumerate(tipos_unicos):
+        regla    = REGLAS.get(t, {})
+        mult[i]  = regla.get("mult", 1)
+        bonus[i] = regla.get("bonus", 0)
+
+    es = {t: tipos == i for i, t in enumerate(tipos_unicos)}
+    ninguno = np.zeros(n, dtype=bool)
+    acerto = np.select(
+        [es.get("resultado", ninguno), es.get("marcador", ninguno), es.get("goles_total", ninguno)],
+        [acierto_resultado, acierto_marcador, acierto_goles], False)
+    evaluable = (df["estado"] == "finalizado").fillna(False).to_numpy(dtype=bool) & (
+        es.get("resultado", ninguno) | es.get("marcador", ninguno)
+        | (es.get("goles_total", ninguno) & hay_resultado))
+    acerto &= evaluable
+
+    apostado  = df["puntos_apostados"].to_numpy(dtype=np.int64)
+    ganancia  = apostado * mult[tipos] + bonus[tipos]
+    obtenidos = np.where(acerto, ganancia, 0)
+    netos     = np.where(acerto, ganancia - apostado, np.where(evaluable, -apostado, 0))
+
+    return pd.DataFrame({
+        "acerto":           pd.arrays.BooleanArray(acerto, ~evaluable),
+        "puntos_obtenidos": obtenidos,
+        "puntos_netos":     netos,
+    }, index=df.index)
+
+
+def marco_apuestas(apuestas: List[Dict]) -> pd.DataFrame:
+    """Apuestas con su partido embebido (``ap["partidos"]``) → marco para ``puntuar_apuestas``."""
+    return pd.DataFrame({
+        "tipo_apuesta":     [a["tipo_apuesta"] for a in apuestas],
+        "prediccion":       [a["prediccion"] for a in apuestas],
+        "puntos_apostados": [a["puntos_apostados"] for a in apuestas],
+        "estado":           [a["partidos"].get("estado") for a in apuestas],
+        "goles_local":      [a["partidos"].get("goles_local") for a in apuestas],
+        "goles_visitante":  [a["partidos"].get("goles_visitante") for a in apuestas],
+    }, columns=COLUMNAS_PUNTUACION)
+
+
 # =============================================================================
 # GESTOR DE LA LIGA
 # =============================================================================
 
 class GestorLiga:
 
-    def __init__(self):
-        self.sb: Client = get_supabase()
+    def __init__(self, sb: Optional[Client] = None, api: Optional[ClienteFootballData] = None,
+                 cache: Optional[CacheLecturas] = None, instr: Optional[Instrumentacion] = None,
+                 avisos: Optional[BusAvisos] = None):
+        self.instr = instr or Instrumentacion(INSTRUMENTACION["activa"],
+                                              INSTRUMENTACION["max_ejecuciones"])
+        self.instr.propietario = self
+        self.sb: Client = ClienteInstrumentado(sb if sb is not None else get_almacen(), self.instr)
+        self.cache = cache or CacheLecturas()
+        self.api = api or ClienteFootballData(
+            API_CONFIG["key"], API_CONFIG["base_url"], API_CONFIG["competition"],
+            cache=CacheHTTP(CACHE_HTTP["directorio"], CACHE_HTTP["max_mb"] * 1024 * 1024,
+                            CACHE_HTTP["ttls"]))
+        self.instr.instrumentar_sesion(self.api.sesion)
+        self.avisos = avisos or (get_avisos() if sb is None else BusAvisos())
+        self.avisos.suscribir(self._aplicar_aviso)
 
     # ── Utilidades de lógica de partido ───────────────────────
 
@@ -197,44 +537,116 @@ class GestorLiga:
             return ap["puntos_apostados"] * regla["mult"]
         return ap["puntos_apostados"] + regla["bonus"]
 
+    # ── Consultas paginadas ────────────────────────────────────
+
+    def _paginas(self, construir: Callable[[], Any], tam: int = TAM_PAGINA,
+                 clave: str = "id") -> Iterator[List[Dict]]:
+        """
+        Recorre una consulta por páginas de ``tam`` filas ordenadas por ``clave`` (keyset).
+
+        ``construir`` devuelve la consulta sin ``order``/``limit``; cada página
+        pide las filas con ``clave`` mayor que la última vista, así que se
+        pueden modificar las ya leídas mientras se recorre. El recorrido solo
+        termina con una página vacía: si el ``max-rows`` de PostgREST es menor
+        que ``tam``, las páginas llegan recortadas pero no se pierde ninguna fila.
+        """
+        ultimo = None
+        while True:
+            consulta = construir()
+            if ultimo is not None:
+                consulta = consulta.gt(clave, ultimo)
+            filas = consulta.order(clave).limit(tam).execute().data or []
+            if not filas:
+                return
+            yield filas
+            ultimo = filas[-1][clave]
+
+    def _paginar(self, construir: Callable[[], Any], tam: int = TAM_PAGINA,
+                 clave: str = "id") -> Iterator[Dict]:
+        """Como ``_paginas``, fila a fila."""
+        for pagina in self._paginas(construir, tam, clave):
+            yield from pagina
+
     # ── Equipos ────────────────────────────────────────────────
 
+    @_cacheado("equipos")
     def listar_equipos(self) -> List[Dict]:
         resp = self.sb.table("equipos").select("*").order("nombre").execute()
         return resp.data or []
 
-    def cargar_equipos_desde_api(self) -> int:
-        """Carga equipos reales desde football-data.org."""
-        url = f"{API_CONFIG['base_url']}/competitions/{API_CONFIG['competition']}/teams"
+    def cargar_equipos_desde_api(self) -> Dict[str, Any]:
+        """Sincroniza los equipos con los de football-data.org."""
         try:
-            r = requests.get(url, headers={"X-Auth-Token": API_CONFIG["key"]}, timeout=15)
-            r.raise_for_status()
-            equipos_api = r.json().get("teams", [])
+            equipos_api = self.api.equipos()
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Error API: {e}")
 
-        self.sb.table("equipos").delete().neq("id", 0).execute()
-        for eq in equipos_api:
-            self.sb.table("equipos").upsert({
-                "id":           eq["id"],
-                "nombre":       eq["name"],
-                "nombre_corto": eq.get("tla", eq.get("shortName", "???"))[:5],
-                "estadio":      eq.get("venue", "")
-            }).execute()
-        return len(equipos_api)
+        return self.sincronizar_equipos([{
+            "id":           eq["id"],
+            "nombre":       eq["name"],
+            "nombre_corto": (eq.get("tla") or eq.get("shortName") or "???")[:5],
+            "estadio":      eq.get("venue") or "",
+        } for eq in equipos_api])
 
-    def cargar_equipos_demo(self) -> int:
-        """Carga equipos locales (sin API)."""
-        self.sb.table("equipos").delete().neq("id", 0).execute()
-        self.sb.table("equipos").insert(EQUIPOS_DEMO).execute()
-        return len(EQUIPOS_DEMO)
+    def cargar_equipos_demo(self) -> Dict[str, Any]:
+        """Sincroniza los equipos con los locales (sin API)."""
+        return self.sincronizar_equipos(EQUIPOS_DEMO)
+
+    def sincronizar_equipos(self, equipos: List[Dict], eliminar: bool = True) -> Dict[str, Any]:
+        """
+        Reconcilia la tabla ``equipos`` con ``equipos`` (filas completas por id).
+
+        Compara con la tabla actual y aplica solo las diferencias: un insert,
+        un upsert y un delete como mucho, así que repetir la carga no escribe
+        nada. Los equipos que ya no vienen y siguen referenciados por algún
+        partido no se borran (se informan en ``en_uso``).
+        """
+        deseados = {e["id"]: {c: e.get(c) for c in COLUMNAS_EQUIPO} for e in equipos}
+        resp     = self.sb.table("equipos").select(", ".join(COLUMNAS_EQUIPO)).execute()
+        actuales = {e["id"]: e for e in resp.data or []}
+
+        nuevos      = [e for eid, e in deseados.items() if eid not in actuales]
+        modificados = [e for eid, e in deseados.items()
+                       if eid in actuales and any(actuales[eid].get(c) != e[c] for c in COLUMNAS_EQUIPO)]
+        sobrantes   = [eid for eid in actuales if eid not in deseados] if eliminar else []
+        en_uso: set = set()
+        if sobrantes:
+            for col in ("equipo_local_id", "equipo_visitante_id"):
+                resp = self.sb.table("partidos").select(col).in_(col, sobrantes).execute()
+                en_uso.update(p[col] for p in resp.data or [])
+            sobrantes = [eid for eid in sobrantes if eid not in en_uso]
+
+        if nuevos:
+            self.sb.table("equipos").insert(nuevos).execute()
+        if modificados:
+            self._upsert_por_lotes("equipos", modificados, on_conflict="id")
+        if sobrantes:
+            self.sb.table("equipos").delete().in_("id", sobrantes).execute()
+        if nuevos or modificados or sobrantes:
+            self._invalidar("equipos")
+
+        detalle = ([{"id": e["id"], "nombre": e["nombre"], "cambio": "nuevo"} for e in nuevos] +
+                   [{"id": e["id"], "nombre": e["nombre"], "cambio": "actualizado"} for e in modificados] +
+                   [{"id": eid, "nombre": actuales[eid]["nombre"], "cambio": "eliminado"} for eid in sobrantes] +
+                   [{"id": eid, "nombre": actuales[eid]["nombre"], "cambio": "en uso"} for eid in sorted(en_uso)])
+        return {
+            "recibidos":    len(deseados),
+            "insertados":   len(nuevos),
+            "actualizados": len(modificados),
+            "eliminados":   len(sobrantes),
+            "sin_cambios":  len(deseados) - len(nuevos) - len(modificados),
+            "en_uso":       len(en_uso),
+            "detalle":      detalle,
+        }
 
     # ── Usuarios ───────────────────────────────────────────────
 
+    @_cacheado("usuarios")
     def listar_usuarios(self) -> List[Dict]:
-        resp = self.sb.table("usuarios").select("*").eq("activo", True).order("nombre").execute()
-        return resp.data or []
+        usuarios = list(self._paginar(lambda: self.sb.table("usuarios").select("*").eq("activo", True)))
+        return sorted(usuarios, key=lambda u: u["nombre"])
 
+    @_invalida("usuarios")
     def insertar_usuario(self, nombre: str, apellidos: str) -> Dict:
         resp = self.sb.table("usuarios").insert({
             "nombre":         nombre,
@@ -249,14 +661,27 @@ class GestorLiga:
 
     # ── Jornadas ───────────────────────────────────────────────
 
+    @_cacheado("jornadas", "partidos")
     def listar_jornadas(self, temporada: str) -> List[Dict]:
+        """Jornadas de la temporada con su número de partidos (``total_partidos``) en una consulta."""
         resp = (self.sb.table("jornadas")
-                .select("*")
+                .select("*, partidos(count)")
                 .eq("temporada", temporada)
                 .order("numero")
                 .execute())
-        return resp.data or []
-
+        jornadas = resp.data or []
+        for j in jornadas:
+            conteo = j.pop("partidos", None) or [{"count": 0}]
+            j["total_partidos"] = conteo[0]["count"]
+        return jornadas
+
+    @_cacheado("jornadas")
+    def listar_temporadas(self) -> List[str]:
+        """Temporadas con alguna jornada, de la más reciente a la más antigua."""
+        filas = self._paginar(lambda: self.sb.table("jornadas").select("id, temporada"))
+        return sorted({j["temporada"] for j in filas}, reverse=True)
+
+    @_cacheado("jornadas")
     def obtener_jornada(self, numero: int, temporada: str) -> Optional[Dict]:
         resp = (self.sb.table("jornadas")
                 .select("*")
@@ -265,12 +690,14 @@ class GestorLiga:
                 .execute())
         return resp.data[0] if resp.data else None
 
+    @_invalida("jornadas")
     def crear_jornada(self, numero: int, temporada: str) -> Dict:
         resp = self.sb.table("jornadas").insert({
             "numero": numero, "temporada": temporada, "cerrada": False
         }).execute()
         return resp.data[0]
 
+    @_cacheado("partidos")
     def total_partidos_jornada(self, jornada_id: int) -> int:
         resp = (self.sb.table("partidos")
                 .select("id", count="exact")
@@ -280,6 +707,7 @@ class GestorLiga:
 
     # ── Partidos ───────────────────────────────────────────────
 
+    @_cacheado("partidos", "equipos")
     def obtener_partidos_jornada(self, jornada_id: int) -> List[Dict]:
         resp = (self.sb.table("partidos")
                 .select("*, equipo_local:equipos!equipo_local_id(*), equipo_visitante:equipos!equipo_visitante_id(*)")
@@ -288,6 +716,7 @@ class GestorLiga:
                 .execute())
         return resp.data or []
 
+    @_invalida("partidos")
     def crear_partido(self, jornada_id: int, equipo_local_id: int,
                       equipo_visitante_id: int, fecha_hora: str) -> Dict:
         resp = self.sb.table("partidos").insert({
@@ -299,85 +728,238 @@ class GestorLiga:
         }).execute()
         return resp.data[0]
 
-    def cargar_partidos_desde_api(self, jornada_id: int) -> int:
+    def cargar_partidos_desde_api(self, jornada_id: int, matchday: Optional[int] = None) -> Dict[str, int]:
         """
-        Recorre todos los equipos cargados y recopila partidos SCHEDULED de La Liga.
-        Idéntica lógica al original, adaptada a Supabase.
+        Descarga partidos de La Liga y los inserta en la jornada indicada.
+
+        Con ``matchday`` usa el endpoint de competición (una sola petición para
+        toda la jornada). Sin él recorre en paralelo los equipos cargados y
+        recopila sus partidos SCHEDULED, respetando la cuota de la API.
+        Devuelve cuántos partidos se insertaron y cuántos se omitieron.
         """
-        equipos = self.listar_equipos()
-        if not equipos:
-            raise RuntimeError("No hay equipos cargados. Carga equipos primero.")
+        equipos = None
+        if matchday is not None:
+            try:
+                partidos_api = self.api.partidos_jornada(matchday)
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"Error API: {e}")
+        else:
+            equipos = self.listar_equipos()
+            if not equipos:
+                raise RuntimeError("No hay equipos cargados. Carga equipos primero.")
+
+            cortos = {eq["id"]: eq["nombre_corto"] for eq in equipos}
+            prog   = st.progress(0)
+            status = st.empty()
+
+            def al_avanzar(hechos: int, total: int, equipo_id: int, error: Optional[Exception]):
+                status.text(f"🔄 Consultado {cortos[equipo_id]}… ({hechos}/{total})")
+                prog.progress(hechos / total)
+                if error:
+                    st.warning(f"⚠️ {cortos[equipo_id]}: {error}")
+
+            partidos_api, _ = self.api.partidos_por_equipos(
+                cortos, status="SCHEDULED", al_avanzar=al_avanzar)
+            prog.empty()
+            status.empty()
+
+        return self._insertar_partidos(jornada_id, partidos_api, equipos)
+
+    @_invalida("partidos")
+    def _insertar_partidos(self, jornada_id: int, partidos_api: List[Dict],
+                           equipos: Optional[List[Dict]] = None) -> Dict[str, int]:
+        """
+        Inserta en bloque los partidos de la API cuyos dos equipos existen.
 
-        unicos: dict = {}
-        prog   = st.progress(0)
-        status = st.empty()
-        total  = len(equipos)
+        La existencia de equipos se comprueba contra un set en memoria y los
+        partidos ya cargados los descarta el propio upsert (``ignore_duplicates``).
+        """
+        ids_equipos = {eq["id"] for eq in (equipos if equipos is not None else self.listar_equipos())}
 
-        for i, eq in enumerate(equipos):
-            status.text(f"🔄 Consultando {eq['nombre_corto']}… ({i+1}/{total})")
-            prog.progress((i + 1) / total)
+        unicos: Dict[int, Dict] = {}
+        sin_equipos = 0
+        for p in partidos_api:
+            if p["id"] in unicos:
+                continue
+            local, visitante = p["homeTeam"]["id"], p["awayTeam"]["id"]
+            if local not in ids_equipos or visitante not in ids_equipos:
+                sin_equipos += 1
+                continue
+            unicos[p["id"]] = {
+                "id":                  p["id"],
+                "jornada_id":          jornada_id,
+                "equipo_local_id":     local,
+                "equipo_visitante_id": visitante,
+                "fecha_hora":          p["utcDate"].replace("Z", "+00:00"),
+                "estado":              "programado",
+            }
 
-            url = f"{API_CONFIG['base_url']}/teams/{eq['id']}/matches?status=SCHEDULED"
-            try:
-                r = requests.get(url, headers={"X-Auth-Token": API_CONFIG["key"]}, timeout=15)
-                r.raise_for_status()
-                for p in r.json().get("matches", []):
-                    if p.get("competition", {}).get("code") != API_CONFIG["competition"]:
-                        continue
-                    pid = p["id"]
-                    if pid not in unicos:
-                        unicos[pid] = {
-                            "id":           pid,
-                            "jornada_id":   jornada_id,
-                            "local_id":     p["homeTeam"]["id"],
-                            "visitante_id": p["awayTeam"]["id"],
-                            "fecha_hora":   p["utcDate"].replace("Z", "+00:00"),
-                        }
-            except Exception as e:
-                st.warning(f"⚠️ {eq['nombre_corto']}: {e}")
+        filas      = list(unicos.values())
+        insertados = self._upsert_por_lotes("partidos", filas, on_conflict="id", ignore_duplicates=True)
+        return {
+            "recibidos":   len(partidos_api),
+            "insertados":  len(insertados),
+            "omitidos":    len(filas) - len(insertados),
+            "sin_equipos": sin_equipos,
+        }
 
-            time.sleep(6)   # respetar límite de la API (10 req/min plan gratuito)
+    def _upsert_por_lotes(self, tabla: str, filas: List[Dict], on_conflict: str,
+                          ignore_duplicates: bool = False) -> List[Dict]:
+        """Upsert en trozos de ``TAM_LOTE_UPSERT`` filas; devuelve las filas escritas."""
+        escritas: List[Dict] = []
+        for i in range(0, len(filas), TAM_LOTE_UPSERT):
+            resp = (self.sb.table(tabla)
+                    .upsert(filas[i:i + TAM_LOTE_UPSERT], on_conflict=on_conflict,
+                            ignore_duplicates=ignore_duplicates)
+                    .execute())
+            escritas.extend(resp.data or [])
+        return escritas
+
+    def actualizar_resultado(self, partido_id: int, gl: int, gv: int):
+        filas: List[Dict] = []
+        try:
+            filas = self.sb.table("partidos").update({
+                "goles_local":     gl,
+                "goles_visitante": gv,
+                "estado":          "finalizado"
+            }).eq("id", partido_id).execute().data or []
+        finally:
+            # Sin la fila escrita (p. ej. error tras la escritura) no hay con qué parchear
+            if filas:
+                self._avisar_resultados(filas)
+            else:
+                self._invalidar("partidos")
 
-        prog.empty()
-        status.empty()
+    # ── Sincronización de resultados ───────────────────────────
 
-        # Obtener IDs ya existentes en esa jornada para no duplicar
-        resp_existentes = (self.sb.table("partidos")
-                           .select("id")
-                           .eq("jornada_id", jornada_id)
-                           .execute())
-        ids_existentes = {r["id"] for r in (resp_existentes.data or [])}
+    def sincronizar_resultados(self, temporada: str, liquidar: bool = False,
+                               ahora: Optional[datetime] = None,
+                               max_peticiones: int = SINCRO_MAX_PETICIONES) -> Dict[str, Any]:
+        """
+        Trae de la API los resultados nuevos o corregidos y los escribe en un lote.
+
+        Solo consulta las fechas con partidos pasados sin finalizar o
+        finalizados hace menos de ``SINCRO_DIAS_CORRECCION`` días, en ventanas
+        ``dateFrom``/``dateTo`` de la más reciente a la más antigua y como
+        mucho ``max_peticiones`` peticiones (las ventanas que no caben quedan
+        para la siguiente ejecución). Los partidos que la API da por aplazados
+        salen de esas ventanas; las peticiones que sobran consultan uno a uno
+        los aplazados, que vuelven a ``programado`` con su nueva fecha cuando
+        la API los reprograma. Los partidos cuyo ``lastUpdated`` no supera
+        ``actualizado_api`` se descartan sin comparar.
+
+        Con ``liquidar`` procesa las jornadas con partidos recién finalizados y,
+        si se corrigió algún resultado ya liquidado, recalcula la temporada.
+        """
+        ahora = ahora or datetime.now(timezone.utc)
+        locales = {p["id"]: p for p in self._paginar(
+            lambda: (self.sb.table("partidos")
+                     .select("*, jornadas!inner(temporada)")
+                     .eq("jornadas.temporada", temporada)))}
+
+        limite_correccion = ahora - timedelta(days=SINCRO_DIAS_CORRECCION)
+        fechas, aplazados = [], []
+        for p in locales.values():
+            fecha = fecha_utc(p["fecha_hora"])
+            if p["estado"] == "aplazado":
+                aplazados.append((fecha, p["id"]))
+            elif fecha <= ahora and (p["estado"] != "finalizado" or fecha >= limite_correccion):
+                fechas.append(fecha.date())
+        ventanas   = ventanas_alrededor(fechas)
+        consultas  = ventanas[:max_peticiones]
+        aplazados  = [pid for _, pid in sorted(aplazados, reverse=True)][:max_peticiones - len(consultas)]
+        informe: Dict[str, Any] = {
+            "peticiones":          0,
+            "ventanas":            [(d.isoformat(), h.isoformat()) for d, h in consultas],
+            "ventanas_pendientes": len(ventanas) - len(consultas),
+            "recibidos": 0, "actualizados": 0, "finalizados": 0, "corregidos": 0, "en_juego": 0,
+            "aplazados": 0, "reprogramados": 0,
+            "jornadas_afectadas": [],
+            "liquidacion": None,
+        }
 
-        insertados = 0
-        for d in unicos.values():
-            if d["id"] in ids_existentes:
+        partidos_api: Dict[int, Dict] = {}
+        try:
+            for desde, hasta in consultas:
+                for p in self.api.partidos_fechas(desde, hasta):
+                    partidos_api[p["id"]] = p
+                informe["peticiones"] += 1
+            for pid in aplazados:
+                partidos_api[pid] = self.api.partido(pid)
+                informe["peticiones"] += 1
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Error API: {e}")
+        informe["recibidos"] = len(partidos_api)
+
+        cambios: List[Dict] = []
+        jornadas_liquidar, hay_correcciones = set(), False
+        for pid, p in partidos_api.items():
+            local  = locales.get(pid)
+            estado = ESTADOS_API.get(p.get("status"))
+            if local is None or estado is None:
                 continue
-            # Verificar que ambos equipos existan en nuestra BD
-            resp_loc = self.sb.table("equipos").select("id").eq("id", d["local_id"]).execute()
-            resp_vis = self.sb.table("equipos").select("id").eq("id", d["visitante_id"]).execute()
-            if not resp_loc.data or not resp_vis.data:
+            # Solo se reprograma lo aplazado, y nada de lo ya finalizado se aplaza
+            if estado == "programado" and local["estado"] != "aplazado":
+                continue
+            if estado == "aplazado" and local["estado"] == "finalizado":
+                continue
+            marca = local.get("actualizado_api")
+            if marca and p.get("lastUpdated") and fecha_utc(p["lastUpdated"]) <= fecha_utc(marca):
+                continue
+            goles = (p.get("score") or {}).get("fullTime") or {}
+            nuevo = {"estado": estado, "goles_local": goles.get("home"), "goles_visitante": goles.get("away")}
+            if estado == "finalizado" and None in (nuevo["goles_local"], nuevo["goles_visitante"]):
+                continue
+            if p.get("utcDate") and fecha_utc(p["utcDate"]) != fecha_utc(local["fecha_hora"]):
+                nuevo["fecha_hora"] = fecha_utc(p["utcDate"]).isoformat()
+            if all(local.get(k) == v for k, v in nuevo.items()):
                 continue
-            self.sb.table("partidos").insert({
-                "id":                  d["id"],
-                "jornada_id":          d["jornada_id"],
-                "equipo_local_id":     d["local_id"],
-                "equipo_visitante_id": d["visitante_id"],
-                "fecha_hora":          d["fecha_hora"],
-                "estado":              "programado",
-            }).execute()
-            insertados += 1
 
-        return insertados
+            fila = {k: v for k, v in local.items() if k != "jornadas"}
+            fila.update(nuevo, actualizado_api=p.get("lastUpdated"))
+            cambios.append(fila)
+            if estado == "en_juego":
+                informe["en_juego"] += 1
+            elif estado in ("aplazado", "programado"):
+                informe["aplazados" if estado == "aplazado" else "reprogramados"] += 1
+            elif local["estado"] == "finalizado":
+                informe["corregidos"] += 1
+                hay_correcciones = True
+            else:
+                informe["finalizados"] += 1
+                jornadas_liquidar.add(local["jornada_id"])
 
-    def actualizar_resultado(self, partido_id: int, gl: int, gv: int):
-        self.sb.table("partidos").update({
-            "goles_local":     gl,
-            "goles_visitante": gv,
-            "estado":          "finalizado"
-        }).eq("id", partido_id).execute()
+        if cambios:
+            try:
+                self._upsert_por_lotes("partidos", cambios, on_conflict="id")
+            except Exception:
+                self._invalidar("partidos")   # lotes escritos a medias: no se parchea
+                raise
+            self._avisar_resultados(cambios)
+        informe["actualizados"]       = len(cambios)
+        informe["jornadas_afectadas"] = sorted({c["jornada_id"] for c in cambios})
+
+        if liquidar and (jornadas_liquidar or hay_correcciones):
+            informe["liquidacion"] = {
+                "jornadas": {j: self.procesar_jornada(j, temporada) for j in sorted(jornadas_liquidar)},
+                "recalculo": (self.recalcular_temporada(temporada, aplicar=True)["usuarios_corregidos"]
+                              if hay_correcciones else None),
+            }
+        return informe
 
     # ── Puntaje / Saldo ────────────────────────────────────────
 
+    def _puntaje_inicial(self, usuario_id: int, temporada: str) -> Dict:
+        return {
+            "usuario_id":         usuario_id,
+            "temporada":          temporada,
+            "puntos_totales":     PUNTOS_INICIALES,
+            "aciertos":           0,
+            "fallos":             0,
+            "partidos_apostados": 0,
+            "comprometidos":      0,
+        }
+
     def obtener_o_crear_puntaje(self, usuario_id: int, temporada: str) -> Dict:
         resp = (self.sb.table("puntajes")
                 .select("*")
@@ -386,72 +968,149 @@ class GestorLiga:
                 .execute())
         if resp.data:
             return resp.data[0]
-        resp2 = self.sb.table("puntajes").insert({
-            "usuario_id":         usuario_id,
-            "temporada":          temporada,
-            "puntos_totales":     PUNTOS_INICIALES,
-            "aciertos":           0,
-            "fallos":             0,
-            "partidos_apostados": 0
-        }).execute()
+        resp2 = self.sb.table("puntajes").insert(self._puntaje_inicial(usuario_id, temporada)).execute()
+        self._invalidar("puntajes")
         return resp2.data[0]
 
+    def saldo_usuario(self, usuario_id: int, temporada: str) -> Dict[str, int]:
+        """
+        Puntos totales, comprometidos y disponibles del usuario en la temporada.
+
+        Un solo viaje (RPC ``saldo_usuario``) que lee una fila de ``puntajes``,
+        la proyección del libro de puntos; el resultado queda en caché hasta la
+        próxima apuesta del usuario o el próximo cambio en ``puntajes``.
+        """
+        def cargar() -> Dict[str, int]:
+            resp = self.sb.rpc("saldo_usuario", {
+                "p_usuario_id":       usuario_id,
+                "p_temporada":        temporada,
+                "p_puntos_iniciales": PUNTOS_INICIALES,
+            }).execute()
+            return resp.data[0]
+        return self.cache.obtener(("saldo_usuario", usuario_id, temporada),
+                                  ("puntajes",), cargar)
+
     def puntos_comprometidos(self, usuario_id: int, temporada: str) -> int:
-        """Suma puntos_apostados de apuestas en partidos NO finalizados."""
-        resp = (self.sb.table("apuestas")
-                .select("puntos_apostados, partidos!inner(estado)")
-                .eq("usuario_id", usuario_id)
-                .is_("puntos_obtenidos", "null")
-                .execute())
-        if not resp.data:
-            return 0
-        return sum(
-            a["puntos_apostados"]
-            for a in resp.data
-            if a.get("partidos", {}).get("estado") != "finalizado"
-        )
+        """Suma puntos_apostados de las apuestas sin liquidar de la temporada."""
+        return self.saldo_usuario(usuario_id, temporada)["comprometidos"]
 
     def saldo_disponible(self, usuario_id: int, temporada: str) -> int:
-        puntaje       = self.obtener_o_crear_puntaje(usuario_id, temporada)
-        comprometidos = self.puntos_comprometidos(usuario_id, temporada)
-        return puntaje["puntos_totales"] - comprometidos
+        return self.saldo_usuario(usuario_id, temporada)["disponible"]
 
     # ── Apuestas ───────────────────────────────────────────────
 
+    @_invalida("apuestas", "puntajes")
     def hacer_apuesta(self, usuario_id: int, partido_id: int,
-                      tipo: str, prediccion: str, puntos_apostados: int) -> Dict:
-        disponible = self.saldo_disponible(usuario_id, TEMPORADA)
-        if puntos_apostados > disponible:
-            raise ValueError(f"Saldo insuficiente. Disponible: {disponible} pts")
+                      tipo: str, prediccion: str, puntos_apostados: int,
+                      clave: Optional[str] = None, temporada: str = TEMPORADA) -> Dict:
+        """
+        Coloca (o reemplaza) una apuesta con la RPC ``colocar_apuesta``: la
+        comprobación de saldo (en ``temporada``) y el upsert ocurren en una
+        sola transacción.
 
-        resp = (self.sb.table("apuestas")
-                .select("id")
-                .eq("usuario_id",   usuario_id)
-                .eq("partido_id",   partido_id)
-                .eq("tipo_apuesta", tipo)
-                .execute())
-        data = {
-            "usuario_id":       usuario_id,
-            "partido_id":       partido_id,
-            "tipo_apuesta":     tipo,
-            "prediccion":       prediccion,
-            "puntos_apostados": puntos_apostados,
-            "puntos_obtenidos": None,
-            "fecha_apuesta":    datetime.now().isoformat()
-        }
-        if resp.data:
-            r2 = self.sb.table("apuestas").update(data).eq("id", resp.data[0]["id"]).execute()
-        else:
-            r2 = self.sb.table("apuestas").insert(data).execute()
-        return r2.data[0]
+        ``clave`` identifica el envío; repetir la misma clave (doble clic,
+        reintento) devuelve la apuesta ya registrada sin aplicarla dos veces.
+        """
+        try:
+            resp = self.sb.rpc("colocar_apuesta", {
+                "p_usuario_id":       usuario_id,
+                "p_partido_id":       partido_id,
+                "p_tipo":             tipo,
+                "p_prediccion":       prediccion,
+                "p_puntos":           puntos_apostados,
+                "p_temporada":        temporada,
+                "p_clave":            clave or uuid.uuid4().hex,
+                "p_puntos_iniciales": PUNTOS_INICIALES,
+            }).execute()
+        except APIError as e:
+            if e.code == "P0001":
+                raise ValueError(e.message)
+            raise
+        return resp.data[0]
 
+    @_invalida("apuestas", "puntajes")
+    def hacer_apuestas(self, usuario_id: int, apuestas: List[Dict],
+                       clave: Optional[str] = None, temporada: str = TEMPORADA) -> List[Dict]:
+        """
+        Coloca un boleto (varias apuestas de ``partido_id``, ``tipo_apuesta``,
+        ``prediccion`` y ``puntos_apostados``) con la RPC ``colocar_apuestas``:
+        un viaje, una comprobación de saldo y un único upsert; o entra el
+        boleto entero o no entra nada. ``clave`` hace el envío idempotente.
+        """
+        if not apuestas:
+            return []
+        try:
+            resp = self.sb.rpc("colocar_apuestas", {
+                "p_usuario_id":       usuario_id,
+                "p_temporada":        temporada,
+                "p_apuestas":         [{k: a[k] for k in ("partido_id", "tipo_apuesta", "prediccion",
+                                                          "puntos_apostados")} for a in apuestas],
+                "p_clave":            clave or uuid.uuid4().hex,
+                "p_puntos_iniciales": PUNTOS_INICIALES,
+            }).execute()
+        except APIError as e:
+            if e.code == "P0001":
+                raise ValueError(e.message)
+            raise
+        return resp.data
+
+    def validar_boleto(self, usuario_id: int, jornada_id: int, boleto: List[Dict],
+                       temporada: str = TEMPORADA) -> Dict[str, Any]:
+        """
+        Valida un boleto de la jornada en una pasada, contra una sola lectura
+        del saldo y de las apuestas que ya tiene el usuario (ambas cacheadas).
+        Descarta las apuestas sin cambios y devuelve las que hay que enviar a
+        ``hacer_apuestas``, los errores por apuesta y el coste neto del boleto.
+        """
+        partidos   = {p["id"]: p for p in self.obtener_partidos_jornada(jornada_id)}
+        existentes = {(a["partido_id"], a["tipo_apuesta"]): a
+                      for a in self.apuestas_usuario_jornada(usuario_id, jornada_id)}
+        saldo      = self.saldo_usuario(usuario_id, temporada)
+
+        apuestas, errores, vistas = [], [], set()
+        sin_cambios = liberados = 0
+        for a in boleto:
+            clave  = (a["partido_id"], a["tipo_apuesta"])
+            previa = existentes.get(clave)
+            error  = None
+            if a["tipo_apuesta"] not in REGLAS:
+                error = "tipo de apuesta desconocido"
+            elif clave in vistas:
+                error = "apuesta repetida en el boleto"
+            elif a["partido_id"] not in partidos:
+                error = "el partido no es de esta jornada"
+            elif partidos[a["partido_id"]]["estado"] == "finalizado":
+                error = "el partido ya está finalizado"
+            elif not re.fullmatch(PREDICCIONES[a["tipo_apuesta"]], str(a.get("prediccion") or "")):
+                error = f"predicción no válida: {a.get('prediccion')!r}"
+            elif a.get("puntos_apostados") not in OPCIONES_APUESTA:
+                error = f"puntos no válidos (opciones: {', '.join(map(str, OPCIONES_APUESTA))})"
+            elif previa and previa.get("puntos_obtenidos") is not None:
+                error = "la apuesta ya está liquidada"
+            vistas.add(clave)
+            if error:
+                errores.append({"partido_id": a["partido_id"], "tipo_apuesta": a["tipo_apuesta"], "error": error})
+            elif previa and (previa["prediccion"], previa["puntos_apostados"]) == (a["prediccion"], a["puntos_apostados"]):
+                sin_cambios += 1
+            else:
+                apuestas.append(a)
+                liberados += previa["puntos_apostados"] if previa else 0
+
+        coste = sum(a["puntos_apostados"] for a in apuestas) - liberados
+        if coste > saldo["disponible"]:
+            errores.append({"partido_id": None, "tipo_apuesta": None,
+                            "error": f"saldo insuficiente: el boleto compromete {coste} pts "
+                                     f"y hay {saldo['disponible']} disponibles"})
+        return {"apuestas": apuestas, "errores": errores, "sin_cambios": sin_cambios,
+                "coste": coste, "disponible": saldo["disponible"]}
+
+    @_cacheado("apuestas", "partidos", "equipos")
     def apuestas_usuario_jornada(self, usuario_id: int, jornada_id: int) -> List[Dict]:
-        resp = (self.sb.table("apuestas")
-                .select("*, partidos!inner(*, equipo_local:equipos!equipo_local_id(*), equipo_visitante:equipos!equipo_visitante_id(*))")
-                .eq("usuario_id", usuario_id)
-                .eq("partidos.jornada_id", jornada_id)
-                .execute())
-        return resp.data or []
+        return list(self._paginar(
+            lambda: (self.sb.table("apuestas")
+                     .select("*, partidos!inner(*, equipo_local:equipos!equipo_local_id(*), equipo_visitante:equipos!equipo_visitante_id(*))")
+                     .eq("usuario_id", usuario_id)
+                     .eq("partidos.jornada_id", jornada_id))))
 
     def apuesta_existente(self, usuario_id: int, partido_id: int, tipo: str) -> Optional[Dict]:
         resp = (self.sb.table("apuestas")
@@ -462,57 +1121,621 @@ class GestorLiga:
                 .execute())
         return resp.data[0] if resp.data else None
 
+    # ── Dashboard ──────────────────────────────────────────────
+
+    @_cacheado("equipos", "usuarios", "jornadas", "partidos", "puntajes")
+    def resumen_dashboard(self, temporada: str, top: int = 5, recientes: int = 5) -> Dict[str, Any]:
+        """
+        Recuentos, top de la clasificación (con ``usuarios`` embebido) y últimas
+        jornadas con ``total_partidos``, en un viaje (RPC ``resumen_dashboard``).
+        """
+        resp = self.sb.rpc("resumen_dashboard", {
+            "p_temporada": temporada,
+            "p_top":       top,
+            "p_recientes": recientes,
+        }).execute()
+        return resp.data[0]
+
     # ── Clasificación ──────────────────────────────────────────
 
+    @_cacheado("puntajes", "usuarios")
     def obtener_clasificacion(self, temporada: str) -> List[Dict]:
-        resp = (self.sb.table("puntajes")
-                .select("*, usuarios(*)")
+        puntajes = list(self._paginar(
+            lambda: self.sb.table("puntajes").select("*, usuarios(*)").eq("temporada", temporada)))
+        return sorted(puntajes, key=lambda p: (-p["puntos_totales"], -p["aciertos"], p["id"]))
+
+    @_cacheado("usuarios", "puntajes")
+    def clasificacion_usuarios(self, temporada: str) -> List[Dict]:
+        """
+        Usuarios activos con su puntaje, saldo disponible, % de acierto y posición.
+
+        Una consulta (por páginas de usuarios) y sin escrituras: a quien aún no
+        tiene puntaje en la temporada se le asigna en memoria el puntaje inicial.
+        """
+        usuarios = self._paginar(
+            lambda: (self.sb.table("usuarios")
+                     .select("*, puntajes(*)")
+                     .eq("activo", True)
+                     .eq("puntajes.temporada", temporada)))
+
+        filas = []
+        for u in usuarios:
+            puntajes = u.pop("puntajes", None) or [self._puntaje_inicial(u["id"], temporada)]
+            p        = puntajes[0]
+            comprometidos = p.get("comprometidos") or 0
+            filas.append({
+                "usuario":             u,
+                "puntos_totales":      p["puntos_totales"],
+                "aciertos":            p["aciertos"],
+                "fallos":              p["fallos"],
+                "partidos_apostados":  p["partidos_apostados"],
+                "comprometidos":       comprometidos,
+                "disponible":          p["puntos_totales"] - comprometidos,
+                "porcentaje_aciertos": (p["aciertos"] / p["partidos_apostados"] * 100
+                                        if p["partidos_apostados"] else 0.0),
+            })
+
+        filas.sort(key=lambda f: (-f["puntos_totales"], -f["aciertos"], f["usuario"]["nombre"]))
+        self._asignar_posiciones(filas)
+        return filas
+
+    @staticmethod
+    def _asignar_posiciones(filas: List[Dict]):
+        """Añade ``posicion`` a filas ya ordenadas; empatan quienes igualan puntos y aciertos."""
+        for i, f in enumerate(filas):
+            empate = i and (f["puntos_totales"], f["aciertos"]) == \
+                (filas[i - 1]["puntos_totales"], filas[i - 1]["aciertos"])
+            f["posicion"] = filas[i - 1]["posicion"] if empate else i + 1
+
+    # ── Histórico de clasificación ─────────────────────────────
+
+    def _guardar_clasificacion_jornada(self, jornada_id: int, temporada: str):
+        """
+        Foto de la clasificación tras liquidar la jornada: una fila por usuario
+        con puntaje en la temporada (puntos, posición, aciertos, fallos y
+        ``delta``, los puntos ganados en la jornada según el libro). Si la
+        jornada se vuelve a liquidar, la foto se reescribe entera.
+        """
+        filas = list(self._paginar(
+            lambda: (self.sb.table("puntajes")
+                     .select("id, usuario_id, puntos_totales, aciertos, fallos")
+                     .eq("temporada", temporada))))
+        deltas = self._deltas_jornada(jornada_id)
+
+        filas.sort(key=lambda f: (-f["puntos_totales"], -f["aciertos"], f["usuario_id"]))
+        self._asignar_posiciones(filas)
+        self._upsert_por_lotes("clasificacion_jornadas", [{
+            "jornada_id":     jornada_id,
+            "temporada":      temporada,
+            "usuario_id":     f["usuario_id"],
+            "posicion":       f["posicion"],
+            "puntos_totales": f["puntos_totales"],
+            "aciertos":       f["aciertos"],
+            "fallos":         f["fallos"],
+            "delta":          deltas.get(f["usuario_id"], 0),
+        } for f in filas], on_conflict="jornada_id,usuario_id")
+
+    def _deltas_jornada(self, jornada_id: int) -> Dict[int, int]:
+        """Puntos ganados (o perdidos) por usuario en la jornada: suma de sus movimientos."""
+        deltas: Dict[int, int] = {}
+        for m in self._paginar(lambda: (self.sb.table("movimientos_puntos")
+                                        .select("id, usuario_id, puntos")
+                                        .eq("jornada_id", jornada_id)
+                                        .neq("puntos", 0))):
+            deltas[m["usuario_id"]] = deltas.get(m["usuario_id"], 0) + m["puntos"]
+        return deltas
+
+    @_cacheado("clasificacion_jornadas", "jornadas")
+    def historial_clasificacion(self, temporada: str,
+                                usuario_ids: Optional[tuple] = None) -> List[Dict]:
+        """
+        Fotos de la clasificación por jornada (de todos o de ``usuario_ids``),
+        ordenadas por usuario y número de jornada. ``movimiento`` son los puestos
+        ganados respecto a la foto anterior del usuario (``None`` en la primera).
+        """
+        def consulta():
+            q = (self.sb.table("clasificacion_jornadas")
+                 .select("*, jornadas!inner(numero)")
+                 .eq("temporada", temporada))
+            return q.in_("usuario_id", list(usuario_ids)) if usuario_ids else q
+
+        filas = []
+        for f in self._paginar(consulta):
+            f["jornada"] = f.pop("jornadas")["numero"]
+            filas.append(f)
+        filas.sort(key=lambda f: (f["usuario_id"], f["jornada"]))
+        for i, f in enumerate(filas):
+            anterior = filas[i - 1] if i and filas[i - 1]["usuario_id"] == f["usuario_id"] else None
+            f["movimiento"] = anterior["posicion"] - f["posicion"] if anterior else None
+        return filas
+
+    # ── Procesar jornada ───────────────────────────────────────
+
+    @_invalida("apuestas", "puntajes", "clasificacion_jornadas", avisa=True)
+    def procesar_jornada(self, jornada_id: int, temporada: str, por_lotes: bool = True) -> dict:
+        """
+        Liquida las apuestas pendientes de los partidos finalizados de la jornada.
+
+        En modo por lotes las apuestas se leen por páginas (keyset) y se puntúan
+        en bloques de ``BLOQUE_PUNTUACION`` (``puntuar_apuestas``). Cada bloque
+        anota un movimiento ``liquidacion`` por apuesta en el libro de puntos
+        (``registrar_movimientos``, que suma los deltas a ``puntajes``) y
+        después marca las apuestas como liquidadas: una lectura por cada
+        ``TAM_PAGINA`` apuestas y dos escrituras por cada ``TAM_LOTE_UPSERT``.
+        Los movimientos llevan la clave de su apuesta, así que liquidar la misma
+        jornada dos veces, aunque sea a la vez, no cuenta nada dos veces.
+
+        Si se liquida alguna apuesta, guarda la foto de la clasificación de la
+        jornada (``_guardar_clasificacion_jornada``).
+        """
+        if not por_lotes:
+            return self._procesar_jornada_por_fila(jornada_id, temporada)
+
+        resumen    = {"apuestas_procesadas": 0, "puntos_otorgados": 0, "puntos_perdidos": 0}
+        pendientes = self._apuestas_pendientes_jornada(jornada_id)
+        # Las apuestas de cada bloque se escriben antes de leer el siguiente: la
+        # paginación por id no vuelve sobre ellas y la memoria queda acotada
+        while apuestas := list(itertools.islice(pendientes, BLOQUE_PUNTUACION)):
+            filas_apuestas, parcial, movimientos = self._puntuar_bloque(apuestas, temporada,
+                                                                         "procesar_jornada")
+            for k in resumen:
+                resumen[k] += parcial[k]
+            self._registrar_movimientos(movimientos)
+            self._upsert_por_lotes("apuestas", filas_apuestas, on_conflict="id")
+
+        if resumen["apuestas_procesadas"]:
+            self._guardar_clasificacion_jornada(jornada_id, temporada)
+            self._avisar_liquidacion(temporada, jornada_id)
+        return resumen
+
+    def _puntuar_bloque(self, apuestas: List[Dict], temporada: str,
+                        origen: str) -> Tuple[List[Dict], Dict[str, int], List[Dict]]:
+        """
+        Puntúa un bloque de apuestas con ``puntuar_apuestas``. Devuelve las filas
+        de apuestas liquidadas (completas, para el upsert), el resumen parcial y
+        los movimientos ``liquidacion`` del libro de puntos.
+        """
+        puntos = puntuar_apuestas(marco_apuestas(apuestas))
+        filas_apuestas: List[Dict] = []
+        for ap, obtenidos in zip(apuestas, puntos["puntos_obtenidos"].tolist()):
+            fila = {k: v for k, v in ap.items() if k != "partidos"}
+            fila["puntos_obtenidos"] = obtenidos
+            filas_apuestas.append(fila)
+
+        evaluable = puntos["acerto"].notna().to_numpy()
+        acerto    = puntos["acerto"].fillna(False).to_numpy(dtype=bool)
+        netos     = puntos["puntos_netos"].to_numpy()
+        apostado  = np.array([ap["puntos_apostados"] for ap in apuestas], dtype=np.int64)
+        resumen   = {
+            "apuestas_procesadas": len(apuestas),
+            "puntos_otorgados":    int(netos[acerto].sum()),
+            "puntos_perdidos":     int(apostado[evaluable & ~acerto].sum()),
+        }
+        movimientos = [
+            self._movimiento_liquidacion(ap, temporada, neta, a if e else None, origen)
+            for ap, neta, a, e in zip(apuestas, netos.tolist(), acerto.tolist(), evaluable.tolist())
+        ]
+        return filas_apuestas, resumen, movimientos
+
+    @staticmethod
+    def _movimiento_liquidacion(ap: Dict, temporada: str, neta: int, acerto: Optional[bool],
+                                origen: str) -> Dict:
+        """Movimiento ``liquidacion`` de una apuesta; ``acerto`` nulo (no evaluable) no cuenta como jugada."""
+        return {
+            "usuario_id":         ap["usuario_id"],
+            "temporada":          temporada,
+            "tipo":               "liquidacion",
+            "apuesta_id":         ap["id"],
+            "jornada_id":         ap["partidos"]["jornada_id"],
+            "puntos":             int(neta),
+            "comprometidos":      -ap["puntos_apostados"],
+            "aciertos":           int(acerto is True),
+            "fallos":             int(acerto is False),
+            "partidos_apostados": int(acerto is not None),
+            "clave":              f"liquidacion:{ap['id']}",
+            "origen":             origen,
+        }
+
+    # ── Libro de puntos ────────────────────────────────────────
+
+    def _registrar_movimientos(self, movimientos: List[Dict]) -> int:
+        """
+        Anota movimientos en el libro (RPC ``registrar_movimientos``, en lotes de
+        ``TAM_LOTE_UPSERT``). Los de una ``clave`` ya anotada se ignoran; solo
+        los nuevos se suman a ``puntajes``. Devuelve cuántos eran nuevos.
+        """
+        nuevos = 0
+        for i in range(0, len(movimientos), TAM_LOTE_UPSERT):
+            resp = self.sb.rpc("registrar_movimientos", {
+                "p_movimientos":      movimientos[i:i + TAM_LOTE_UPSERT],
+                "p_puntos_iniciales": PUNTOS_INICIALES,
+            }).execute()
+            nuevos += len(resp.data or [])
+        return nuevos
+
+    @_cacheado("puntajes")
+    def movimientos_usuario(self, usuario_id: int, temporada: str, limite: int = 200) -> List[Dict]:
+        """Últimos ``limite`` movimientos del usuario en la temporada, del más reciente al más antiguo."""
+        resp = (self.sb.table("movimientos_puntos")
+                .select("*")
+                .eq("usuario_id", usuario_id)
                 .eq("temporada", temporada)
-                .order("puntos_totales", desc=True)
-                .order("aciertos", desc=True)
+                .order("id", desc=True)
+                .limit(limite)
                 .execute())
         return resp.data or []
 
-    # ── Procesar jornada ───────────────────────────────────────
-
-    def procesar_jornada(self, jornada_id: int, temporada: str) -> dict:
-        resumen = {"apuestas_procesadas": 0, "puntos_otorgados": 0, "puntos_perdidos": 0}
+    @_invalida("puntajes")
+    def reconstruir_puntajes(self, temporada: str) -> Dict[str, int]:
+        """
+        Rehace los puntajes de la temporada sumando el libro de puntos (RPC
+        ``reconstruir_puntajes``). Devuelve usuarios y movimientos leídos y
+        cuántos puntajes no cuadraban con el libro.
+        """
+        resp = self.sb.rpc("reconstruir_puntajes", {
+            "p_temporada":        temporada,
+            "p_puntos_iniciales": PUNTOS_INICIALES,
+        }).execute()
+        return resp.data[0]
 
-        resp = (self.sb.table("apuestas")
+    def _consulta_pendientes_jornada(self, jornada_id: int):
+        return (self.sb.table("apuestas")
                 .select("*, partidos!inner(*)")
                 .eq("partidos.jornada_id", jornada_id)
                 .eq("partidos.estado", "finalizado")
-                .is_("puntos_obtenidos", "null")
-                .execute())
-        apuestas = resp.data or []
+                .is_("puntos_obtenidos", "null"))
+
+    def _apuestas_pendientes_jornada(self, jornada_id: int) -> Iterator[Dict]:
+        return self._paginar(lambda: self._consulta_pendientes_jornada(jornada_id))
 
-        for ap in apuestas:
+    def _procesar_jornada_por_fila(self, jornada_id: int, temporada: str) -> dict:
+        """Liquidación apuesta a apuesta (~2 viajes por apuesta). Se conserva como referencia."""
+        resumen = {"apuestas_procesadas": 0, "puntos_otorgados": 0, "puntos_perdidos": 0}
+        for ap in self._apuestas_pendientes_jornada(jornada_id):
             partido       = ap["partidos"]
             neta          = self._calcular_puntos_netos(ap, partido)
+            acerto        = self._acerto_apuesta(ap, partido)
             pts_obtenidos = self._puntos_obtenidos(ap, partido)
 
+            self._registrar_movimientos([self._movimiento_liquidacion(
+                ap, temporada, neta, acerto, "procesar_jornada")])
             self.sb.table("apuestas").update({
                 "puntos_obtenidos": pts_obtenidos
             }).eq("id", ap["id"]).execute()
 
-            puntaje = self.obtener_o_crear_puntaje(ap["usuario_id"], temporada)
-            acerto  = self._acerto_apuesta(ap, partido)
-            update  = {
-                "puntos_totales":     puntaje["puntos_totales"] + neta,
-                "partidos_apostados": puntaje["partidos_apostados"] + 1,
-            }
             if acerto:
-                update["aciertos"] = puntaje["aciertos"] + 1
                 resumen["puntos_otorgados"] += neta
-            else:
-                update["fallos"] = puntaje["fallos"] + 1
+            elif acerto is False:
                 resumen["puntos_perdidos"] += ap["puntos_apostados"]
-
-            self.sb.table("puntajes").update(update).eq("id", puntaje["id"]).execute()
             resumen["apuestas_procesadas"] += 1
 
+        if resumen["apuestas_procesadas"]:
+            self._guardar_clasificacion_jornada(jornada_id, temporada)
+            self._avisar_liquidacion(temporada, jornada_id)
         return resumen
 
+    # ── Liquidación en segundo plano ───────────────────────────
+    #
+    # Un trabajo de ``trabajos_liquidacion`` liquida una jornada por bloques de
+    # ``tam_bloque`` apuestas. Cada bloque se anota primero en el trabajo
+    # (checkpoint: cursor, resumen y, en ``pendiente``, sus movimientos y las
+    # filas de apuestas) y después se escribe; al retomar se reescribe el
+    # bloque anotado. El libro ignora los movimientos ya anotados, así que un
+    # trabajo interrumpido en cualquier punto no cuenta nada dos veces. La
+    # fase ``clasificacion`` guarda la foto de la jornada, que sale del libro.
+
+    def encolar_liquidacion(self, jornada_id: int, temporada: str) -> Dict:
+        """Crea el trabajo de liquidación de la jornada, o devuelve el que ya está activo."""
+        activo = self._trabajo_activo(jornada_id)
+        if activo:
+            return activo
+        total = (self.sb.table("apuestas")
+                 .select("id, partidos!inner(jornada_id, estado)", count="exact")
+                 .eq("partidos.jornada_id", jornada_id)
+                 .eq("partidos.estado", "finalizado")
+                 .is_("puntos_obtenidos", "null")
+                 .limit(1)
+                 .execute()).count or 0
+        try:
+            resp = self.sb.table("trabajos_liquidacion").insert({
+                "jornada_id": jornada_id,
+                "temporada":  temporada,
+                "estado":     "pendiente",
+                "fase":       "apuestas",
+                "total":      total,
+                "procesadas": 0,
+                "cursor_id":  0,
+                "resumen":    {},
+                "intentos":   0,
+                "creado_en":  datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }).execute()
+        except Exception:
+            # Otro proceso lo encoló a la vez (índice único de trabajos activos)
+            activo = self._trabajo_activo(jornada_id)
+            if activo:
+                return activo
+            raise
+        return resp.data[0]
+
+    def _trabajo_activo(self, jornada_id: int) -> Optional[Dict]:
+        resp = (self.sb.table("trabajos_liquidacion")
+                .select(COLUMNAS_TRABAJO)
+                .eq("jornada_id", jornada_id)
+                .in_("estado", ["pendiente", "en_curso"])
+                .execute())
+        return resp.data[0] if resp.data else None
+
+    def trabajos_liquidacion(self, temporada: str, limite: int = 10) -> List[Dict]:
+        """Últimos trabajos de la temporada con su progreso (``porcentaje``), sin sus datos internos."""
+        resp = (self.sb.table("trabajos_liquidacion")
+                .select(COLUMNAS_TRABAJO)
+                .eq("temporada", temporada)
+                .order("id", desc=True)
+                .limit(limite)
+                .execute())
+        return [self._con_progreso(t) for t in resp.data or []]
+
+    def progreso_liquidacion(self, trabajo_id: int) -> Optional[Dict]:
+        resp = (self.sb.table("trabajos_liquidacion")
+                .select(COLUMNAS_TRABAJO)
+                .eq("id", trabajo_id)
+                .execute())
+        return self._con_progreso(resp.data[0]) if resp.data else None
+
+    @staticmethod
+    def _con_progreso(t: Dict) -> Dict:
+        if t["estado"] == "completado":
+            t["porcentaje"] = 100.0
+        else:
+            # La foto de la clasificación cuenta como el último 5 % del trabajo
+            hecho = min(t["procesadas"] / t["total"], 1.0) if t["total"] else 1.0
+            t["porcentaje"] = round(95.0 * hecho if t["fase"] == "apuestas" else 95.0, 1)
+        return t
+
+    def reclamar_liquidacion(self, trabajador: str,
+                             caducidad_seg: int = LIQUIDACION["caducidad_seg"]) -> Optional[Dict]:
+        """
+        Reclama el trabajo pendiente más antiguo, o uno en curso cuyo trabajador
+        no da señales desde hace ``caducidad_seg`` (RPC ``reclamar_liquidacion``).
+        """
+        resp = self.sb.rpc("reclamar_liquidacion", {
+            "p_trabajador":    trabajador,
+            "p_caducidad_seg": caducidad_seg,
+        }).execute()
+        return resp.data[0] if resp.data else None
+
+    def _checkpoint_liquidacion(self, trabajo: Dict, trabajador: str, **cambios) -> Dict:
+        """Actualiza el trabajo solo si ``trabajador`` aún lo tiene reclamado; renueva el latido."""
+        cambios["latido"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        resp = (self.sb.table("trabajos_liquidacion")
+                .update(cambios)
+                .eq("id", trabajo["id"])
+                .eq("trabajador", trabajador)
+                .eq("estado", "en_curso")
+                .execute())
+        if not resp.data:
+            raise RuntimeError(f"El trabajo {trabajo['id']} ya no pertenece a {trabajador}")
+        return resp.data[0]
+
+    @_invalida("apuestas", "puntajes", "clasificacion_jornadas", avisa=True)
+    def ejecutar_liquidacion(self, trabajo: Dict, trabajador: str,
+                             tam_bloque: int = LIQUIDACION["tam_bloque"]) -> Dict[str, int]:
+        """Ejecuta o retoma un trabajo reclamado por ``trabajador``; devuelve su resumen."""
+        t       = trabajo
+        resumen = {"apuestas_procesadas": 0, "puntos_otorgados": 0, "puntos_perdidos": 0,
+                   **(t.get("resumen") or {})}
+
+        if t["fase"] == "apuestas":
+            if t.get("pendiente"):
+                self._registrar_movimientos(t["pendiente"]["movimientos"])
+                self._upsert_por_lotes("apuestas", t["pendiente"]["apuestas"], on_conflict="id")
+            while apuestas := self._bloque_liquidacion(t["jornada_id"], t["cursor_id"], tam_bloque):
+                filas_apuestas, parcial, movimientos = self._puntuar_bloque(apuestas, t["temporada"],
+                                                                             f"trabajo:{t['id']}")
+                for k in resumen:
+                    resumen[k] += parcial[k]
+                t = self._checkpoint_liquidacion(
+                    t, trabajador, cursor_id=apuestas[-1]["id"],
+                    procesadas=t["procesadas"] + len(apuestas), resumen=resumen,
+                    pendiente={"movimientos": movimientos, "apuestas": filas_apuestas})
+                self._registrar_movimientos(movimientos)
+                self._upsert_por_lotes("apuestas", filas_apuestas, on_conflict="id")
+            t = self._checkpoint_liquidacion(t, trabajador, fase="clasificacion", pendiente=None)
+
+        if resumen["apuestas_procesadas"]:
+            self._guardar_clasificacion_jornada(t["jornada_id"], t["temporada"])
+        self._checkpoint_liquidacion(t, trabajador, estado="completado", error=None,
+                                     terminado_en=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        if resumen["apuestas_procesadas"]:
+            self._avisar_liquidacion(t["temporada"], t["jornada_id"])
+        return resumen
+
+    def _bloque_liquidacion(self, jornada_id: int, cursor_id: int, tam: int) -> List[Dict]:
+        """Siguientes ``tam`` apuestas pendientes de la jornada con id mayor que ``cursor_id``."""
+        resp = (self._consulta_pendientes_jornada(jornada_id)
+                .gt("id", cursor_id)
+                .order("id")
+                .limit(tam)
+                .execute())
+        return resp.data or []
+
+    def liberar_liquidacion(self, trabajo: Dict, trabajador: str, error: str,
+                            max_intentos: int = LIQUIDACION["max_intentos"]) -> str:
+        """
+        Devuelve a la cola un trabajo que falló, o lo da por ``fallido`` tras
+        ``max_intentos``. Devuelve el estado en que queda.
+        """
+        estado = "fallido" if trabajo.get("intentos", 0) >= max_intentos else "pendiente"
+        try:
+            self._checkpoint_liquidacion(trabajo, trabajador, estado=estado, error=error[:500])
+        except RuntimeError:
+            return "en_curso"   # otro trabajador ya lo había retomado
+        return estado
+
+    # ── Avisos ─────────────────────────────────────────────────
+    #
+    # Toda escritura publica un aviso en ``self.avisos``; el gestor de cada
+    # proceso lo recibe en ``_aplicar_aviso``. Resultados y liquidaciones
+    # parchean la caché en lugar de vaciarla: los resultados se copian en las
+    # filas cacheadas de esos partidos y una liquidación solo descarta las
+    # lecturas de su temporada (y de su jornada). El resto de escrituras
+    # difunde una invalidación por tablas (``_invalidar``).
+
+    def _invalidar(self, *tablas: str):
+        self.avisos.publicar({"tipo": "invalidacion", "tablas": list(tablas), "refrescar": False})
+
+    def _avisar_resultados(self, partidos: List[Dict]):
+        if partidos:
+            self.avisos.publicar({"tipo": "resultados", "partidos": [
+                {k: p[k] for k in ("id", "jornada_id", *CAMPOS_RESULTADO) if k in p} for p in partidos]})
+
+    def _avisar_liquidacion(self, temporada: str, jornada_id: Optional[int] = None):
+        self.avisos.publicar({"tipo": "liquidacion", "temporada": temporada, "jornada_id": jornada_id})
+
+    def _aplicar_aviso(self, aviso: Dict):
+        if aviso["tipo"] == "invalidacion":
+            self.cache.invalidar(*aviso["tablas"])
+        elif aviso["tipo"] == "resultados":
+            cambios = {p["id"]: {k: v for k, v in p.items() if k in CAMPOS_RESULTADO} for p in aviso["partidos"]}
+            self.cache.parchear(("partidos",), lambda clave, valor: self._con_resultados(clave, valor, cambios))
+        elif aviso["tipo"] == "liquidacion":
+            self.cache.parchear(("apuestas", "puntajes", "clasificacion_jornadas"),
+                                lambda clave, valor: None if self._afectada_por_liquidacion(clave, aviso) else valor)
+
+    @staticmethod
+    def _con_resultados(clave: tuple, valor: Any, cambios: Dict[int, Dict]) -> Any:
+        """Lectura cacheada ``valor`` con los resultados de ``cambios``; ``None`` si no se sabe parchear."""
+        metodo = clave[0]
+        if metodo in ("listar_jornadas", "total_partidos_jornada", "resumen_dashboard"):
+            return valor   # no muestran resultados
+        if metodo == "obtener_partidos_jornada":
+            if not any(p["id"] in cambios for p in valor):
+                return valor
+            return [{**p, **cambios[p["id"]]} if p["id"] in cambios else p for p in valor]
+        if metodo == "apuestas_usuario_jornada":
+            if not any(a["partido_id"] in cambios for a in valor):
+                return valor
+            return [{**a, "partidos": {**a["partidos"], **cambios[a["partido_id"]]}}
+                    if a["partido_id"] in cambios else a for a in valor]
+        return None
+
+    @staticmethod
+    def _afectada_por_liquidacion(clave: tuple, aviso: Dict) -> bool:
+        metodo = clave[0]
+        if metodo == "saldo_usuario":
+            return clave[2] == aviso["temporada"]
+        if metodo == "apuestas_usuario_jornada":
+            return aviso["jornada_id"] is None or clave[1][1] == aviso["jornada_id"]
+        if metodo in ("resumen_dashboard", "obtener_clasificacion", "clasificacion_usuarios",
+                      "historial_clasificacion", "movimientos_usuario"):
+            return aviso["temporada"] in (*clave[1], *dict(clave[2]).values())
+        return True
+
+    # ── Recalcular temporada ───────────────────────────────────
+
+    def recalcular_temporada(self, temporada: str, aplicar: bool = False) -> Dict[str, Any]:
+        """
+        Audita los puntajes de la temporada contra las apuestas liquidadas.
+
+        Vuelve a puntuar cada apuesta liquidada contra el resultado actual de su
+        partido (por si se corrigió tras ``procesar_jornada``) y recalcula por
+        usuario ``puntos_totales``, ``aciertos``, ``fallos`` y ``partidos_apostados``
+        en una sola pasada por páginas. Devuelve las diferencias con lo guardado;
+        con ``aplicar`` corrige en lote las apuestas que cambian y anota un
+        movimiento ``ajuste`` por usuario en el libro de puntos.
+        """
+        campos   = ["puntos_totales", "aciertos", "fallos", "partidos_apostados"]
+        partidos = pd.DataFrame(list(self._paginar(
+            lambda: (self.sb.table("partidos")
+                     .select("id, estado, goles_local, goles_visitante, jornadas!inner(temporada)")
+                     .eq("jornadas.temporada", temporada)))),
+            columns=["id", "estado", "goles_local", "goles_visitante"]).set_index("id")
+
+        apuestas_corregidas: List[Dict] = []
+        parciales: List[pd.DataFrame] = []
+        revisadas = 0
+        if not partidos.empty:
+            # Filas planas (sin embeber el partido) y liquidadas: puntos_obtenidos no nulo
+            filas = self._paginar(lambda: (self.sb.table("apuestas")
+                                           .select("id, usuario_id, partido_id, tipo_apuesta, prediccion, "
+                                                   "puntos_apostados, puntos_obtenidos")
+                                           .in_("partido_id", partidos.index.tolist())
+                                           .gte("puntos_obtenidos", 0)))
+            # Se puntúa en bloques de varias páginas: el coste fijo del kernel se amortiza
+            while lote := list(itertools.islice(filas, BLOQUE_PUNTUACION)):
+                parciales.append(self._puntuar_liquidadas(lote, partidos, apuestas_corregidas))
+                revisadas += len(lote)
+
+        esperados = (pd.concat(parciales).groupby(level=0).sum()
+                     if parciales else pd.DataFrame(columns=campos))
+        guardados = {p["usuario_id"]: p for p in self._paginar(
+            lambda: self.sb.table("puntajes").select("*").eq("temporada", temporada))}
+
+        diferencias: List[Dict] = []
+        ajustes: List[Dict] = []
+        usuarios = sorted(set(guardados) | set(esperados.index.tolist()))
+        for usuario_id in usuarios:
+            actual = guardados.get(usuario_id) or self._puntaje_inicial(usuario_id, temporada)
+            nuevo  = self._puntaje_inicial(usuario_id, temporada)
+            if usuario_id in esperados.index:
+                for campo, valor in esperados.loc[usuario_id].items():
+                    nuevo[campo] += int(valor)
+            if usuario_id in guardados and all(actual[c] == nuevo[c] for c in campos):
+                continue
+            diferencias.append({"usuario_id": usuario_id, "nuevo": usuario_id not in guardados,
+                                **{f"{c}_antes": actual[c] for c in campos},
+                                **{f"{c}_despues": nuevo[c] for c in campos}})
+            # La clave lleva el último movimiento visto: aplicar dos veces la
+            # misma auditoría no ajusta dos veces
+            ajustes.append({
+                "usuario_id": usuario_id,
+                "temporada":  temporada,
+                "tipo":       "ajuste",
+                **{"puntos" if c == "puntos_totales" else c: nuevo[c] - actual[c] for c in campos},
+                "clave":      f"ajuste:{temporada}:{usuario_id}:{actual.get('ultimo_movimiento_id') or 0}",
+                "origen":     "recalcular_temporada",
+            })
+
+        if aplicar and (apuestas_corregidas or ajustes):
+            try:
+                self._upsert_por_lotes("apuestas", apuestas_corregidas, on_conflict="id")
+                self._registrar_movimientos(ajustes)
+            except Exception:
+                self._invalidar("apuestas", "puntajes")
+                raise
+            self.cache.invalidar("apuestas", "puntajes")
+            self._avisar_liquidacion(temporada)
+
+        return {
+            "apuestas_revisadas":  revisadas,
+            "apuestas_corregidas": len(apuestas_corregidas),
+            "usuarios_revisados":  len(usuarios),
+            "usuarios_corregidos": len(diferencias),
+            "diferencias":         diferencias,
+            "aplicado":            bool(aplicar),
+        }
+
+    def _puntuar_liquidadas(self, apuestas: List[Dict], partidos: pd.DataFrame,
+                            corregidas: List[Dict]) -> pd.DataFrame:
+        """Puntúa un bloque de apuestas liquidadas; añade a ``corregidas`` las que cambian."""
+        marco  = pd.DataFrame(apuestas).join(partidos, on="partido_id")
+        puntos = puntuar_apuestas(marco)
+
+        # Las que ya no se pueden puntuar (partido sin finalizar o sin marcador)
+        # no se corrigen ni cuentan, igual que en procesar_jornada
+        evaluable = puntos["acerto"].notna().to_numpy()
+        acerto    = puntos["acerto"].fillna(False).to_numpy(dtype=bool)
+        cambian = np.flatnonzero(evaluable & (marco["puntos_obtenidos"].to_numpy()
+                                              != puntos["puntos_obtenidos"].to_numpy()))
+        for i in cambian.tolist():
+            corregidas.append({**apuestas[i], "puntos_obtenidos": int(puntos["puntos_obtenidos"].iat[i])})
+
+        return pd.DataFrame({
+            "puntos_totales":     puntos["puntos_netos"].to_numpy(),
+            "aciertos":           acerto.astype(np.int64),
+            "fallos":             (evaluable & ~acerto).astype(np.int64),
+            "partidos_apostados": evaluable.astype(np.int64),
+        }, index=pd.Index(marco["usuario_id"].to_numpy(), name="usuario_id")).groupby(level=0).sum()
 
 # =============================================================================
 # INICIALIZACIÓN
@@ -520,12 +1743,25 @@ class GestorLiga:
 
 @st.cache_resource
 def get_gestor():
-    g = GestorLiga()
+    # Con avisos entre procesos cada escritura de un GestorLiga parchea o invalida
+    # la caché de todos y puede vivir más; sin ellos, lo que escriban otros
+    # procesos tarda CACHE_TTL_SEG en verse
+    ttl = AVISOS["ttl_cache_seg"] if get_avisos().entre_procesos else CACHE_TTL_SEG
+    g = GestorLiga(cache=CacheLecturas(ttl=ttl))
     if not g.listar_usuarios():
         g.insertar_usuario("Demo", "Usuario")
     return g
 
 
+@st.cache_resource
+def get_trabajador_liquidacion(_gestor: GestorLiga) -> TrabajadorLiquidacion:
+    """Hilos que ejecutan la cola de liquidaciones dentro del proceso de la app."""
+    return TrabajadorLiquidacion(
+        _gestor, hilos=LIQUIDACION["hilos"], espera_seg=LIQUIDACION["espera_seg"],
+        caducidad_seg=LIQUIDACION["caducidad_seg"], tam_bloque=LIQUIDACION["tam_bloque"],
+        max_intentos=LIQUIDACION["max_intentos"]).iniciar()
+
+
 # =============================================================================
 # HELPERS UI
 # =============================================================================
@@ -553,17 +1789,15 @@ def _texto_prediccion(tipo: str, prediccion: str, partido: Dict) -> str:
 # PÁGINAS
 # =============================================================================
 
-def show_dashboard(gestor: GestorLiga):
+def show_dashboard(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("📊 Dashboard General")
-    equipos       = gestor.listar_equipos()
-    usuarios      = gestor.listar_usuarios()
-    jornadas      = gestor.listar_jornadas(TEMPORADA)
-    clasificacion = gestor.obtener_clasificacion(TEMPORADA)
+    resumen       = gestor.resumen_dashboard(temporada)
+    clasificacion = resumen["top"]
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("⚽ Equipos",  len(equipos))
-    c2.metric("👥 Usuarios", len(usuarios))
-    c3.metric("📅 Jornadas", len(jornadas))
+    c1.metric("⚽ Equipos",  resumen["equipos"])
+    c2.metric("👥 Usuarios", resumen["usuarios"])
+    c3.metric("📅 Jornadas", resumen["jornadas"])
     if clasificacion:
         lider = clasificacion[0]
         c4.metric("🏆 Líder", gestor.nombre_completo(lider["usuarios"]),
@@ -575,7 +1809,7 @@ def show_dashboard(gestor: GestorLiga):
     if clasificacion:
         st.subheader("🏆 Top 5 Clasificación")
         rows = []
-        for i, p in enumerate(clasificacion[:5], 1):
+        for i, p in enumerate(clasificacion, 1):
             rows.append({
                 "Pos":         f"#{i}",
                 "Usuario":     gestor.nombre_completo(p["usuarios"]),
@@ -590,13 +1824,13 @@ def show_dashboard(gestor: GestorLiga):
 
     st.markdown("---")
     st.subheader("📅 Jornadas Recientes")
-    if jornadas:
+    if resumen["recientes"]:
         rows = []
-        for j in jornadas[-5:]:
+        for j in resumen["recientes"]:
             rows.append({
                 "Jornada":   f"#{j['numero']}",
                 "Temporada": j["temporada"],
-                "Partidos":  gestor.total_partidos_jornada(j["id"]),
+                "Partidos":  j["total_partidos"],
                 "Estado":    "✅ Cerrada" if j["cerrada"] else "🔓 Abierta"
             })
         st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
@@ -604,7 +1838,7 @@ def show_dashboard(gestor: GestorLiga):
         st.info("📋 No hay jornadas registradas.")
 
 
-def show_equipos(gestor: GestorLiga):
+def show_equipos(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("⚽ Equipos de La Liga")
     equipos = gestor.listar_equipos()
     if not equipos:
@@ -625,21 +1859,24 @@ def show_equipos(gestor: GestorLiga):
     st.info(f"📊 Total: {len(equipos)} equipos")
 
 
-def show_usuarios(gestor: GestorLiga):
+def show_usuarios(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("👥 Usuarios Registrados")
     tab1, tab2 = st.tabs(["📋 Lista", "➕ Nuevo Usuario"])
 
     with tab1:
-        usuarios = gestor.listar_usuarios()
-        if usuarios:
+        tabla = gestor.clasificacion_usuarios(temporada)
+        if tabla:
             rows = []
-            for u in usuarios:
-                puntaje = gestor.obtener_o_crear_puntaje(u["id"], TEMPORADA)
+            for f in tabla:
+                u = f["usuario"]
                 rows.append({
+                    "Pos":             f["posicion"],
                     "ID":              u["id"],
                     "Nombre Completo": gestor.nombre_completo(u),
-                    "Saldo (pts)":     puntaje["puntos_totales"],
-                    "Fecha Registro":  u.get("fecha_registro", "")[:10],
+                    "Saldo (pts)":     f["puntos_totales"],
+                    "Disponible (pts)": f["disponible"],
+                    "% Acierto":       f"{f['porcentaje_aciertos']:.1f}%",
+                    "Fecha Registro":  (u.get("fecha_registro") or "")[:10],
                 })
             st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
         else:
@@ -654,7 +1891,7 @@ def show_usuarios(gestor: GestorLiga):
                 if nombre and apellidos:
                     try:
                         u = gestor.insertar_usuario(nombre.strip(), apellidos.strip())
-                        gestor.obtener_o_crear_puntaje(u["id"], TEMPORADA)
+                        gestor.obtener_o_crear_puntaje(u["id"], temporada)
                         st.success(f"✅ Usuario creado: {gestor.nombre_completo(u)} — Saldo inicial: {PUNTOS_INICIALES} pts")
                         st.rerun()
                     except Exception as e:
@@ -663,12 +1900,12 @@ def show_usuarios(gestor: GestorLiga):
                     st.warning("⚠️ Completa todos los campos.")
 
 
-def show_jornadas(gestor: GestorLiga):
+def show_jornadas(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("📅 Gestión de Jornadas")
     tab1, tab2, tab3 = st.tabs(["📋 Lista", "➕ Nueva", "🎮 Ver Partidos"])
 
     with tab1:
-        jornadas = gestor.listar_jornadas(TEMPORADA)
+        jornadas = gestor.listar_jornadas(temporada)
         if jornadas:
             rows = []
             for j in jornadas:
@@ -676,7 +1913,7 @@ def show_jornadas(gestor: GestorLiga):
                     "ID":        j["id"],
                     "Jornada":   f"#{j['numero']}",
                     "Temporada": j["temporada"],
-                    "Partidos":  gestor.total_partidos_jornada(j["id"]),
+                    "Partidos":  j["total_partidos"],
                     "Estado":    "✅ Cerrada" if j["cerrada"] else "🔓 Abierta"
                 })
             st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
@@ -686,21 +1923,25 @@ def show_jornadas(gestor: GestorLiga):
     with tab2:
         with st.form("nueva_jornada"):
             numero = st.number_input("Número de Jornada", min_value=1, max_value=38, value=1)
+            nueva  = st.text_input("Temporada", value=temporada,
+                                   help="Formato AAAA-AAAA; una temporada nueva aparece en el selector.")
             if st.form_submit_button("✅ Crear Jornada", use_container_width=True):
-                if gestor.obtener_jornada(numero, TEMPORADA):
-                    st.warning(f"⚠️ La jornada {numero} ya existe.")
+                if not re.fullmatch(r"\d{4}-\d{4}", nueva.strip()):
+                    st.error("❌ La temporada debe tener el formato AAAA-AAAA.")
+                elif gestor.obtener_jornada(numero, nueva.strip()):
+                    st.warning(f"⚠️ La jornada {numero} de {nueva.strip()} ya existe.")
                 else:
-                    gestor.crear_jornada(numero, TEMPORADA)
-                    st.success(f"✅ Jornada {numero} creada.")
+                    gestor.crear_jornada(numero, nueva.strip())
+                    st.success(f"✅ Jornada {numero} de {nueva.strip()} creada.")
                     st.rerun()
 
     with tab3:
-        jornadas = gestor.listar_jornadas(TEMPORADA)
+        jornadas = gestor.listar_jornadas(temporada)
         if not jornadas:
             st.warning("⚠️ No hay jornadas."); return
 
         jsel     = st.selectbox("Jornada:", jornadas,
-                                format_func=lambda j: f"Jornada {j['numero']} ({gestor.total_partidos_jornada(j['id'])} partidos)")
+                                format_func=lambda j: f"Jornada {j['numero']} ({j['total_partidos']} partidos)")
         partidos = gestor.obtener_partidos_jornada(jsel["id"])
 
         if partidos:
@@ -719,11 +1960,11 @@ def show_jornadas(gestor: GestorLiga):
             st.info("📋 No hay partidos en esta jornada.")
 
 
-def show_apuestas(gestor: GestorLiga):
+def show_apuestas(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("🎯 Hacer Apuestas")
 
     usuarios = gestor.listar_usuarios()
-    jornadas = gestor.listar_jornadas(TEMPORADA)
+    jornadas = gestor.listar_jornadas(temporada)
     if not usuarios:
         st.warning("⚠️ No hay usuarios."); return
     if not jornadas:
@@ -735,17 +1976,17 @@ def show_apuestas(gestor: GestorLiga):
                                format_func=lambda u: gestor.nombre_completo(u))
     with col2:
         jornada = st.selectbox("📅 Jornada:", jornadas,
-                               format_func=lambda j: f"Jornada {j['numero']} ({gestor.total_partidos_jornada(j['id'])} partidos)")
+                               format_func=lambda j: f"Jornada {j['numero']} ({j['total_partidos']} partidos)")
 
-    puntaje    = gestor.obtener_o_crear_puntaje(usuario["id"], TEMPORADA)
-    disponible = gestor.saldo_disponible(usuario["id"], TEMPORADA)
+    saldo      = gestor.saldo_usuario(usuario["id"], temporada)
+    disponible = saldo["disponible"]
 
     col_s1, col_s2 = st.columns(2)
     with col_s1:
         st.markdown(f"""
         <div class="saldo-box">
             <h3>💰 Saldo Total</h3>
-            <h1>{puntaje['puntos_totales']} pts</h1>
+            <h1>{saldo['puntos_totales']} pts</h1>
         </div>""", unsafe_allow_html=True)
     with col_s2:
         st.markdown(f"""
@@ -756,6 +1997,48 @@ def show_apuestas(gestor: GestorLiga):
 
     st.markdown("---")
 
+    modo = st.radio("Modo:", ["🎯 Una apuesta", "🧾 Boleto de la jornada"],
+                    horizontal=True, key="modo_apuestas")
+
+    # Los datos de la jornada se leen una vez por ejecución completa y se pasan
+    # a los fragmentos: elegir tipo, partido o predicción solo vuelve a ejecutar
+    # el fragmento, sin consultas. Guardar una apuesta relanza la página entera.
+    partidos   = gestor.obtener_partidos_jornada(jornada["id"])
+    existentes = {(a["partido_id"], a["tipo_apuesta"]): a
+                  for a in gestor.apuestas_usuario_jornada(usuario["id"], jornada["id"])}
+    if modo == "🎯 Una apuesta":
+        _formulario_apuesta(gestor, usuario, partidos, existentes, disponible, temporada)
+    else:
+        _render_boleto(gestor, usuario, jornada, partidos, existentes, temporada)
+
+    st.markdown("---")
+    _render_mis_apuestas(gestor, usuario, jornada)
+
+
+def _seleccionar(clave: str, valor: str):
+    """Callback de los botones de selección: el clic ya relanza el fragmento."""
+    st.session_state[clave] = valor
+
+
+def _clave_envio(nombre: str, contenido: Any) -> str:
+    """
+    Clave de idempotencia de un envío guardada en ``st.session_state[nombre]``:
+    se conserva mientras ``contenido`` no cambie (reintentar tras un error o un
+    doble clic no duplica) y se renueva en cuanto cambia, para que un envío
+    distinto nunca reciba la respuesta de uno anterior.
+    """
+    firma  = repr(contenido)
+    previa = st.session_state.get(nombre)
+    if previa is None or previa[0] != firma:
+        previa = st.session_state[nombre] = (firma, uuid.uuid4().hex)
+    return previa[1]
+
+
+@st.fragment
+def _formulario_apuesta(gestor: GestorLiga, usuario: Dict, partidos: List[Dict],
+                        existentes: Dict[tuple, Dict], disponible: int, temporada: str):
+    """Apuesta paso a paso. Trabaja con los datos recibidos: sus reruns no consultan nada."""
+
     # ── Paso 1: tipo de predicción ─────────────────────────────
     st.subheader("Paso 1 — Selecciona tu tipo de predicción")
     tipos_keys = list(REGLAS.keys())
@@ -773,18 +2056,16 @@ def show_apuestas(gestor: GestorLiga):
                 <h4 style="margin:0 0 6px;">{info['label']}</h4>
                 <p style="margin:0; font-size:0.82em; color:#555;">{info['desc']}</p>
             </div>""", unsafe_allow_html=True)
-            if st.button("Seleccionar", key=f"btn_tipo_{tkey}",
-                         use_container_width=True,
-                         type="primary" if activo else "secondary"):
-                st.session_state["tipo_sel"] = tkey
-                st.rerun()
+            st.button("Seleccionar", key=f"btn_tipo_{tkey}",
+                      use_container_width=True,
+                      type="primary" if activo else "secondary",
+                      on_click=_seleccionar, args=("tipo_sel", tkey))
 
     tipo_seleccionado = st.session_state["tipo_sel"]
     st.markdown("---")
 
     # ── Paso 2: partido ────────────────────────────────────────
     st.subheader("Paso 2 — Selecciona el partido")
-    partidos = gestor.obtener_partidos_jornada(jornada["id"])
     if not partidos:
         st.info("📋 No hay partidos en esta jornada."); return
 
@@ -827,7 +2108,6 @@ def show_apuestas(gestor: GestorLiga):
     opciones_filtradas = [o for o in OPCIONES_APUESTA if o <= disponible]
     if not opciones_filtradas:
         st.error("❌ No tienes puntos suficientes para apostar.")
-        _render_mis_apuestas(gestor, usuario, jornada)
         return
 
     puntos_apostados = st.pills(
@@ -852,7 +2132,7 @@ def show_apuestas(gestor: GestorLiga):
     # ── Confirmar ──────────────────────────────────────────────
     if prediccion and puntos_apostados:
         pred_texto = _texto_prediccion(tipo_seleccionado, prediccion, partido)
-        ap_prev    = gestor.apuesta_existente(usuario["id"], partido["id"], tipo_seleccionado)
+        ap_prev    = existentes.get((partido["id"], tipo_seleccionado))
         if ap_prev:
             st.info(f"ℹ️ Ya tienes una apuesta de tipo **{regla['label']}**: "
                     f"**{_texto_prediccion(tipo_seleccionado, ap_prev['prediccion'], partido)}** "
@@ -868,10 +2148,13 @@ def show_apuestas(gestor: GestorLiga):
 
         col_btn = st.columns([1, 2, 1])
         with col_btn[1]:
+            clave = _clave_envio("clave_apuesta", (usuario["id"], partido["id"], tipo_seleccionado,
+                                                   prediccion, puntos_apostados, temporada))
             if st.button("✅ Confirmar Apuesta", type="primary", use_container_width=True):
                 try:
-                    gestor.hacer_apuesta(usuario["id"], partido["id"],
-                                         tipo_seleccionado, prediccion, puntos_apostados)
+                    gestor.hacer_apuesta(usuario["id"], partido["id"], tipo_seleccionado,
+                                         prediccion, puntos_apostados, clave, temporada)
+                    st.session_state.pop("clave_apuesta", None)
                     st.success("🎉 ¡Apuesta guardada!")
                     st.balloons()
                     time.sleep(1)
@@ -881,8 +2164,85 @@ def show_apuestas(gestor: GestorLiga):
                 except Exception as e:
                     st.error(f"❌ Error: {e}")
 
-    st.markdown("---")
-    _render_mis_apuestas(gestor, usuario, jornada)
+
+# ── Boleto de la jornada ────────────────────────────────────────────────────
+
+def _vacio(valor) -> bool:
+    return valor is None or valor == "" or (isinstance(valor, float) and np.isnan(valor))
+
+
+@st.fragment
+def _render_boleto(gestor: GestorLiga, usuario: Dict, jornada: Dict, partidos: List[Dict],
+                   existentes: Dict[tuple, Dict], temporada: str):
+    """
+    Todas las predicciones de la jornada en una tabla editable: una fila por
+    partido pendiente y una columna de predicción y otra de puntos por tipo.
+    Se valida contra una sola lectura del saldo y se envía con un único viaje.
+    """
+    st.subheader("🧾 Boleto de la jornada")
+    partidos = [p for p in partidos if p["estado"] != "finalizado"]
+    if not partidos:
+        st.info("📋 No quedan partidos por jugar en esta jornada."); return
+
+    nombres, filas = {}, []
+    for p in partidos:
+        nombres[p["id"]] = f"{p['equipo_local']['nombre']} vs {p['equipo_visitante']['nombre']}"
+        fila = {"partido_id": p["id"], "Partido": nombres[p["id"]], "Fecha": p["fecha_hora"][:16]}
+        for tipo in REGLAS:
+            previa = existentes.get((p["id"], tipo))
+            fila[tipo]          = previa["prediccion"] if previa else None
+            fila[f"pts_{tipo}"] = previa["puntos_apostados"] if previa else None
+        filas.append(fila)
+
+    columnas = {
+        "partido_id":  None,
+        "resultado":   st.column_config.SelectboxColumn(REGLAS["resultado"]["label"], options=["1", "X", "2"]),
+        "marcador":    st.column_config.TextColumn(REGLAS["marcador"]["label"], validate=r"^\d{1,2}-\d{1,2}$"),
+        "goles_total": st.column_config.SelectboxColumn(REGLAS["goles_total"]["label"], options=["bajo", "alto"]),
+    }
+    for tipo in REGLAS:
+        columnas[f"pts_{tipo}"] = st.column_config.SelectboxColumn("Pts", options=OPCIONES_APUESTA)
+
+    st.caption("Rellena predicción y puntos en las apuestas que quieras hacer o cambiar. "
+               "Las casillas vacías no crean apuestas ni anulan las existentes.")
+    editado = st.data_editor(pd.DataFrame(filas), column_config=columnas, hide_index=True,
+                             disabled=["Partido", "Fecha"], use_container_width=True,
+                             key=f"boleto_{usuario['id']}_{jornada['id']}")
+
+    boleto = []
+    for fila in editado.to_dict("records"):
+        for tipo in REGLAS:
+            pred, pts = fila[tipo], fila[f"pts_{tipo}"]
+            if _vacio(pred) and _vacio(pts):
+                continue
+            boleto.append({"partido_id":       int(fila["partido_id"]),
+                           "tipo_apuesta":     tipo,
+                           "prediccion":       None if _vacio(pred) else str(pred).strip(),
+                           "puntos_apostados": None if _vacio(pts) else int(pts)})
+
+    informe = gestor.validar_boleto(usuario["id"], jornada["id"], boleto, temporada)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Apuestas a enviar", len(informe["apuestas"]), help=f"{informe['sin_cambios']} sin cambios")
+    c2.metric("Puntos netos",      f"{informe['coste']} pts")
+    c3.metric("Disponible tras el boleto", f"{informe['disponible'] - informe['coste']} pts")
+    for e in informe["errores"]:
+        donde = (f"{nombres.get(e['partido_id'], e['partido_id'])} — {REGLAS[e['tipo_apuesta']]['label']}: "
+                 if e["partido_id"] is not None and e["tipo_apuesta"] in REGLAS else "")
+        st.error(f"❌ {donde}{e['error']}")
+
+    clave = _clave_envio("clave_boleto", (usuario["id"], jornada["id"], temporada, informe["apuestas"]))
+    if st.button("✅ Confirmar boleto", type="primary", use_container_width=True,
+                 disabled=bool(informe["errores"]) or not informe["apuestas"]):
+        try:
+            gestor.hacer_apuestas(usuario["id"], informe["apuestas"], clave, temporada)
+            st.session_state.pop("clave_boleto", None)
+            st.success(f"🎉 ¡Boleto guardado! {len(informe['apuestas'])} apuestas.")
+            time.sleep(1)
+            st.rerun()
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        except Exception as e:
+            st.error(f"❌ Error: {e}")
 
 
 # ── Helpers de predicción ───────────────────────────────────────────────────
@@ -909,14 +2269,13 @@ def _render_resultado(partido: Dict) -> Optional[str]:
                 <h4 style="margin:0 0 4px; color:{color};">{titulo}</h4>
                 <p style="margin:0; font-size:0.88em; color:#555;">{subtitulo}</p>
             </div>""", unsafe_allow_html=True)
-            if st.button(
+            st.button(
                 "✓ Seleccionado" if activo else "Seleccionar",
                 key=f"btn_res_{val}",
                 use_container_width=True,
-                type="primary" if activo else "secondary"
-            ):
-                st.session_state[KEY] = val
-                st.rerun()
+                type="primary" if activo else "secondary",
+                on_click=_seleccionar, args=(KEY, val)
+            )
 
     sel = st.session_state[KEY]
     if not sel:
@@ -947,22 +2306,18 @@ def _render_goles_total(partido: Dict) -> Optional[str]:
              border-radius:12px; border:2px solid #ff9800;">
             <h4 style="margin:0; color:#e65100;">⬇️ Bajo (2 o menos goles)</h4>
         </div>""", unsafe_allow_html=True)
-        if st.button("Seleccionar Bajo", use_container_width=True,
-                     type="primary" if st.session_state["goles_total_sel"] == "bajo" else "secondary",
-                     key="btn_bajo"):
-            st.session_state["goles_total_sel"] = "bajo"
-            st.rerun()
+        st.button("Seleccionar Bajo", use_container_width=True,
+                  type="primary" if st.session_state["goles_total_sel"] == "bajo" else "secondary",
+                  key="btn_bajo", on_click=_seleccionar, args=("goles_total_sel", "bajo"))
     with col2:
         st.markdown("""
         <div style="text-align:center; padding:14px; background:#e8eaf6;
              border-radius:12px; border:2px solid #5c6bc0;">
             <h4 style="margin:0; color:#283593;">⬆️ Alto (3 o más goles)</h4>
         </div>""", unsafe_allow_html=True)
-        if st.button("Seleccionar Alto", use_container_width=True,
-                     type="primary" if st.session_state["goles_total_sel"] == "alto" else "secondary",
-                     key="btn_alto"):
-            st.session_state["goles_total_sel"] = "alto"
-            st.rerun()
+        st.button("Seleccionar Alto", use_container_width=True,
+                  type="primary" if st.session_state["goles_total_sel"] == "alto" else "secondary",
+                  key="btn_alto", on_click=_seleccionar, args=("goles_total_sel", "alto"))
 
     sel = st.session_state.get("goles_total_sel")
     if not sel:
@@ -976,12 +2331,14 @@ def _render_mis_apuestas(gestor: GestorLiga, usuario: Dict, jornada: Dict):
     if not apuestas:
         st.info("📋 Aún no has hecho apuestas en esta jornada."); return
 
+    aciertos_col = [None if pd.isna(a) else a
+                    for a in puntuar_apuestas(marco_apuestas(apuestas))["acerto"].tolist()]
+
     rows = []
-    for ap in apuestas:
+    for ap, acerto in zip(apuestas, aciertos_col):
         p        = ap["partidos"]
         pred_txt = _texto_prediccion(ap["tipo_apuesta"], ap["prediccion"], p)
         regla    = REGLAS[ap["tipo_apuesta"]]
-        acerto   = gestor._acerto_apuesta(ap, p)
 
         if p["estado"] == "finalizado" and ap.get("puntos_obtenidos") is not None:
             if acerto:
@@ -1010,10 +2367,10 @@ def _render_mis_apuestas(gestor: GestorLiga, usuario: Dict, jornada: Dict):
     st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
 
     total    = len(apuestas)
-    aciertos = sum(1 for a in apuestas if gestor._acerto_apuesta(a, a["partidos"]) is True)
-    perdidos = sum(a["puntos_apostados"] for a in apuestas if gestor._acerto_apuesta(a, a["partidos"]) is False)
+    aciertos = sum(1 for ac in aciertos_col if ac is True)
+    perdidos = sum(a["puntos_apostados"] for a, ac in zip(apuestas, aciertos_col) if ac is False)
     ganados  = sum((a.get("puntos_obtenidos") or 0) - a["puntos_apostados"]
-                   for a in apuestas if gestor._acerto_apuesta(a, a["partidos"]) is True)
+                   for a, ac in zip(apuestas, aciertos_col) if ac is True)
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total Apuestas", total)
@@ -1022,9 +2379,9 @@ def _render_mis_apuestas(gestor: GestorLiga, usuario: Dict, jornada: Dict):
     c4.metric("Pérdidas",       f"-{perdidos} pts")
 
 
-def show_clasificacion(gestor: GestorLiga):
+def show_clasificacion(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("📊 Clasificación General")
-    clasificacion = gestor.obtener_clasificacion(TEMPORADA)
+    clasificacion = gestor.obtener_clasificacion(temporada)
     if not clasificacion:
         st.info("📋 No hay datos de clasificación aún."); return
 
@@ -1060,60 +2417,131 @@ def show_clasificacion(gestor: GestorLiga):
         return ["background-color: #fff3cd"] * len(row) if row["Pos"] <= 3 else [""] * len(row)
     st.dataframe(df.style.apply(highlight_top3, axis=1), use_container_width=True, hide_index=True)
 
+    st.markdown("---")
+    st.subheader("📈 Evolución por Jornada")
+    nombres  = {p["usuario_id"]: gestor.nombre_completo(p["usuarios"]) for p in clasificacion}
+    elegidos = st.multiselect("Usuarios:", list(nombres), format_func=nombres.get,
+                              default=[p["usuario_id"] for p in clasificacion[:5]])
+    historial = gestor.historial_clasificacion(temporada, tuple(elegidos)) if elegidos else []
+    if not historial:
+        st.info("📋 Aún no hay jornadas liquidadas para estos usuarios."); return
+
+    df_hist = pd.DataFrame([{
+        "Jornada":  f["jornada"],
+        "Usuario":  nombres[f["usuario_id"]],
+        "Posición": f["posicion"],
+        "Puntos":   f["puntos_totales"],
+        "Δ Puntos": f["delta"],
+        "Δ Puestos": f["movimiento"],
+    } for f in historial])
+    grafico = alt.Chart(df_hist).mark_line(point=True).encode(
+        x=alt.X("Jornada:O"),
+        y=alt.Y("Posición:Q", scale=alt.Scale(reverse=True, zero=False)),
+        color="Usuario:N",
+        tooltip=["Usuario", "Jornada", "Posición", "Puntos", "Δ Puntos", "Δ Puestos"],
+    )
+    st.altair_chart(grafico, use_container_width=True)
 
-def show_admin(gestor: GestorLiga):
+
+def show_admin(gestor: GestorLiga, temporada: str = TEMPORADA):
     st.header("⚙️ Administración del Sistema")
-    tab1, tab2, tab3 = st.tabs(["🔄 Cargar desde API", "🎮 Actualizar Resultados", "📊 Procesar Jornada"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🔄 Cargar desde API", "🎮 Actualizar Resultados",
+                                      "📊 Procesar Jornada", "🧮 Recalcular Temporada"])
 
     # ── TAB 1: Cargar desde API ────────────────────────────────
     with tab1:
         st.subheader("Cargar Datos desde API")
 
         st.markdown("### 1️⃣ Cargar Equipos")
-        st.warning("⚠️ Esto eliminará todos los equipos y partidos existentes.")
+        st.info("💡 Solo se escriben las diferencias con la tabla actual; los equipos que "
+                "tienen partidos no se eliminan.")
+        informe = None
         col_api, col_demo = st.columns(2)
         with col_api:
             if st.button("🌐 Cargar Equipos desde API (football-data.org)",
                          type="primary", use_container_width=True):
                 with st.spinner("Cargando equipos desde la API…"):
                     try:
-                        n = gestor.cargar_equipos_desde_api()
-                        st.success(f"✅ {n} equipos cargados desde la API.")
+                        informe = gestor.cargar_equipos_desde_api()
                     except Exception as e:
                         st.error(f"❌ {e}")
         with col_demo:
             if st.button("📋 Cargar Equipos Demo (sin API)", use_container_width=True):
                 with st.spinner("Cargando equipos demo…"):
                     try:
-                        n = gestor.cargar_equipos_demo()
-                        st.success(f"✅ {n} equipos demo cargados.")
+                        informe = gestor.cargar_equipos_demo()
                     except Exception as e:
                         st.error(f"❌ {e}")
+        if informe:
+            st.success(
+                f"✅ {informe['recibidos']} equipos: {informe['insertados']} nuevos, "
+                f"{informe['actualizados']} actualizados, {informe['eliminados']} eliminados, "
+                f"{informe['sin_cambios']} sin cambios."
+            )
+            if informe["en_uso"]:
+                st.warning(f"⚠️ {informe['en_uso']} equipos ya no están en la competición "
+                           "pero tienen partidos; se conservan.")
+            if informe["detalle"]:
+                st.dataframe(pd.DataFrame(informe["detalle"]), use_container_width=True,
+                             hide_index=True)
 
         st.markdown("---")
         st.markdown("### 2️⃣ Cargar Partidos Futuros desde API")
         st.info(
-            "💡 Consulta todos los partidos SCHEDULED de La Liga para cada equipo. "
-            "Puede tardar varios minutos (6 seg de espera entre equipos por límite de la API gratuita)."
+            "💡 Por defecto descarga la jornada completa de La Liga en una sola petición. "
+            "La consulta por equipo recorre los equipos en paralelo respetando la cuota "
+            "de la API gratuita (10 peticiones/min), por lo que puede tardar más de un minuto."
         )
-        jornadas = gestor.listar_jornadas(TEMPORADA)
+        jornadas = gestor.listar_jornadas(temporada)
         if not jornadas:
             st.warning("⚠️ Crea una jornada primero en la sección Jornadas.")
         else:
             jsel = st.selectbox("Jornada destino para los partidos:", jornadas,
                                 format_func=lambda j: f"Jornada {j['numero']}")
+            por_equipo = st.checkbox("Consultar equipo por equipo (solo partidos SCHEDULED)")
             if st.button("🔄 Cargar Partidos desde API", type="primary"):
-                st.warning("⏳ Consultando la API… esto puede tardar varios minutos.")
+                if por_equipo:
+                    st.warning("⏳ Consultando la API… esto puede tardar más de un minuto.")
                 try:
-                    n = gestor.cargar_partidos_desde_api(jsel["id"])
-                    st.success(f"✅ {n} partidos nuevos cargados en Jornada {jsel['numero']}.")
+                    res = gestor.cargar_partidos_desde_api(
+                        jsel["id"], None if por_equipo else jsel["numero"])
+                    st.success(f"✅ {res['insertados']} partidos nuevos cargados en Jornada {jsel['numero']} "
+                               f"({res['omitidos']} ya existían, {res['sin_equipos']} sin equipos cargados).")
                 except Exception as e:
                     st.error(f"❌ {e}")
 
     # ── TAB 2: Actualizar Resultados ───────────────────────────
     with tab2:
+        st.subheader("Sincronizar Resultados desde la API")
+        st.info("💡 Trae solo los partidos terminados, en juego o corregidos desde la última "
+                f"sincronización (como mucho {SINCRO_MAX_PETICIONES} peticiones a la API).")
+        liquidar = st.checkbox("Liquidar las jornadas afectadas", value=True, key="sincro_liquidar")
+        if st.button("🔄 Sincronizar resultados", use_container_width=True):
+            with st.spinner("Sincronizando…"):
+                try:
+                    res = gestor.sincronizar_resultados(temporada, liquidar=liquidar)
+                except Exception as e:
+                    st.error(f"❌ {e}")
+                else:
+                    c1, c2, c3, c4, c5 = st.columns(5)
+                    c1.metric("Peticiones API", res["peticiones"])
+                    c2.metric("Finalizados",    res["finalizados"])
+                    c3.metric("En juego",       res["en_juego"])
+                    c4.metric("Corregidos",     res["corregidos"])
+                    c5.metric("Aplazados",      res["aplazados"],
+                              help=f"{res['reprogramados']} reprogramados con nueva fecha")
+                    if res["actualizados"]:
+                        st.success(f"✅ {res['actualizados']} partidos actualizados en las jornadas "
+                                   f"{', '.join(map(str, res['jornadas_afectadas']))}.")
+                    else:
+                        st.info("📋 No hay resultados nuevos.")
+                    if res["ventanas_pendientes"]:
+                        st.warning(f"⚠️ Quedan {res['ventanas_pendientes']} ventanas de fechas para "
+                                   "la siguiente sincronización.")
+
+        st.markdown("---")
         st.subheader("Actualizar Resultados")
-        jornadas = gestor.listar_jornadas(TEMPORADA)
+        jornadas = gestor.listar_jornadas(temporada)
         if not jornadas:
             st.warning("⚠️ No hay jornadas.")
         else:
@@ -1160,24 +2588,165 @@ def show_admin(gestor: GestorLiga):
     with tab3:
         st.subheader("Procesar Jornada Finalizada")
         st.info("💡 Calcula puntos de todas las apuestas y actualiza los saldos.")
-        jornadas = gestor.listar_jornadas(TEMPORADA)
+        jornadas = gestor.listar_jornadas(temporada)
         if not jornadas:
             st.warning("⚠️ No hay jornadas.")
         else:
             jsel = st.selectbox("Jornada:", jornadas,
                                 format_func=lambda j: f"Jornada {j['numero']}", key="j_proc")
             if st.button("🎯 Procesar Jornada", type="primary"):
-                with st.spinner("Procesando…"):
-                    try:
-                        res = gestor.procesar_jornada(jsel["id"], TEMPORADA)
-                        st.success(f"""
-                        ✅ Jornada procesada:
-                        - Apuestas procesadas: {res['apuestas_procesadas']}
-                        - Puntos ganados: +{res['puntos_otorgados']}
-                        - Puntos perdidos: -{res['puntos_perdidos']}
-                        """)
-                    except Exception as e:
-                        st.error(f"❌ {e}")
+                try:
+                    trabajo = gestor.encolar_liquidacion(jsel["id"], temporada)
+                    st.success(f"✅ Liquidación encolada (trabajo #{trabajo['id']}, "
+                               f"{trabajo['total']} apuestas pendientes).")
+                except Exception as e:
+                    st.error(f"❌ {e}")
+            if not LIQUIDACION["en_app"]:
+                st.caption("Los trabajos los ejecuta `python trabajador_liquidacion.py`.")
+            _progreso_liquidaciones(gestor, temporada, {j["id"]: j["numero"] for j in jornadas})
+
+    # ── TAB 4: Recalcular Temporada ────────────────────────────
+    with tab4:
+        st.subheader("Recalcular Puntajes de la Temporada")
+        st.info("💡 Vuelve a puntuar todas las apuestas liquidadas con los resultados actuales "
+                "y compara con los puntajes guardados. Útil tras corregir un resultado.")
+        aplicar = st.checkbox("Aplicar las correcciones", value=False, key="recalc_aplicar")
+        if st.button("🧮 Recalcular", type="primary"):
+            with st.spinner("Recalculando…"):
+                try:
+                    res = gestor.recalcular_temporada(temporada, aplicar=aplicar)
+                except Exception as e:
+                    st.error(f"❌ {e}")
+                else:
+                    c1, c2, c3 = st.columns(3)
+                    c1.metric("Apuestas revisadas",  res["apuestas_revisadas"])
+                    c2.metric("Apuestas a corregir", res["apuestas_corregidas"])
+                    c3.metric("Usuarios a corregir", res["usuarios_corregidos"])
+                    if not res["diferencias"]:
+                        st.success("✅ Los puntajes coinciden con el libro de apuestas.")
+                    else:
+                        nombres = {u["id"]: f"{u['nombre']} {u['apellidos']}" for u in gestor.listar_usuarios()}
+                        st.dataframe(pd.DataFrame([{
+                            "Usuario":   nombres.get(d["usuario_id"], d["usuario_id"]),
+                            "Puntos":    f"{d['puntos_totales_antes']} → {d['puntos_totales_despues']}",
+                            "Aciertos":  f"{d['aciertos_antes']} → {d['aciertos_despues']}",
+                            "Fallos":    f"{d['fallos_antes']} → {d['fallos_despues']}",
+                            "Apostados": f"{d['partidos_apostados_antes']} → {d['partidos_apostados_despues']}",
+                        } for d in res["diferencias"]]), use_container_width=True, hide_index=True)
+                        if res["aplicado"]:
+                            st.success("✅ Correcciones aplicadas.")
+                        else:
+                            st.warning("⚠️ Simulación: marca «Aplicar las correcciones» para guardarlas.")
+
+        st.divider()
+        st.subheader("Libro de Puntos")
+        st.caption("Los puntajes son la suma de los movimientos del libro (apuestas, reembolsos, "
+                   "liquidaciones y ajustes). Reconstruirlos solo reescribe los que no cuadran.")
+        if st.button("📒 Reconstruir puntajes desde el libro"):
+            try:
+                res = gestor.reconstruir_puntajes(temporada)
+            except Exception as e:
+                st.error(f"❌ {e}")
+            else:
+                st.success(f"✅ {res['usuarios']} usuarios, {res['movimientos']} movimientos; "
+                           f"{res['corregidos']} puntajes corregidos.")
+
+        usuarios = gestor.listar_usuarios()
+        if usuarios:
+            usuario = st.selectbox("Movimientos de", usuarios, format_func=gestor.nombre_completo,
+                                   key="libro_usuario")
+            movimientos = gestor.movimientos_usuario(usuario["id"], temporada)
+            if movimientos:
+                st.dataframe(pd.DataFrame(movimientos)[
+                    ["creado_en", "tipo", "puntos", "comprometidos", "jornada_id", "apuesta_id", "origen"]],
+                    use_container_width=True, hide_index=True)
+            else:
+                st.info("Sin movimientos en la temporada.")
+
+    cache_http = gestor.api.cache
+    if cache_http is not None:
+        with st.expander("🌐 Caché HTTP (football-data.org)"):
+            stats = cache_http.estadisticas()
+            c1, c2, c3, c4, c5 = st.columns(5)
+            c1.metric("Entradas",    stats["entradas"])
+            c2.metric("Tamaño",      f"{stats['bytes'] / 1024:.0f} KB")
+            c3.metric("Aciertos",    stats["aciertos"])
+            c4.metric("Revalidadas", stats["revalidados"])
+            c5.metric("Descargas",   stats["fallos"])
+            if st.button("🧹 Vaciar caché HTTP"):
+                cache_http.limpiar()
+                st.rerun()
+
+    with st.expander("🗄️ Caché de lecturas"):
+        stats = gestor.cache.estadisticas()
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Entradas", stats["entradas"])
+        c2.metric("Aciertos", stats["aciertos"])
+        c3.metric("Fallos",   stats["fallos"])
+        c4.metric("Parches",  stats["parches"])
+        c5.metric("% Acierto", f"{stats['tasa_acierto'] * 100:.1f}%")
+        if st.button("🧹 Vaciar caché"):
+            gestor.cache.limpiar()
+            st.rerun()
+
+    with st.expander("⏱️ Rendimiento"):
+        instr = gestor.instr
+        instr.activa = st.toggle("Medir consultas y peticiones", value=instr.activa,
+                                 help="Tiempo, filas y método de cada viaje a la base de datos "
+                                      "y a football-data.org, agregados por página.")
+        datos = instr.resumen()
+        if not datos["consultas"]:
+            st.info("Sin medidas todavía: activa la medición y navega por las páginas.")
+        else:
+            st.markdown("**Por página** (cada ejecución es un rerun de Streamlit)")
+            st.dataframe(pd.DataFrame(datos["paginas"]), use_container_width=True, hide_index=True)
+            st.markdown("**Consultas más costosas**")
+            st.dataframe(pd.DataFrame(datos["consultas"][:20]), use_container_width=True,
+                         hide_index=True)
+            st.markdown("**Últimas ejecuciones**")
+            st.dataframe(pd.DataFrame(datos["ejecuciones"][::-1][:20]), use_container_width=True,
+                         hide_index=True)
+        c1, c2, c3 = st.columns(3)
+        c1.download_button("⬇️ JSON", instr.a_json(), "rendimiento.json", "application/json")
+        c2.download_button("⬇️ Prometheus", instr.a_prometheus(), "rendimiento.prom", "text/plain")
+        if c3.button("🧹 Reiniciar medidas"):
+            instr.limpiar()
+            st.rerun()
+
+
+@st.fragment(run_every=LIQUIDACION["refresco_seg"])
+def _progreso_liquidaciones(gestor: GestorLiga, temporada: str, numeros: Dict[int, int]):
+    """Últimos trabajos de liquidación; se refresca solo, sin volver a ejecutar la página."""
+    trabajos = gestor.trabajos_liquidacion(temporada)
+    if not trabajos:
+        return
+    st.markdown("**Liquidaciones**")
+    iconos = {"pendiente": "⏳", "en_curso": "🔄", "completado": "✅", "fallido": "❌"}
+    for t in trabajos:
+        texto = (f"{iconos.get(t['estado'], '')} Jornada {numeros.get(t['jornada_id'], t['jornada_id'])} "
+                 f"· {t['procesadas']}/{t['total']} apuestas · {t['estado']}")
+        st.progress(t["porcentaje"] / 100, text=texto)
+        if t["estado"] == "completado" and t.get("resumen"):
+            r = t["resumen"]
+            st.caption(f"+{r['puntos_otorgados']} ganados · -{r['puntos_perdidos']} perdidos")
+        elif t.get("error"):
+            st.caption(f"Intento {t['intentos']}: {t['error']}")
+
+
+@st.fragment(run_every=AVISOS["refresco_seg"])
+def _en_vivo(gestor: GestorLiga, pagina: str):
+    """
+    Vuelve a pintar la página cuando llega un aviso nuevo. Solo compara un
+    contador en memoria: esperar cambios no cuesta viajes a la base de datos.
+    """
+    avisos = gestor.avisos
+    if pagina in PAGINAS_EN_VIVO and avisos.version != st.session_state.get("avisos_version"):
+        st.rerun()
+    if avisos.recibido_en:
+        hora = datetime.fromtimestamp(avisos.recibido_en).strftime("%H:%M:%S")
+        st.caption(f"🟢 En vivo · último aviso {hora}")
+    else:
+        st.caption("🟢 En vivo")
 
 
 # =============================================================================
@@ -1187,6 +2756,8 @@ def show_admin(gestor: GestorLiga):
 def main():
     st.markdown('<div class="main-header">⚽ LA POLLA - LIGA ESPAÑOLA</div>', unsafe_allow_html=True)
     gestor = get_gestor()
+    if LIQUIDACION["en_app"]:
+        get_trabajador_liquidacion(gestor)
 
     st.sidebar.title("📋 Menú Principal")
     st.sidebar.markdown("---")
@@ -1202,7 +2773,9 @@ def main():
     }
     page = menu[st.sidebar.radio("Ir a:", list(menu.keys()))]
     st.sidebar.markdown("---")
-    st.sidebar.info(f"**Temporada:** {TEMPORADA}")
+    temporadas = sorted(set(gestor.listar_temporadas()) | {TEMPORADA}, reverse=True)
+    temporada  = st.sidebar.selectbox("🗓️ Temporada:", temporadas, index=temporadas.index(TEMPORADA),
+                                      key="temporada")
 
     pages = {
         "dashboard":     show_dashboard,
@@ -1213,7 +2786,11 @@ def main():
         "clasificacion": show_clasificacion,
         "admin":         show_admin,
     }
-    pages[page](gestor)
+    st.session_state["avisos_version"] = gestor.avisos.version
+    with gestor.instr.ambito(page):
+        pages[page](gestor, temporada)
+    with st.sidebar:
+        _en_vivo(gestor, page)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""
+AVISOS DE CAMBIOS (RESULTADOS Y LIQUIDACIONES)
+==============================================
+``GestorLiga`` publica un aviso cada vez que escribe algo que las sesiones
+abiertas están mirando:
+
+- ``{"tipo": "resultados", "partidos": [...]}``: partidos con resultado o
+  estado nuevos (``actualizar_resultado``, ``sincronizar_resultados``);
+- ``{"tipo": "liquidacion", "temporada": ..., "jornada_id": ...}``: una
+  jornada liquidada (``jornada_id = None`` si se corrigió toda la temporada);
+- ``{"tipo": "invalidacion", "tablas": [...], "refrescar": False}``:
+  cualquier otra escritura (apuestas, usuarios, jornadas, equipos...).
+
+Cada gestor se suscribe a su bus y, al recibir un aviso, parchea o invalida
+en su caché solo lo afectado; las sesiones se vuelven a pintar cuando cambia
+``version``, sin consultar la base de datos para saberlo. Los avisos con
+``"refrescar": False`` no cambian ``version``: la caché ya no sirve datos
+viejos y las páginas abiertas no se relanzan por cada apuesta.
+
+- ``BusAvisos``: pub/sub dentro del proceso (backend SQLite y benchmarks).
+- ``BusRealtime``: además difunde los avisos por un canal de Supabase
+  Realtime (broadcast), así que llegan a las demás réplicas de la app, al
+  cron de ``sincronizar_resultados.py`` y a ``trabajador_liquidacion.py``.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+EVENTO_REALTIME = "aviso"
+
+
+class BusAvisos:
+    """Publicación y suscripción de avisos dentro del proceso."""
+
+    entre_procesos = False
+
+    def __init__(self):
+        self._lock         = threading.Lock()
+        self._suscriptores: List[Callable[[Dict], None]] = []
+        self.version       = 0      # avisos recibidos; las sesiones comparan contra el último visto
+        self.ultimo: Optional[Dict] = None
+        self.recibido_en: Optional[float] = None
+
+    def suscribir(self, fn: Callable[[Dict], None]) -> Callable[[], None]:
+        """Llama a ``fn(aviso)`` con cada aviso; devuelve la función que anula la suscripción."""
+        with self._lock:
+            self._suscriptores.append(fn)
+
+        def cancelar():
+            with self._lock:
+                if fn in self._suscriptores:
+                    self._suscriptores.remove(fn)
+        return cancelar
+
+    def publicar(self, aviso: Dict):
+        self._entregar(aviso)
+
+    def _entregar(self, aviso: Dict):
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for fn in suscriptores:
+            try:
+                fn(aviso)
+            except Exception:
+                log.exception("Fallo al aplicar el aviso %s", aviso.get("tipo"))
+        if not aviso.get("refrescar", True):
+            return
+        with self._lock:
+            self.version    += 1
+            self.ultimo      = aviso
+            self.recibido_en = time.time()
+
+    def cerrar(self):
+        pass
+
+
+class BusRealtime(BusAvisos):
+    """
+    ``BusAvisos`` conectado a un canal de broadcast de Supabase Realtime.
+
+    El cliente síncrono de supabase-py no trae Realtime: el cliente asíncrono
+    corre en un bucle de asyncio en un hilo demonio. Los avisos propios se
+    entregan en el acto y se difunden al canal (sin eco); los ajenos llegan
+    por el canal y se entregan desde ese hilo.
+    """
+
+    entre_procesos = True
+
+    def __init__(self, url: str, key: str, canal: str = "la_polla", timeout: float = 10):
+        from realtime import AsyncRealtimeClient
+
+        super().__init__()
+        self.timeout = timeout
+        self._bucle  = asyncio.new_event_loop()
+        self._hilo   = threading.Thread(target=self._bucle.run_forever, name="avisos-realtime", daemon=True)
+        self._hilo.start()
+        self._cliente = AsyncRealtimeClient(f"{url.rstrip('/').replace('http', 'ws', 1)}/realtime/v1",
+                                            key, auto_reconnect=True)
+        try:
+            self._canal = self._esperar(self._conectar(canal))
+        except BaseException:
+            self._bucle.call_soon_threadsafe(self._bucle.stop)
+            raise
+
+    def _esperar(self, corrutina) -> Any:
+        return asyncio.run_coroutine_threadsafe(corrutina, self._bucle).result(self.timeout)
+
+    async def _conectar(self, nombre: str):
+        await self._cliente.connect()
+        canal = self._cliente.channel(nombre, {"config": {"broadcast": {"self": False, "ack": True}}})
+        canal.on_broadcast(EVENTO_REALTIME, lambda mensaje: self._entregar(mensaje["payload"]))
+        await canal.subscribe()
+        return canal
+
+    def publicar(self, aviso: Dict):
+        self._entregar(aviso)
+        try:
+            self._esperar(self._canal.send_broadcast(EVENTO_REALTIME, aviso))
+        except Exception:
+            # Las demás réplicas se quedan con el aviso perdido hasta que caduque su caché
+            log.warning("No se pudo difundir el aviso %s por Realtime", aviso.get("tipo"), exc_info=True)
+
+    def cerrar(self):
+        try:
+            self._esperar(self._cliente.close())
+        finally:
+            self._bucle.call_soon_threadsafe(self._bucle.stop)
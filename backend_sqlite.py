@@ -0,0 +1,909 @@
+"""
+BACKEND SQLITE
+==============
+Implementación embebida de la interfaz de datos de ``GestorLiga``: el mismo
+subconjunto de ``supabase.Client`` (``table()...execute()`` y ``rpc()``),
+traducido a SQL sobre un fichero SQLite local. Permite ejecutar la app y los
+benchmarks sin red y ahorra el salto a Supabase en despliegues de un nodo.
+
+- Cada hilo usa su propia conexión en modo WAL; las sentencias son
+  parametrizadas y sqlite3 las reutiliza preparadas (``cached_statements``).
+- Los recursos embebidos de PostgREST se resuelven en la misma sentencia con
+  subconsultas correlacionadas que devuelven JSON.
+- Las funciones de ``supabase/migrations`` tienen aquí su equivalente
+  (``FUNCIONES``); las que escriben abren la transacción con
+  ``BEGIN IMMEDIATE`` para serializar a los escritores igual que el advisory
+  lock de la versión PostgreSQL.
+"""
+
+import itertools
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS equipos (
+    id            INTEGER PRIMARY KEY,
+    nombre        VARCHAR(100) NOT NULL UNIQUE,
+    nombre_corto  VARCHAR(5)   NOT NULL UNIQUE,
+    estadio       VARCHAR(100)
+);
+CREATE TABLE IF NOT EXISTS jornadas (
+    id         INTEGER PRIMARY KEY,
+    numero     INTEGER     NOT NULL,
+    temporada  VARCHAR(10) NOT NULL,
+    cerrada    BOOLEAN,
+    CONSTRAINT uq_jornada_temporada UNIQUE (numero, temporada)
+);
+CREATE TABLE IF NOT EXISTS usuarios (
+    id              INTEGER PRIMARY KEY,
+    nombre          VARCHAR(50)  NOT NULL,
+    apellidos       VARCHAR(100) NOT NULL,
+    fecha_registro  DATETIME,
+    activo          BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS partidos (
+    id                   INTEGER PRIMARY KEY,
+    jornada_id           INTEGER  NOT NULL REFERENCES jornadas (id),
+    equipo_local_id      INTEGER  NOT NULL REFERENCES equipos (id),
+    equipo_visitante_id  INTEGER  NOT NULL REFERENCES equipos (id),
+    fecha_hora           DATETIME NOT NULL,
+    goles_local          INTEGER,
+    goles_visitante      INTEGER,
+    estado               VARCHAR(20),
+    actualizado_api      DATETIME
+);
+CREATE TABLE IF NOT EXISTS puntajes (
+    id                  INTEGER PRIMARY KEY,
+    usuario_id          INTEGER     NOT NULL REFERENCES usuarios (id),
+    temporada           VARCHAR(10) NOT NULL,
+    puntos_totales      INTEGER,
+    aciertos            INTEGER,
+    fallos              INTEGER,
+    partidos_apostados  INTEGER,
+    comprometidos       INTEGER     NOT NULL DEFAULT 0,
+    ultimo_movimiento_id INTEGER,
+    CONSTRAINT uq_usuario_temporada UNIQUE (usuario_id, temporada)
+);
+CREATE TABLE IF NOT EXISTS apuestas (
+    id                INTEGER PRIMARY KEY,
+    usuario_id        INTEGER     NOT NULL REFERENCES usuarios (id),
+    partido_id        INTEGER     NOT NULL REFERENCES partidos (id),
+    tipo_apuesta      VARCHAR(20) NOT NULL,
+    prediccion        VARCHAR(10) NOT NULL,
+    puntos_apostados  INTEGER     NOT NULL,
+    puntos_obtenidos  INTEGER,
+    fecha_apuesta     DATETIME,
+    CONSTRAINT uq_usuario_partido_tipo UNIQUE (usuario_id, partido_id, tipo_apuesta)
+);
+CREATE TABLE IF NOT EXISTS clasificacion_jornadas (
+    id              INTEGER PRIMARY KEY,
+    jornada_id      INTEGER     NOT NULL REFERENCES jornadas (id),
+    temporada       VARCHAR(10) NOT NULL,
+    usuario_id      INTEGER     NOT NULL REFERENCES usuarios (id),
+    posicion        INTEGER     NOT NULL,
+    puntos_totales  INTEGER     NOT NULL,
+    aciertos        INTEGER     NOT NULL,
+    fallos          INTEGER     NOT NULL,
+    delta           INTEGER     NOT NULL,
+    CONSTRAINT uq_clasificacion_jornada_usuario UNIQUE (jornada_id, usuario_id)
+);
+CREATE TABLE IF NOT EXISTS trabajos_liquidacion (
+    id            INTEGER PRIMARY KEY,
+    jornada_id    INTEGER     NOT NULL REFERENCES jornadas (id),
+    temporada     VARCHAR(10) NOT NULL,
+    estado        VARCHAR(12) NOT NULL DEFAULT 'pendiente',
+    fase          VARCHAR(16) NOT NULL DEFAULT 'apuestas',
+    total         INTEGER     NOT NULL DEFAULT 0,
+    procesadas    INTEGER     NOT NULL DEFAULT 0,
+    cursor_id     INTEGER     NOT NULL DEFAULT 0,
+    resumen       JSON,
+    pendiente     JSON,
+    trabajador    TEXT,
+    intentos      INTEGER     NOT NULL DEFAULT 0,
+    error         TEXT,
+    creado_en     DATETIME,
+    latido        DATETIME,
+    terminado_en  DATETIME
+);
+CREATE TABLE IF NOT EXISTS movimientos_puntos (
+    id                  INTEGER PRIMARY KEY,
+    usuario_id          INTEGER     NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+    temporada           VARCHAR(10) NOT NULL,
+    tipo                VARCHAR(12) NOT NULL,
+    apuesta_id          INTEGER,
+    jornada_id          INTEGER,
+    puntos              INTEGER     NOT NULL DEFAULT 0,
+    comprometidos       INTEGER     NOT NULL DEFAULT 0,
+    aciertos            INTEGER     NOT NULL DEFAULT 0,
+    fallos              INTEGER     NOT NULL DEFAULT 0,
+    partidos_apostados  INTEGER     NOT NULL DEFAULT 0,
+    clave               TEXT        NOT NULL UNIQUE,
+    origen              TEXT,
+    creado_en           DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS solicitudes_apuesta (
+    clave       TEXT PRIMARY KEY,
+    apuesta_id  INTEGER  NOT NULL REFERENCES apuestas (id) ON DELETE CASCADE,
+    creada_en   DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Índices para las consultas calientes de GestorLiga
+INDICES = """
+CREATE INDEX IF NOT EXISTS ix_usuarios_activo_nombre      ON usuarios (activo, nombre);
+CREATE INDEX IF NOT EXISTS ix_jornadas_temporada_numero   ON jornadas (temporada, numero);
+CREATE INDEX IF NOT EXISTS ix_partidos_jornada_fecha      ON partidos (jornada_id, fecha_hora);
+CREATE INDEX IF NOT EXISTS ix_apuestas_partido            ON apuestas (partido_id);
+CREATE INDEX IF NOT EXISTS ix_apuestas_pendientes_usuario ON apuestas (usuario_id) WHERE puntos_obtenidos IS NULL;
+CREATE INDEX IF NOT EXISTS ix_puntajes_temporada_puntos   ON puntajes (temporada, puntos_totales DESC, aciertos DESC);
+CREATE INDEX IF NOT EXISTS ix_clasificacion_temporada_usuario ON clasificacion_jornadas (temporada, usuario_id);
+CREATE INDEX IF NOT EXISTS ix_trabajos_liquidacion_estado ON trabajos_liquidacion (estado, id);
+CREATE INDEX IF NOT EXISTS ix_movimientos_temporada_usuario ON movimientos_puntos (temporada, usuario_id);
+CREATE INDEX IF NOT EXISTS ix_movimientos_jornada         ON movimientos_puntos (jornada_id) WHERE puntos <> 0;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_trabajo_liquidacion_activo ON trabajos_liquidacion (jornada_id)
+    WHERE estado IN ('pendiente', 'en_curso');
+"""
+
+# Libro de puntos de una base anterior a ``movimientos_puntos``: los movimientos
+# de sus apuestas y un ajuste de apertura por usuario que lo cuadra con los
+# puntajes guardados (como en la migración de Supabase). Se supone que todas las
+# temporadas empezaron con ``PUNTOS_APERTURA``, que ha de ser ``PUNTOS_INICIALES``
+# de app.py
+PUNTOS_APERTURA = 100
+MIGRACION_LIBRO = """
+INSERT INTO movimientos_puntos (usuario_id, temporada, tipo, apuesta_id, jornada_id, comprometidos, clave, origen)
+SELECT a.usuario_id, j.temporada, 'apuesta', a.id, pa.jornada_id, a.puntos_apostados,
+       'migracion:' || a.id || ':apuesta', 'migracion'
+  FROM apuestas a
+  JOIN partidos pa ON pa.id = a.partido_id
+  JOIN jornadas j  ON j.id  = pa.jornada_id;
+INSERT INTO movimientos_puntos (usuario_id, temporada, tipo, apuesta_id, jornada_id, puntos, comprometidos,
+                                aciertos, fallos, partidos_apostados, clave, origen)
+SELECT a.usuario_id, j.temporada, 'liquidacion', a.id, pa.jornada_id,
+       CASE WHEN a.puntos_obtenidos > 0 THEN a.puntos_obtenidos - a.puntos_apostados
+            ELSE -a.puntos_apostados END,
+       -a.puntos_apostados, a.puntos_obtenidos > 0, a.puntos_obtenidos <= 0, 1,
+       'migracion:' || a.id || ':liquidacion', 'migracion'
+  FROM apuestas a
+  JOIN partidos pa ON pa.id = a.partido_id
+  JOIN jornadas j  ON j.id  = pa.jornada_id
+ WHERE a.puntos_obtenidos IS NOT NULL;
+INSERT INTO movimientos_puntos (usuario_id, temporada, tipo, puntos, aciertos, fallos, partidos_apostados,
+                                clave, origen)
+SELECT pu.usuario_id, pu.temporada, 'ajuste',
+       pu.puntos_totales - {iniciales} - COALESCE(l.puntos, 0),
+       pu.aciertos - COALESCE(l.aciertos, 0),
+       pu.fallos - COALESCE(l.fallos, 0),
+       pu.partidos_apostados - COALESCE(l.partidos_apostados, 0),
+       'migracion:' || pu.usuario_id || ':' || pu.temporada || ':apertura', 'migracion'
+  FROM puntajes pu
+  LEFT JOIN (SELECT usuario_id, temporada, SUM(puntos) AS puntos, SUM(aciertos) AS aciertos,
+                    SUM(fallos) AS fallos, SUM(partidos_apostados) AS partidos_apostados
+               FROM movimientos_puntos
+              GROUP BY usuario_id, temporada) l
+         ON l.usuario_id = pu.usuario_id AND l.temporada = pu.temporada
+ WHERE (pu.puntos_totales - {iniciales}, pu.aciertos, pu.fallos, pu.partidos_apostados)
+       IS NOT (COALESCE(l.puntos, 0), COALESCE(l.aciertos, 0), COALESCE(l.fallos, 0),
+               COALESCE(l.partidos_apostados, 0));
+"""
+
+# Columnas añadidas después de crear la tabla: las bases existentes las reciben con ALTER TABLE
+COLUMNAS_NUEVAS = [
+    ("partidos", "actualizado_api",      "DATETIME"),
+    ("puntajes", "comprometidos",        "INTEGER NOT NULL DEFAULT 0"),
+    ("puntajes", "ultimo_movimiento_id", "INTEGER"),
+]
+
+
+def _error(mensaje: str) -> APIError:
+    """Mismo error que devuelve PostgREST ante un ``raise exception`` (P0001)."""
+    return APIError({"message": mensaje, "code": "P0001", "hint": None, "details": None})
+
+
+# =============================================================================
+# FUNCIONES (equivalentes de supabase/migrations)
+# =============================================================================
+
+COLUMNAS_MOVIMIENTO = ("usuario_id", "temporada", "tipo", "apuesta_id", "jornada_id", "puntos",
+                       "comprometidos", "aciertos", "fallos", "partidos_apostados", "clave", "origen")
+DELTAS_MOVIMIENTO   = ("puntos", "comprometidos", "aciertos", "fallos", "partidos_apostados")
+
+
+def _registrar_movimientos(conn: sqlite3.Connection, movimientos: List[Dict],
+                           p_puntos_iniciales: int = 100) -> List[Dict]:
+    """Cuerpo de ``registrar_movimientos`` dentro de la transacción del llamante."""
+    nuevos = []
+    marcas = ", ".join("?" * len(COLUMNAS_MOVIMIENTO))
+    for m in movimientos:
+        fila = {c: m.get(c) for c in COLUMNAS_MOVIMIENTO}
+        for c in DELTAS_MOVIMIENTO:
+            fila[c] = fila[c] or 0
+        cur = conn.execute(f"""
+            INSERT INTO movimientos_puntos ({", ".join(COLUMNAS_MOVIMIENTO)}) VALUES ({marcas})
+            ON CONFLICT (clave) DO NOTHING RETURNING *
+        """, [fila[c] for c in COLUMNAS_MOVIMIENTO])
+        columnas = [c[0] for c in cur.description]
+        nuevos.extend(dict(zip(columnas, f)) for f in cur.fetchall())
+
+    sumas: Dict[Tuple[int, str], Dict[str, int]] = {}
+    for n in nuevos:
+        s = sumas.setdefault((n["usuario_id"], n["temporada"]), dict.fromkeys(DELTAS_MOVIMIENTO, 0))
+        for c in DELTAS_MOVIMIENTO:
+            s[c] += n[c]
+        s["ultimo"] = max(s.get("ultimo", 0), n["id"])
+    for (usuario_id, temporada), s in sumas.items():
+        conn.execute("""
+            INSERT INTO puntajes (usuario_id, temporada, puntos_totales, comprometidos, aciertos,
+                                  fallos, partidos_apostados, ultimo_movimiento_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (usuario_id, temporada) DO UPDATE
+               SET puntos_totales       = puntos_totales + excluded.puntos_totales - ?,
+                   comprometidos        = comprometidos + excluded.comprometidos,
+                   aciertos             = aciertos + excluded.aciertos,
+                   fallos               = fallos + excluded.fallos,
+                   partidos_apostados   = partidos_apostados + excluded.partidos_apostados,
+                   ultimo_movimiento_id = MAX(COALESCE(ultimo_movimiento_id, 0), excluded.ultimo_movimiento_id)
+        """, (usuario_id, temporada, p_puntos_iniciales + s["puntos"], s["comprometidos"], s["aciertos"],
+              s["fallos"], s["partidos_apostados"], s["ultimo"], p_puntos_iniciales))
+    return nuevos
+
+
+def registrar_movimientos(conn: sqlite3.Connection, p_movimientos: List[Dict],
+                          p_puntos_iniciales: int = 100) -> List[Dict]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        nuevos = _registrar_movimientos(conn, p_movimientos, p_puntos_iniciales)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return nuevos
+
+
+def reconstruir_puntajes(conn: sqlite3.Connection, p_temporada: str,
+                         p_puntos_iniciales: int = 100) -> List[Dict]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        sumas = conn.execute("""
+            SELECT u.usuario_id,
+                   ? + COALESCE(SUM(m.puntos), 0), COALESCE(SUM(m.comprometidos), 0),
+                   COALESCE(SUM(m.aciertos), 0), COALESCE(SUM(m.fallos), 0),
+                   COALESCE(SUM(m.partidos_apostados), 0), MAX(m.id), COUNT(m.id)
+              FROM (SELECT usuario_id FROM puntajes WHERE temporada = ?
+                    UNION
+                    SELECT usuario_id FROM movimientos_puntos WHERE temporada = ?) u
+              LEFT JOIN movimientos_puntos m ON m.usuario_id = u.usuario_id AND m.temporada = ?
+             GROUP BY u.usuario_id
+        """, (p_puntos_iniciales, p_temporada, p_temporada, p_temporada)).fetchall()
+        corregidos = 0
+        for usuario_id, total, comprometidos, aciertos, fallos, apostados, ultimo, _ in sumas:
+            corregidos += conn.execute("""
+                INSERT INTO puntajes (usuario_id, temporada, puntos_totales, comprometidos, aciertos,
+                                      fallos, partidos_apostados, ultimo_movimiento_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (usuario_id, temporada) DO UPDATE
+                   SET puntos_totales       = excluded.puntos_totales,
+                       comprometidos        = excluded.comprometidos,
+                       aciertos             = excluded.aciertos,
+                       fallos               = excluded.fallos,
+                       partidos_apostados   = excluded.partidos_apostados,
+                       ultimo_movimiento_id = excluded.ultimo_movimiento_id
+                 WHERE (puntos_totales, comprometidos, aciertos, fallos, partidos_apostados)
+                       IS NOT (excluded.puntos_totales, excluded.comprometidos, excluded.aciertos,
+                               excluded.fallos, excluded.partidos_apostados)
+            """, (usuario_id, p_temporada, total, comprometidos, aciertos, fallos, apostados,
+                  ultimo)).rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return [{"usuarios": len(sumas), "movimientos": sum(f[-1] for f in sumas), "corregidos": corregidos}]
+
+
+def saldo_usuario(conn: sqlite3.Connection, p_usuario_id: int, p_temporada: str,
+                  p_puntos_iniciales: int = 100) -> List[Dict]:
+    fila = conn.execute(
+        "SELECT puntos_totales, comprometidos FROM puntajes WHERE usuario_id = ? AND temporada = ?",
+        (p_usuario_id, p_temporada)).fetchone()
+    total, comprometidos = fila if fila else (p_puntos_iniciales, 0)
+    return [{"puntos_totales": total, "comprometidos": comprometidos,
+             "disponible": total - comprometidos}]
+
+
+def _apuesta_pendiente(conn: sqlite3.Connection, usuario_id: int, partido_id: int,
+                       tipo: str) -> Optional[Tuple[int, int]]:
+    """(id, puntos_apostados) de la apuesta sin liquidar que se reemplazaría."""
+    return conn.execute("""
+        SELECT id, puntos_apostados FROM apuestas
+         WHERE usuario_id = ? AND partido_id = ? AND tipo_apuesta = ? AND puntos_obtenidos IS NULL
+    """, (usuario_id, partido_id, tipo)).fetchone()
+
+
+def _movimientos_colocacion(usuario_id: int, temporada: str, apuesta_id: int, jornada_id: int,
+                            puntos: int, previa: Optional[Tuple[int, int]], clave: str,
+                            origen: str) -> List[Dict]:
+    comun = {"usuario_id": usuario_id, "temporada": temporada, "apuesta_id": apuesta_id,
+             "jornada_id": jornada_id, "origen": origen}
+    movimientos = [{**comun, "tipo": "reembolso", "comprometidos": -previa[1],
+                    "clave": f"{clave}:reembolso"}] if previa else []
+    return movimientos + [{**comun, "tipo": "apuesta", "comprometidos": puntos,
+                           "clave": f"{clave}:apuesta"}]
+
+
+def colocar_apuesta(conn: sqlite3.Connection, p_usuario_id: int, p_partido_id: int,
+                    p_tipo: str, p_prediccion: str, p_puntos: int, p_temporada: str,
+                    p_clave: str, p_puntos_iniciales: int = 100) -> List[Dict]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        previa = conn.execute("SELECT apuesta_id FROM solicitudes_apuesta WHERE clave = ?",
+                              (p_clave,)).fetchone()
+        if previa:
+            conn.execute("COMMIT")
+            return _filas(conn, "SELECT * FROM apuestas WHERE id = ?", (previa[0],))
+
+        actual     = _apuesta_pendiente(conn, p_usuario_id, p_partido_id, p_tipo)
+        disponible = saldo_usuario(conn, p_usuario_id, p_temporada, p_puntos_iniciales)[0]["disponible"] \
+            + (actual[1] if actual else 0)
+        if p_puntos > disponible:
+            raise _error(f"Saldo insuficiente. Disponible: {disponible} pts")
+
+        fila = conn.execute("""
+            INSERT INTO apuestas (usuario_id, partido_id, tipo_apuesta, prediccion,
+                                  puntos_apostados, puntos_obtenidos, fecha_apuesta)
+            VALUES (?, ?, ?, ?, ?, NULL, ?)
+            ON CONFLICT (usuario_id, partido_id, tipo_apuesta) DO UPDATE
+               SET prediccion       = excluded.prediccion,
+                   puntos_apostados = excluded.puntos_apostados,
+                   fecha_apuesta    = excluded.fecha_apuesta
+             WHERE apuestas.puntos_obtenidos IS NULL
+            RETURNING id
+        """, (p_usuario_id, p_partido_id, p_tipo, p_prediccion, p_puntos,
+              datetime.now().isoformat())).fetchone()
+        if fila is None:
+            raise _error("La apuesta ya está liquidada y no se puede modificar")
+
+        conn.execute("INSERT INTO solicitudes_apuesta (clave, apuesta_id) VALUES (?, ?)",
+                     (p_clave, fila[0]))
+        jornada_id = conn.execute("SELECT jornada_id FROM partidos WHERE id = ?", (p_partido_id,)).fetchone()[0]
+        _registrar_movimientos(conn, _movimientos_colocacion(
+            p_usuario_id, p_temporada, fila[0], jornada_id, p_puntos, actual, p_clave,
+            "colocar_apuesta"), p_puntos_iniciales)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return _filas(conn, "SELECT * FROM apuestas WHERE id = ?", (fila[0],))
+
+
+def colocar_apuestas(conn: sqlite3.Connection, p_usuario_id: int, p_temporada: str,
+                     p_apuestas: List[Dict], p_clave: str, p_puntos_iniciales: int = 100) -> List[Dict]:
+    claves = [f"{p_clave}:{a['partido_id']}:{a['tipo_apuesta']}" for a in p_apuestas]
+    marcas = ", ".join("?" * len(claves))
+    sql_registradas = f"""
+        SELECT a.* FROM apuestas a
+          JOIN solicitudes_apuesta s ON s.apuesta_id = a.id
+         WHERE s.clave IN ({marcas})
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute(f"SELECT 1 FROM solicitudes_apuesta WHERE clave IN ({marcas}) LIMIT 1",
+                        claves).fetchone():
+            conn.execute("COMMIT")
+            return _filas(conn, sql_registradas, tuple(claves))
+
+        previas    = [_apuesta_pendiente(conn, p_usuario_id, a["partido_id"], a["tipo_apuesta"])
+                      for a in p_apuestas]
+        liberados  = sum(p[1] for p in previas if p)
+        coste      = sum(a["puntos_apostados"] for a in p_apuestas)
+        disponible = saldo_usuario(conn, p_usuario_id, p_temporada, p_puntos_iniciales)[0]["disponible"] + liberados
+        if coste > disponible:
+            raise _error(f"Saldo insuficiente. Disponible: {disponible} pts, boleto: {coste} pts")
+
+        ahora       = datetime.now().isoformat()
+        movimientos = []
+        for a, clave, previa in zip(p_apuestas, claves, previas):
+            fila = conn.execute("""
+                INSERT INTO apuestas (usuario_id, partido_id, tipo_apuesta, prediccion,
+                                      puntos_apostados, puntos_obtenidos, fecha_apuesta)
+                VALUES (?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT (usuario_id, partido_id, tipo_apuesta) DO UPDATE
+                   SET prediccion       = excluded.prediccion,
+                       puntos_apostados = excluded.puntos_apostados,
+                       fecha_apuesta    = excluded.fecha_apuesta
+                 WHERE apuestas.puntos_obtenidos IS NULL
+                RETURNING id
+            """, (p_usuario_id, a["partido_id"], a["tipo_apuesta"], a["prediccion"],
+                  a["puntos_apostados"], ahora)).fetchone()
+            if fila is None:
+                raise _error("El boleto incluye apuestas ya liquidadas que no se pueden modificar")
+            conn.execute("INSERT INTO solicitudes_apuesta (clave, apuesta_id) VALUES (?, ?)",
+                         (clave, fila[0]))
+            jornada_id = conn.execute("SELECT jornada_id FROM partidos WHERE id = ?",
+                                      (a["partido_id"],)).fetchone()[0]
+            movimientos += _movimientos_colocacion(p_usuario_id, p_temporada, fila[0], jornada_id,
+                                                   a["puntos_apostados"], previa, clave, "colocar_apuestas")
+        _registrar_movimientos(conn, movimientos, p_puntos_iniciales)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return _filas(conn, sql_registradas, tuple(claves))
+
+
+def resumen_dashboard(conn: sqlite3.Connection, p_temporada: str, p_top: int = 5,
+                      p_recientes: int = 5) -> List[Dict]:
+    equipos, usuarios, jornadas = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM equipos),
+               (SELECT COUNT(*) FROM usuarios WHERE activo),
+               (SELECT COUNT(*) FROM jornadas WHERE temporada = ?)
+    """, (p_temporada,)).fetchone()
+
+    top = _filas(conn, """
+        SELECT * FROM puntajes WHERE temporada = ?
+         ORDER BY puntos_totales DESC, aciertos DESC, id LIMIT ?
+    """, (p_temporada, p_top))
+    if top:
+        ids = [p["usuario_id"] for p in top]
+        por_id = {u["id"]: u for u in _filas(
+            conn, f"SELECT * FROM usuarios WHERE id IN ({', '.join('?' * len(ids))})", tuple(ids))}
+        for p in top:
+            u = por_id.get(p["usuario_id"])
+            if u is not None:
+                u["activo"] = None if u["activo"] is None else bool(u["activo"])
+            p["usuarios"] = u
+
+    recientes = _filas(conn, """
+        SELECT j.*, (SELECT COUNT(*) FROM partidos pa WHERE pa.jornada_id = j.id) AS total_partidos
+          FROM jornadas j WHERE j.temporada = ?
+         ORDER BY j.numero DESC LIMIT ?
+    """, (p_temporada, p_recientes))
+    for j in recientes:
+        j["cerrada"] = None if j["cerrada"] is None else bool(j["cerrada"])
+    return [{"equipos": equipos, "usuarios": usuarios, "jornadas": jornadas,
+             "top": top, "recientes": recientes[::-1]}]
+
+
+def reclamar_liquidacion(conn: sqlite3.Connection, p_trabajador: str,
+                         p_caducidad_seg: int = 60) -> List[Dict]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        fila = conn.execute("""
+            SELECT id FROM trabajos_liquidacion
+             WHERE estado = 'pendiente'
+                OR (estado = 'en_curso'
+                    AND (latido IS NULL OR julianday(latido) < julianday('now') - ? / 86400.0))
+             ORDER BY id LIMIT 1
+        """, (p_caducidad_seg,)).fetchone()
+        if fila is not None:
+            conn.execute("""
+                UPDATE trabajos_liquidacion
+                   SET estado = 'en_curso', trabajador = ?, intentos = intentos + 1,
+                       latido = strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')
+                 WHERE id = ?
+            """, (p_trabajador, fila[0]))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    if fila is None:
+        return []
+    trabajo = _filas(conn, "SELECT * FROM trabajos_liquidacion WHERE id = ?", (fila[0],))[0]
+    for c in ("resumen", "pendiente"):
+        trabajo[c] = None if trabajo[c] is None else json.loads(trabajo[c])
+    return [trabajo]
+
+
+FUNCIONES: Dict[str, Callable[..., List[Dict]]] = {
+    "saldo_usuario":         saldo_usuario,
+    "colocar_apuesta":       colocar_apuesta,
+    "colocar_apuestas":      colocar_apuestas,
+    "resumen_dashboard":     resumen_dashboard,
+    "reclamar_liquidacion":  reclamar_liquidacion,
+    "registrar_movimientos": registrar_movimientos,
+    "reconstruir_puntajes":  reconstruir_puntajes,
+}
+
+
+def _filas(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> List[Dict]:
+    cur = conn.execute(sql, params)
+    columnas = [c[0] for c in cur.description]
+    return [dict(zip(columnas, fila)) for fila in cur.fetchall()]
+
+
+# =============================================================================
+# PARSER DE SELECT (sintaxis PostgREST)
+# =============================================================================
+
+def _partir_nivel_superior(texto: str) -> List[str]:
+    partes, nivel, actual = [], 0, ""
+    for ch in texto:
+        if ch == "(":
+            nivel += 1
+        elif ch == ")":
+            nivel -= 1
+        if ch == "," and nivel == 0:
+            partes.append(actual.strip())
+            actual = ""
+        else:
+            actual += ch
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+def parsear_select(texto: str) -> Tuple[List[str], List[Dict]]:
+    """
+    Devuelve (columnas, embebidos) de una cláusula select de PostgREST.
+    ``*`` se representa como columna; cada embebido lleva alias, tabla, fk
+    (hint ``!columna``), ``inner``, ``count`` y su propio select anidado.
+    """
+    columnas, embebidos = [], []
+    for parte in _partir_nivel_superior(texto or "*"):
+        if "(" not in parte:
+            columnas.append(parte)
+            continue
+        cabeza, interior = parte.split("(", 1)
+        interior = interior[:-1]
+        alias = None
+        if ":" in cabeza:
+            alias, cabeza = cabeza.split(":", 1)
+        tabla, *hints = cabeza.split("!")
+        sub_cols, sub_emb = parsear_select(interior)
+        embebidos.append({
+            "alias":  alias or tabla,
+            "tabla":  tabla,
+            "fk":     next((h for h in hints if h != "inner"), None),
+            "inner":  "inner" in hints,
+            "count":  sub_cols == ["count"] and not sub_emb,
+            "cols":   sub_cols,
+            "emb":    sub_emb,
+        })
+    return columnas, embebidos
+
+
+# =============================================================================
+# CLIENTE
+# =============================================================================
+
+class RespuestaSQLite:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data  = data
+        self.count = count
+
+
+def _valor(v: Any) -> Any:
+    """Valor para una columna: los dicts y listas se guardan como JSON (columnas ``JSON``)."""
+    return json.dumps(v) if isinstance(v, (dict, list)) else v
+
+
+_OPERADORES = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class ConsultaSQLite:
+    """
+    Query-builder con la misma cadena que el de supabase-py, traducido a una
+    única sentencia SQL parametrizada. Los embebidos se resuelven con
+    subconsultas correlacionadas que devuelven JSON (``json_object``).
+    """
+
+    def __init__(self, cliente: "ClienteSQLite", tabla: str):
+        self.cliente   = cliente
+        self.tabla     = tabla
+        self.operacion = "select"
+        self.columnas  = "*"
+        self.payload: Any = None
+        self.filtros: List[Tuple[str, str, Any]] = []
+        self.orden: List[Tuple[str, bool]] = []
+        self.limite: Optional[int] = None
+        self.desde  = 0
+        self.contar = False
+        self.on_conflict = "id"
+        self.ignorar_duplicados = False
+
+    # ── Operaciones ────────────────────────────────────────────
+
+    def select(self, columnas: str = "*", count: Optional[str] = None):
+        self.columnas = columnas
+        self.contar   = count is not None
+        return self
+
+    def insert(self, datos):
+        self.operacion, self.payload = "insert", datos
+        return self
+
+    def upsert(self, datos, on_conflict: str = "", ignore_duplicates: bool = False, **_):
+        self.operacion, self.payload = "upsert", datos
+        self.on_conflict        = on_conflict or "id"
+        self.ignorar_duplicados = ignore_duplicates
+        return self
+
+    def update(self, datos):
+        self.operacion, self.payload = "update", datos
+        return self
+
+    def delete(self):
+        self.operacion = "delete"
+        return self
+
+    # ── Filtros / modificadores ────────────────────────────────
+
+    def eq(self, col, v):   self.filtros.append((col, "eq", v));  return self
+    def neq(self, col, v):  self.filtros.append((col, "neq", v)); return self
+    def is_(self, col, v):  self.filtros.append((col, "is", v));  return self
+    def in_(self, col, v):  self.filtros.append((col, "in", list(v))); return self
+    def gt(self, col, v):   self.filtros.append((col, "gt", v));  return self
+    def gte(self, col, v):  self.filtros.append((col, "gte", v)); return self
+    def lt(self, col, v):   self.filtros.append((col, "lt", v));  return self
+    def lte(self, col, v):  self.filtros.append((col, "lte", v)); return self
+
+    def order(self, col: str, desc: bool = False):
+        self.orden.append((col, desc))
+        return self
+
+    def limit(self, n: int):
+        self.limite = n
+        return self
+
+    def range(self, desde: int, hasta: int):
+        self.desde, self.limite = desde, hasta - desde + 1
+        return self
+
+    # ── Traducción a SQL ───────────────────────────────────────
+
+    def _condiciones(self, alias: str, ruta: str) -> Tuple[List[str], List[Any]]:
+        """Condiciones SQL de los filtros cuya columna cuelga exactamente de ``ruta``."""
+        sql, params = [], []
+        for col, op, valor in self.filtros:
+            if ruta:
+                if not col.startswith(ruta + "."):
+                    continue
+                col = col[len(ruta) + 1:]
+            if "." in col:
+                continue
+            ref = f'{alias}."{col}"'
+            if op == "is":
+                literal = {None: "NULL", "null": "NULL", True: "TRUE", "true": "TRUE",
+                           False: "FALSE", "false": "FALSE"}[valor]
+                sql.append(f"{ref} IS {literal}")
+            elif op == "in":
+                sql.append(f"{ref} IN ({', '.join('?' * len(valor))})" if valor else "0")
+                params.extend(valor)
+            else:
+                sql.append(f"{ref} {_OPERADORES[op]} ?")
+                params.append(valor)
+        return sql, params
+
+    def _json_fila(self, tabla: str, alias: str, cols: List[str], embebidos: List[Dict],
+                   ruta: str, params: List[Any]) -> str:
+        """Expresión ``json_object(...)`` de una fila con sus embebidos."""
+        columnas = self.cliente.columnas(tabla)
+        nombres  = list(columnas) if "*" in cols else [c for c in cols if c != "*"]
+        partes   = []
+        for c in nombres:
+            ref = f'{alias}."{c}"'
+            if columnas.get(c) == "BOOLEAN":
+                ref = f"CASE WHEN {ref} IS NULL THEN NULL WHEN {ref} THEN json('true') ELSE json('false') END"
+            elif columnas.get(c) == "JSON":
+                ref = f"json({ref})"
+            partes.append(f"'{c}', {ref}")
+        for emb in embebidos:
+            partes.append(f"'{emb['alias']}', {self._json_embebido(tabla, alias, emb, ruta, params)}")
+        return f"json_object({', '.join(partes)})"
+
+    def _relacion(self, base: str, emb: Dict) -> Tuple[str, str, bool]:
+        """(columna en base, columna en destino, es_a_uno) del embebido."""
+        if emb["fk"]:
+            return emb["fk"], "id", True
+        col = f"{emb['tabla'][:-1]}_id"
+        if col in self.cliente.columnas(base):
+            return col, "id", True
+        return "id", f"{base[:-1]}_id", False
+
+    def _origen_embebido(self, base: str, alias_base: str, emb: Dict,
+                         ruta: str) -> Tuple[str, str, str, List[Any]]:
+        """(alias, ``FROM ... WHERE ...``, ruta, parámetros) de la subconsulta del embebido."""
+        ruta_emb = f"{ruta}.{emb['alias']}" if ruta else emb["alias"]
+        alias    = f"e{self.cliente.siguiente_alias()}"
+        local, remota, _ = self._relacion(base, emb)
+        conds, valores = self._condiciones(alias, ruta_emb)
+        for hijo in emb["emb"]:
+            if hijo["inner"]:
+                conds.append(self._existe(emb["tabla"], alias, hijo, ruta_emb, valores))
+        donde = " AND ".join([f'{alias}."{remota}" = {alias_base}."{local}"'] + conds)
+        return alias, f'FROM "{emb["tabla"]}" {alias} WHERE {donde}', ruta_emb, valores
+
+    def _existe(self, base: str, alias_base: str, emb: Dict, ruta: str, params: List[Any]) -> str:
+        _, origen, _, valores = self._origen_embebido(base, alias_base, emb, ruta)
+        params.extend(valores)
+        return f"EXISTS (SELECT 1 {origen})"
+
+    def _json_embebido(self, base: str, alias_base: str, emb: Dict, ruta: str,
+                       params: List[Any]) -> str:
+        alias, origen, ruta_emb, valores = self._origen_embebido(base, alias_base, emb, ruta)
+        _, _, a_uno = self._relacion(base, emb)
+        if emb["count"]:
+            params.extend(valores)
+            return f"json_array(json_object('count', (SELECT COUNT(*) {origen})))"
+        sub_params: List[Any] = []
+        fila = self._json_fila(emb["tabla"], alias, emb["cols"], emb["emb"], ruta_emb, sub_params)
+        params.extend(sub_params + valores)
+        if a_uno:
+            return f"(SELECT json({fila}) {origen} LIMIT 1)"
+        return f"(SELECT COALESCE(json_group_array(json({fila})), json('[]')) {origen})"
+
+    def _donde(self, alias: str, embebidos: List[Dict], params: List[Any]) -> str:
+        conds, valores = self._condiciones(alias, "")
+        params.extend(valores)
+        for emb in embebidos:
+            if emb["inner"]:
+                conds.append(self._existe(self.tabla, alias, emb, "", params))
+        if any("." in c for c, _, _ in self.filtros) and self.operacion != "select":
+            raise ValueError("Filtros sobre recursos embebidos solo se admiten en select")
+        return f"WHERE {' AND '.join(conds)}" if conds else ""
+
+    # ── Ejecución ──────────────────────────────────────────────
+
+    def execute(self) -> RespuestaSQLite:
+        return getattr(self, f"_ejecutar_{self.operacion}")(self.cliente.conexion())
+
+    def _ejecutar_select(self, conn: sqlite3.Connection) -> RespuestaSQLite:
+        cols, embebidos = parsear_select(self.columnas)
+        params_fila: List[Any] = []
+        fila  = self._json_fila(self.tabla, "t", cols, embebidos, "", params_fila)
+        params_donde: List[Any] = []
+        donde = self._donde("t", embebidos, params_donde)
+        orden = ", ".join(f't."{c}" {"DESC" if d else "ASC"} NULLS {"FIRST" if d else "LAST"}'
+                          for c, d in self.orden)
+        sql = f'SELECT {fila} FROM "{self.tabla}" t {donde}'
+        if orden:
+            sql += f" ORDER BY {orden}"
+        if self.limite is not None or self.desde:
+            sql += f" LIMIT {self.limite if self.limite is not None else -1} OFFSET {self.desde}"
+        data  = [json.loads(r[0]) for r in conn.execute(sql, params_fila + params_donde)]
+        total = None
+        if self.contar:
+            total = conn.execute(f'SELECT COUNT(*) FROM "{self.tabla}" t {donde}', params_donde).fetchone()[0]
+        return RespuestaSQLite(data, total)
+
+    def _filas_payload(self) -> List[Dict]:
+        return self.payload if isinstance(self.payload, list) else [self.payload]
+
+    def _escribir(self, conn: sqlite3.Connection, sentencia: Callable[[Dict], Tuple[str, list]]) -> List[Dict]:
+        """Ejecuta una sentencia por fila dentro de una única transacción."""
+        salida = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for fila in self._filas_payload():
+                sql, params = sentencia(fila)
+                salida.extend(json.loads(r[0]) for r in conn.execute(sql, params))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return salida
+
+    def _retorno(self) -> str:
+        return "RETURNING " + self._json_fila(self.tabla, f'"{self.tabla}"', ["*"], [], "", [])
+
+    def _ejecutar_insert(self, conn: sqlite3.Connection) -> RespuestaSQLite:
+        def sentencia(fila: Dict):
+            cols = ", ".join(f'"{c}"' for c in fila)
+            return (f'INSERT INTO "{self.tabla}" ({cols}) VALUES ({", ".join("?" * len(fila))}) '
+                    f"{self._retorno()}", [_valor(v) for v in fila.values()])
+        return RespuestaSQLite(self._escribir(conn, sentencia))
+
+    def _ejecutar_upsert(self, conn: sqlite3.Connection) -> RespuestaSQLite:
+        claves = [c.strip() for c in self.on_conflict.split(",")]
+
+        def sentencia(fila: Dict):
+            cols = ", ".join(f'"{c}"' for c in fila)
+            if self.ignorar_duplicados:
+                accion = "DO NOTHING"
+            else:
+                sets   = [f'"{c}" = excluded."{c}"' for c in fila if c not in claves]
+                accion = f"DO UPDATE SET {', '.join(sets)}" if sets else "DO NOTHING"
+            return (f'INSERT INTO "{self.tabla}" ({cols}) VALUES ({", ".join("?" * len(fila))}) '
+                    f'ON CONFLICT ({", ".join(claves)}) {accion} {self._retorno()}', [_valor(v) for v in fila.values()])
+        return RespuestaSQLite(self._escribir(conn, sentencia))
+
+    def _ejecutar_update(self, conn: sqlite3.Connection) -> RespuestaSQLite:
+        params: List[Any] = [_valor(v) for v in self.payload.values()]
+        sets  = ", ".join(f'"{c}" = ?' for c in self.payload)
+        donde = self._donde(f'"{self.tabla}"', [], params)
+        sql   = f'UPDATE "{self.tabla}" SET {sets} {donde} {self._retorno()}'
+        return RespuestaSQLite([json.loads(r[0]) for r in conn.execute(sql, params)])
+
+    def _ejecutar_delete(self, conn: sqlite3.Connection) -> RespuestaSQLite:
+        params: List[Any] = []
+        donde = self._donde(f'"{self.tabla}"', [], params)
+        sql   = f'DELETE FROM "{self.tabla}" {donde} {self._retorno()}'
+        return RespuestaSQLite([json.loads(r[0]) for r in conn.execute(sql, params)])
+
+
+class LlamadaRpcSQLite:
+
+    def __init__(self, cliente: "ClienteSQLite", nombre: str, params: Dict):
+        self.cliente = cliente
+        self.nombre  = nombre
+        self.params  = params
+
+    def execute(self) -> RespuestaSQLite:
+        return RespuestaSQLite(FUNCIONES[self.nombre](self.cliente.conexion(), **self.params))
+
+
+class ClienteSQLite:
+    """
+    Backend SQLite con la interfaz de ``supabase.Client`` (``table()`` y ``rpc()``).
+
+    ``ruta`` puede ser un fichero (p. ej. el ``la_polla.db`` del repositorio) o
+    ``":memory:"`` para una base en memoria compartida entre los hilos.
+    """
+
+    def __init__(self, ruta: str = "la_polla.db"):
+        self._local    = threading.local()
+        self._columnas: Dict[str, Dict[str, str]] = {}
+        self._alias    = itertools.count()
+        self._ancla: Optional[sqlite3.Connection] = None
+        if ruta == ":memory:":
+            ruta = f"file:la_polla_{id(self)}?mode=memory&cache=shared"
+            self._ancla = sqlite3.connect(ruta, uri=True, check_same_thread=False)
+        self.ruta = ruta
+        conn = self.conexion()
+        conn.executescript(ESQUEMA)
+        for tabla, columna, tipo in COLUMNAS_NUEVAS:
+            if columna not in {f[1] for f in conn.execute(f'PRAGMA table_info("{tabla}")')}:
+                conn.execute(f'ALTER TABLE "{tabla}" ADD COLUMN "{columna}" {tipo}')
+        conn.executescript(INDICES)
+        if (conn.execute("SELECT 1 FROM apuestas LIMIT 1").fetchone()
+                and not conn.execute("SELECT 1 FROM movimientos_puntos LIMIT 1").fetchone()):
+            conn.executescript(MIGRACION_LIBRO.format(iniciales=PUNTOS_APERTURA))
+            for (temporada,) in conn.execute("SELECT DISTINCT temporada FROM movimientos_puntos").fetchall():
+                reconstruir_puntajes(conn, temporada, PUNTOS_APERTURA)
+        self.optimizar()
+
+    def conexion(self) -> sqlite3.Connection:
+        """Conexión propia del hilo actual (sqlite3 no comparte conexiones entre hilos)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, isolation_level=None, timeout=30,
+                                   uri=self.ruta.startswith("file:"), cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def optimizar(self):
+        """
+        Actualiza las estadísticas del planificador (``ANALYZE`` muestreado).
+
+        Sin ellas SQLite puede preferir un índice poco selectivo (p. ej. un
+        ``IN`` sobre ``partido_id``) a recorrer por clave primaria. Conviene
+        llamarlo tras cargas masivas.
+        """
+        conn = self.conexion()
+        conn.execute("PRAGMA analysis_limit=1000")
+        conn.execute("ANALYZE")
+
+    def columnas(self, tabla: str) -> Dict[str, str]:
+        """Columnas de la tabla y su tipo declarado (cacheado)."""
+        if tabla not in self._columnas:
+            info = self.conexion().execute(f'PRAGMA table_info("{tabla}")').fetchall()
+            if not info:
+                raise ValueError(f"Tabla desconocida: {tabla}")
+            self._columnas[tabla] = {fila[1]: fila[2].upper() for fila in info}
+        return self._columnas[tabla]
+
+    def siguiente_alias(self) -> int:
+        return next(self._alias)
+
+    def table(self, nombre: str) -> ConsultaSQLite:
+        return ConsultaSQLite(self, nombre)
+
+    def rpc(self, nombre: str, params: Optional[Dict] = None) -> LlamadaRpcSQLite:
+        return LlamadaRpcSQLite(self, nombre, params or {})
@@ -0,0 +1 @@
+"""Benchmarks de La Polla (ejecutar con ``python -m benchmarks.<modulo>``)."""
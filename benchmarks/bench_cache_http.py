@@ -0,0 +1,154 @@
+"""
+Caché HTTP de football-data.org contra el stub local
+====================================================
+Repite la importación de equipos y de una jornada de partidos
+(``cargar_equipos_desde_api`` + ``cargar_partidos_desde_api``) con
+``CacheHTTP`` en un directorio temporal y mide tiempo y peticiones a la API:
+
+1. fría: caché vacía, todas las peticiones van al stub;
+2. caliente: entradas frescas, ninguna petición;
+3. revalidación: con el reloj adelantado más allá de los TTL, peticiones
+   condicionales que el stub contesta con 304;
+4. sin caché, como referencia.
+
+Comprueba además que con ``max_bytes`` pequeño se expulsan las entradas
+menos usadas, que guardar no recorre el directorio mientras quepa y que
+``Cache-Control`` (``max-age`` menor que el TTL, ``no-cache``,
+``must-revalidate``, ``no-store``) acota el TTL del endpoint.
+
+    python -m benchmarks.bench_cache_http --latencia-ms 150
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import CACHE_HTTP, GestorLiga
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+from benchmarks.stub_football_data import ServidorStub
+from football_data import CacheHTTP, ClienteFootballData, LimitadorPeticiones
+
+JORNADA = 12
+
+
+def importar(stub: ServidorStub, cache) -> dict:
+    datos   = generar_liga(usuarios=1, jornadas_jugadas=10)
+    cliente = ClienteFalso({"equipos": datos["equipos"], "jornadas": datos["jornadas"]})
+    api     = ClienteFootballData("stub", stub.url, "PD", LimitadorPeticiones(1000, 60), cache=cache)
+    gestor  = GestorLiga(cliente, api=api)
+    antes   = len(stub.registro)
+    t0      = time.perf_counter()
+    equipos = gestor.cargar_equipos_desde_api()["recibidos"]
+    informe = gestor.cargar_partidos_desde_api(JORNADA, JORNADA)
+    nuevas  = stub.registro[antes:]
+    return {
+        "segundos":       round(time.perf_counter() - t0, 4),
+        "peticiones_api": len(nuevas),
+        "304":            sum(1 for r in nuevas if r["status"] == 304),
+        "equipos":        equipos,
+        "partidos":       informe.get("insertados", 0) + informe.get("actualizados", 0),
+    }
+
+
+def comprobar_lru(directorio: str) -> dict:
+    cache = CacheHTTP(directorio, max_bytes=4096)
+    for i in range(20):
+        cache.guardar(f"/recurso/{i}", {}, {"relleno": "x" * 400})
+        if i >= 1:
+            cache.usar("/recurso/0")   # la primera sigue en uso
+    return {"conserva_la_usada": cache.leer("/recurso/0") is not None,
+            "expulsa_la_antigua": cache.leer("/recurso/1") is None,
+            **cache.estadisticas()}
+
+
+class _CacheContada(CacheHTTP):
+    """``CacheHTTP`` que cuenta los recorridos del directorio."""
+
+    recorridos = 0
+
+    def _ficheros(self):
+        self.recorridos += 1
+        return super()._ficheros()
+
+
+def comprobar_recorridos(directorio: str, entradas: int = 500) -> dict:
+    cache = _CacheContada(directorio)
+    for i in range(entradas):
+        cache.guardar(f"/recurso/{i}", {}, {"n": i})
+        cache.guardar(f"/recurso/{i}", {"ETag": '"v2"'}, {"n": i}, anterior={"etag": '"v1"'})
+    esperado = sum(tam for _, tam, _ in CacheHTTP(directorio)._ficheros())
+    return {"entradas": entradas, "recorridos": cache.recorridos,
+            "bytes_en_memoria": cache._bytes, "bytes_en_disco": esperado}
+
+
+def comprobar_cache_control(directorio: str) -> dict:
+    """Segundos de frescura de una entrada con TTL de endpoint 600 según la cabecera."""
+    reloj = [0.0]
+    cache = CacheHTTP(directorio, ttls={r"/matches": 600}, reloj=lambda: reloj[0])
+    casos = {"sin_cabecera": "", "max_age_menor": "max-age=30", "max_age_mayor": "max-age=3600",
+             "no_cache": "no-cache", "must_revalidate": "must-revalidate",
+             "no_store": "no-store"}
+    resultado = {}
+    for nombre, cabecera in casos.items():
+        clave = f"/matches?caso={nombre}"
+        cache.guardar(clave, {"Cache-Control": cabecera, "ETag": f'"{nombre}"'}, {})
+        entrada = cache.leer(clave)
+        resultado[nombre] = None if entrada is None else entrada["ttl"]
+    return resultado
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--latencia-ms", type=float, default=100.0, help="latencia del stub por petición")
+    args = ap.parse_args()
+
+    reloj = [time.time()]
+    with tempfile.TemporaryDirectory() as directorio, \
+            ServidorStub(limite=1000, periodo=60, latencia=args.latencia_ms / 1000) as stub:
+        cache = CacheHTTP(directorio, ttls=CACHE_HTTP["ttls"], reloj=lambda: reloj[0])
+        rondas = {"fria": importar(stub, cache), "caliente": importar(stub, cache)}
+        reloj[0] += max(CACHE_HTTP["ttls"].values()) + 1
+        rondas["revalidacion"] = importar(stub, cache)
+        rondas["sin_cache"]    = importar(stub, None)
+        estadisticas = cache.estadisticas()
+    with tempfile.TemporaryDirectory() as directorio:
+        lru = comprobar_lru(directorio)
+    with tempfile.TemporaryDirectory() as directorio:
+        recorridos = comprobar_recorridos(directorio)
+    with tempfile.TemporaryDirectory() as directorio:
+        cache_control = comprobar_cache_control(directorio)
+
+    fallos = []
+    if rondas["caliente"]["peticiones_api"]:
+        fallos.append(f"caliente: {rondas['caliente']['peticiones_api']} peticiones (esperado 0)")
+    reval = rondas["revalidacion"]
+    if reval["304"] != reval["peticiones_api"] or not reval["304"]:
+        fallos.append(f"revalidación: {reval['304']} de {reval['peticiones_api']} respuestas 304")
+    if any(r["partidos"] != rondas["fria"]["partidos"] or r["equipos"] != rondas["fria"]["equipos"]
+           for r in rondas.values()):
+        fallos.append("las rondas no importan los mismos datos")
+    if not (lru["conserva_la_usada"] and lru["expulsa_la_antigua"]):
+        fallos.append(f"LRU: {lru}")
+    if recorridos["recorridos"] != 1 or recorridos["bytes_en_memoria"] != recorridos["bytes_en_disco"]:
+        fallos.append(f"guardar recorre el directorio o descuadra el tamaño: {recorridos}")
+    esperado = {"sin_cabecera": 600, "max_age_menor": 30, "max_age_mayor": 600,
+                "no_cache": 0, "must_revalidate": 0, "no_store": None}
+    if cache_control != esperado:
+        fallos.append(f"Cache-Control: TTL {cache_control}, esperado {esperado}")
+
+    print(json.dumps({"latencia_ms": args.latencia_ms, "rondas": rondas,
+                      "estadisticas": estadisticas, "lru": lru, "recorridos": recorridos,
+                      "cache_control": cache_control, "fallos": fallos},
+                     indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Dashboard: lecturas completas frente a ``resumen_dashboard``
+============================================================
+Para temporadas sintéticas con ``--usuarios`` crecientes, mide en el cliente
+falso los viajes y el tamaño de la respuesta (JSON) del dashboard:
+
+- ``lecturas``: lo que leía antes (equipos, usuarios, jornadas y la
+  clasificación completa) para quedarse con recuentos y un top 5;
+- ``resumen``: la RPC ``resumen_dashboard``, un viaje de tamaño constante.
+
+Comprueba además que ambos caminos muestran los mismos datos, en el cliente
+falso y en SQLite.
+
+    python -m benchmarks.bench_dashboard --usuarios 100 1000 5000 --latencia-ms 20
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, TEMPORADA
+from benchmarks.check_sincronizacion import cliente_datos
+from benchmarks.datos_liga import generar_liga
+
+
+def lecturas(gestor: GestorLiga) -> dict:
+    jornadas = gestor.listar_jornadas(TEMPORADA)
+    return {"equipos":   gestor.listar_equipos(),
+            "usuarios":  gestor.listar_usuarios(),
+            "jornadas":  jornadas,
+            "top":       gestor.obtener_clasificacion(TEMPORADA),
+            "recientes": jornadas[-5:]}
+
+
+def vista(datos: dict) -> dict:
+    """Lo que muestra el dashboard, sea cual sea el camino."""
+    contar = lambda v: v if isinstance(v, int) else len(v)
+    return {"equipos":   contar(datos["equipos"]),
+            "usuarios":  contar(datos["usuarios"]),
+            "jornadas":  contar(datos["jornadas"]),
+            "top":       [(p["usuario_id"], p["puntos_totales"], p["usuarios"]["nombre"]) for p in datos["top"][:5]],
+            "recientes": [(j["numero"], j["total_partidos"], j["cerrada"]) for j in datos["recientes"]]}
+
+
+def medir(cliente, gestor: GestorLiga, cargar) -> tuple:
+    gestor.cache.limpiar()
+    cliente.reiniciar_contadores()
+    t0    = time.perf_counter()
+    datos = cargar()
+    return {"segundos": round(time.perf_counter() - t0, 4), "viajes": cliente.viajes,
+            "bytes": len(json.dumps(datos, default=str))}, datos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, nargs="+", default=[100, 1000, 5000])
+    ap.add_argument("--latencia-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    resultados, fallos = [], []
+    for n in args.usuarios:
+        datos = generar_liga(n, densidad=0.05)
+        fila  = {"usuarios": n}
+        for backend in ("fake", "sqlite"):
+            cliente = cliente_datos(backend, datos)
+            if backend == "fake":
+                cliente.latencia_ms = args.latencia_ms
+            gestor = GestorLiga(cliente)
+            if backend == "fake":
+                fila["lecturas"], antes   = medir(cliente, gestor, lambda: lecturas(gestor))
+                fila["resumen"],  despues = medir(cliente, gestor, lambda: gestor.resumen_dashboard(TEMPORADA))
+            else:
+                antes, despues = lecturas(gestor), gestor.resumen_dashboard(TEMPORADA)
+            if vista(antes) != vista(despues):
+                fallos.append(f"{backend}, {n} usuarios: el resumen no coincide con las lecturas")
+        if fila["resumen"]["viajes"] != 1:
+            fallos.append(f"{n} usuarios: {fila['resumen']['viajes']} viajes para el resumen")
+        resultados.append(fila)
+
+    tamaños = [r["resumen"]["bytes"] for r in resultados]
+    if max(tamaños) > 1.05 * min(tamaños):   # solo cambian los dígitos de ids y nombres
+        fallos.append(f"el tamaño del resumen crece con los usuarios: {tamaños}")
+    print(json.dumps({"latencia_ms": args.latencia_ms, "resultados": resultados, "fallos": fallos},
+                     indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
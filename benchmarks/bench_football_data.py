@@ -0,0 +1,78 @@
+"""
+Benchmark de descarga de partidos desde football-data.org
+=========================================================
+Contra un servidor stub local con la cuota del plan gratuito escalada en el
+tiempo (``--limite`` peticiones cada ``--periodo`` segundos), compara:
+
+- ``serie``: el bucle original, un GET por equipo + espera fija de periodo/limite
+- ``por_equipos``: ``ClienteFootballData`` concurrente con limitador
+- ``jornada``: una sola petición al endpoint de competición
+
+    python -m benchmarks.bench_football_data --periodo 6
+"""
+
+import argparse
+import json
+import time
+
+import requests
+
+from benchmarks.stub_football_data import ServidorStub
+from football_data import ClienteFootballData, LimitadorPeticiones
+
+
+def _resumen(nombre: str, stub: ServidorStub, t0: float, partidos: int) -> dict:
+    registro = stub.registro
+    return {
+        "modo":      nombre,
+        "segundos":  round(time.monotonic() - t0, 3),
+        "peticiones": len(registro),
+        "429":       sum(1 for r in registro if r["status"] == 429),
+        "partidos":  partidos,
+        "instantes": [round(r["t"] - t0, 3) for r in registro],
+    }
+
+
+def serie(args) -> dict:
+    with ServidorStub(args.limite, args.periodo, args.latencia) as stub:
+        t0, unicos = time.monotonic(), {}
+        for eq in stub.equipos:
+            r = requests.get(f"{stub.url}/teams/{eq['id']}/matches", params={"status": "SCHEDULED"})
+            for p in r.json().get("matches", []):
+                unicos.setdefault(p["id"], p)
+            time.sleep(args.periodo / args.limite)
+        return _resumen("serie", stub, t0, len(unicos))
+
+
+def por_equipos(args) -> dict:
+    with ServidorStub(args.limite, args.periodo, args.latencia) as stub:
+        cliente = ClienteFootballData("stub", stub.url, "PD",
+                                      LimitadorPeticiones(args.limite, args.periodo))
+        t0 = time.monotonic()
+        partidos, _ = cliente.partidos_por_equipos([e["id"] for e in stub.equipos], status="SCHEDULED")
+        return _resumen("por_equipos", stub, t0, len(partidos))
+
+
+def jornada(args) -> dict:
+    with ServidorStub(args.limite, args.periodo, args.latencia) as stub:
+        cliente = ClienteFootballData("stub", stub.url, "PD",
+                                      LimitadorPeticiones(args.limite, args.periodo))
+        t0 = time.monotonic()
+        partidos = cliente.partidos_jornada(12)
+        return _resumen("jornada", stub, t0, len(partidos))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limite", type=int, default=10)
+    ap.add_argument("--periodo", type=float, default=6.0, help="segundos por ventana de cuota (real: 60)")
+    ap.add_argument("--latencia", type=float, default=0.05, help="latencia del stub por petición (s)")
+    ap.add_argument("--modos", nargs="+", default=["serie", "por_equipos", "jornada"])
+    args = ap.parse_args()
+
+    modos = {"serie": serie, "por_equipos": por_equipos, "jornada": jornada}
+    print(json.dumps([modos[m](args) for m in args.modos], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Coste de la instrumentación de ``GestorLiga``
+=============================================
+1. Micro: ``--consultas`` selects por id contra el cliente falso, con el
+   cliente sin envolver, envuelto con la instrumentación desactivada y
+   activada (µs por consulta).
+2. Páginas: cada ``show_*`` con la caché de lecturas fría y la
+   instrumentación activada, agrupada por ``ambito``; imprime el resumen por
+   página, las consultas más costosas y un extracto del volcado Prometheus.
+
+    python -m benchmarks.bench_instrumentacion --consultas 20000
+"""
+
+import argparse
+import json
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+import app
+from app import GestorLiga, TEMPORADA
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+from benchmarks.run import PAGINAS
+from instrumentacion import ClienteInstrumentado, Instrumentacion
+
+
+def micro(cliente: ClienteFalso, consultas: int) -> dict:
+    instr = Instrumentacion()
+    variantes = {
+        "sin_envolver": cliente,
+        "desactivada":  ClienteInstrumentado(cliente, instr),
+        "activada":     ClienteInstrumentado(cliente, Instrumentacion(activa=True)),
+    }
+    resultado = {}
+    for _ in range(2):   # la primera vuelta calienta el intérprete; cuenta la segunda
+        for nombre, sb in variantes.items():
+            t0 = time.perf_counter()
+            for i in range(consultas):
+                sb.table("usuarios").select("*").eq("id", i % 50 + 1).execute()
+            resultado[nombre] = round((time.perf_counter() - t0) / consultas * 1e6, 2)
+    resultado["sobrecoste_desactivada_us"] = round(resultado["desactivada"] - resultado["sin_envolver"], 2)
+    return resultado
+
+
+def paginas(datos: dict) -> dict:
+    gestor = GestorLiga(ClienteFalso(datos), instr=Instrumentacion(activa=True))
+    for jornada in range(1, 4):
+        with gestor.instr.ambito("admin"):
+            gestor.procesar_jornada(jornada, TEMPORADA)
+    for nombre in PAGINAS:
+        gestor.cache.limpiar()
+        with gestor.instr.ambito(nombre):
+            getattr(app, f"show_{nombre}")(gestor)
+    resumen = gestor.instr.resumen()
+    prometheus = gestor.instr.a_prometheus().splitlines()
+    return {"paginas": resumen["paginas"], "consultas_mas_costosas": resumen["consultas"][:8],
+            "prometheus": prometheus[:6]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=50)
+    ap.add_argument("--consultas", type=int, default=20000)
+    args = ap.parse_args()
+
+    datos = generar_liga(args.usuarios, jornadas_jugadas=3)
+    print(json.dumps({
+        "micro_us_por_consulta": micro(ClienteFalso(datos), args.consultas),
+        **paginas(datos),
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
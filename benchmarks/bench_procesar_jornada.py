@@ -0,0 +1,95 @@
+"""
+Benchmark de ``GestorLiga.procesar_jornada``
+============================================
+Compara la liquidación apuesta a apuesta con la liquidación por lotes sobre
+el cliente falso, midiendo viajes a la base de datos y tiempo.
+
+    python -m benchmarks.bench_procesar_jornada --apuestas 100 1000 10000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app import GestorLiga, REGLAS, TEMPORADA
+from benchmarks.fake_supabase import ClienteFalso
+
+PARTIDOS_POR_JORNADA = 10
+
+
+def generar_datos(n_apuestas: int, semilla: int = 1) -> dict:
+    rnd       = random.Random(semilla)
+    tipos     = list(REGLAS)
+    combos    = PARTIDOS_POR_JORNADA * len(tipos)
+    n_usuarios = max(1, -(-n_apuestas // combos))
+    partidos = [{
+        "id": pid, "jornada_id": 1, "equipo_local_id": 1, "equipo_visitante_id": 2,
+        "fecha_hora": "2025-08-17T19:00:00+00:00",
+        "goles_local": rnd.randint(0, 4), "goles_visitante": rnd.randint(0, 4),
+        "estado": "finalizado",
+    } for pid in range(1, PARTIDOS_POR_JORNADA + 1)]
+    apuestas = []
+    for i in range(n_apuestas):
+        usuario, resto = divmod(i, combos)
+        partido, t     = divmod(resto, len(tipos))
+        tipo = tipos[t]
+        if tipo == "resultado":
+            pred = rnd.choice(["1", "X", "2"])
+        elif tipo == "marcador":
+            pred = f"{rnd.randint(0, 3)}-{rnd.randint(0, 3)}"
+        else:
+            pred = rnd.choice(["bajo", "alto"])
+        apuestas.append({
+            "id": i + 1, "usuario_id": usuario + 1, "partido_id": partido + 1,
+            "tipo_apuesta": tipo, "prediccion": pred,
+            "puntos_apostados": rnd.choice([5, 10, 15, 20]), "puntos_obtenidos": None,
+            "fecha_apuesta": "2025-08-15T12:00:00",
+        })
+    return {
+        "usuarios": [{"id": u, "nombre": f"U{u}", "apellidos": "Bench", "activo": True}
+                     for u in range(1, n_usuarios + 1)],
+        "jornadas": [{"id": 1, "numero": 1, "temporada": TEMPORADA, "cerrada": False}],
+        "partidos": partidos,
+        "apuestas": apuestas,
+        "puntajes": [],
+    }
+
+
+def medir(n_apuestas: int, por_lotes: bool, latencia_ms: float) -> dict:
+    cliente = ClienteFalso(generar_datos(n_apuestas), latencia_ms=latencia_ms)
+    gestor  = GestorLiga(cliente)
+    t0      = time.perf_counter()
+    resumen = gestor.procesar_jornada(1, TEMPORADA, por_lotes=por_lotes)
+    return {
+        "modo":      "lotes" if por_lotes else "fila",
+        "apuestas":  n_apuestas,
+        "viajes":    cliente.viajes,
+        "segundos":  round(time.perf_counter() - t0, 4),
+        "procesadas": resumen["apuestas_procesadas"],
+        "puntos_totales": sum(p["puntos_totales"] for p in cliente.tablas["puntajes"]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--apuestas", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--latencia-ms", type=float, default=0.0)
+    ap.add_argument("--max-fila", type=int, default=1000,
+                    help="tamaño máximo para el modo fila (crece ~3 viajes por apuesta)")
+    args = ap.parse_args()
+
+    resultados = []
+    for n in args.apuestas:
+        lotes = medir(n, True, args.latencia_ms)
+        resultados.append(lotes)
+        if n <= args.max_fila:
+            fila = medir(n, False, args.latencia_ms)
+            if fila["puntos_totales"] != lotes["puntos_totales"]:
+                raise SystemExit(f"Descuadre de saldos con {n} apuestas: {fila} vs {lotes}")
+            resultados.append(fila)
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
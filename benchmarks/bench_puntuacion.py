@@ -0,0 +1,119 @@
+"""
+Equivalencia y rendimiento de ``puntuar_apuestas``
+==================================================
+1. Genera lotes aleatorios de apuestas (predicciones válidas y basura,
+   partidos pendientes, finalizados y sin goles, tipos desconocidos) y
+   comprueba que el kernel vectorizado coincide fila a fila con
+   ``_acerto_apuesta``, ``_puntos_obtenidos`` y ``_calcular_puntos_netos``.
+2. Mide el kernel sobre ``--filas`` apuestas (por defecto 1 M).
+
+    python -m benchmarks.bench_puntuacion --casos 200 --filas 1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app import GestorLiga, OPCIONES_APUESTA, REGLAS, puntuar_apuestas
+
+PREDICCIONES = {
+    "resultado":   ["1", "X", "2", "-", "x", "", None],
+    "marcador":    ["0-0", "1-0", "2-1", "3-3", "01-1", "1-", "None-None", "a-b", "1-1-1", ""],
+    "goles_total": ["bajo", "alto", "Bajo", "", None],
+}
+ESTADOS = ["finalizado", "programado", "en_juego", None]
+
+
+def apuesta_aleatoria(rnd: random.Random) -> tuple:
+    tipo = rnd.choice(list(REGLAS) + ["desconocido"])
+    pred = rnd.choice(PREDICCIONES.get(tipo) or ["1"])
+    if rnd.random() < 0.1:
+        pred = rnd.choice([p for ps in PREDICCIONES.values() for p in ps])
+    sin_goles = rnd.random() < 0.15
+    partido = {
+        "estado":          rnd.choice(ESTADOS),
+        "goles_local":     None if sin_goles else rnd.randint(0, 5),
+        "goles_visitante": None if sin_goles else rnd.randint(0, 5),
+    }
+    ap = {"tipo_apuesta": tipo, "prediccion": pred,
+          "puntos_apostados": rnd.choice(OPCIONES_APUESTA + [0, 1, 100])}
+    return ap, partido
+
+
+def comprobar(casos: int, tam: int, semilla: int) -> list:
+    """Devuelve las discrepancias (vacío si el kernel equivale al cálculo escalar)."""
+    gestor = GestorLiga.__new__(GestorLiga)
+    rnd    = random.Random(semilla)
+    fallos = []
+    for caso in range(casos):
+        lote = [apuesta_aleatoria(rnd) for _ in range(rnd.randint(0, tam))]
+        df   = pd.DataFrame([{**ap, **p} for ap, p in lote],
+                            columns=["tipo_apuesta", "prediccion", "puntos_apostados",
+                                     "estado", "goles_local", "goles_visitante"])
+        res  = puntuar_apuestas(df)
+        for i, (ap, p) in enumerate(lote):
+            esperado = (gestor._acerto_apuesta(ap, p), gestor._puntos_obtenidos(ap, p),
+                        gestor._calcular_puntos_netos(ap, p))
+            acerto   = res["acerto"].iloc[i]
+            obtenido = (None if pd.isna(acerto) else bool(acerto),
+                        int(res["puntos_obtenidos"].iloc[i]), int(res["puntos_netos"].iloc[i]))
+            if obtenido != esperado:
+                fallos.append({"caso": caso, "apuesta": ap, "partido": p,
+                               "esperado": esperado, "obtenido": obtenido})
+    return fallos
+
+
+def medir(filas: int, semilla: int) -> dict:
+    rnd   = np.random.default_rng(semilla)
+    tipos = np.array(list(REGLAS), dtype=object)
+    preds = {"resultado": ["1", "X", "2"], "goles_total": ["bajo", "alto"],
+             "marcador": [f"{a}-{b}" for a in range(5) for b in range(5)]}
+    tipo  = tipos[rnd.integers(0, len(tipos), filas)]
+    pred  = np.empty(filas, dtype=object)
+    for t, ps in preds.items():
+        m = tipo == t
+        pred[m] = np.array(ps, dtype=object)[rnd.integers(0, len(ps), m.sum())]
+    # Como en ``marco_apuestas``: goles enteros con NaN para los partidos sin resultado
+    goles = rnd.integers(0, 5, (2, filas)).astype(float)
+    goles[:, rnd.random(filas) < 0.05] = np.nan
+    df = pd.DataFrame({
+        "tipo_apuesta":     pd.array(tipo, dtype="str"),
+        "prediccion":       pd.array(pred, dtype="str"),
+        "puntos_apostados": np.array(OPCIONES_APUESTA)[rnd.integers(0, len(OPCIONES_APUESTA), filas)],
+        "estado":           pd.array(np.where(rnd.random(filas) < 0.9, "finalizado", "programado"), dtype="str"),
+        "goles_local":      goles[0],
+        "goles_visitante":  goles[1],
+    })
+    t0  = time.perf_counter()
+    res = puntuar_apuestas(df)
+    return {
+        "filas":    filas,
+        "segundos": round(time.perf_counter() - t0, 4),
+        "aciertos": int(res["acerto"].sum()),
+        "puntos_netos": int(res["puntos_netos"].sum()),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--casos", type=int, default=200, help="lotes aleatorios a comparar")
+    ap.add_argument("--tam", type=int, default=200, help="tamaño máximo de cada lote")
+    ap.add_argument("--filas", type=int, default=1_000_000)
+    ap.add_argument("--semilla", type=int, default=1)
+    args = ap.parse_args()
+
+    fallos = comprobar(args.casos, args.tam, args.semilla)
+    print(json.dumps({
+        "equivalencia": {"casos": args.casos, "discrepancias": len(fallos), "ejemplos": fallos[:5]},
+        "rendimiento":  medir(args.filas, args.semilla),
+    }, indent=2, ensure_ascii=False, default=str))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
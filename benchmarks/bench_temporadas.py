@@ -0,0 +1,86 @@
+"""
+Coste de las consultas de temporada con histórico acumulado
+===========================================================
+Carga en SQLite la temporada en curso con 0, 1, … ``--pasadas`` temporadas
+anteriores ya jugadas y liquidadas y mide las lecturas calientes de la
+temporada en curso (clasificación, tabla de usuarios con saldo, saldo por
+usuario, jornadas) y su liquidación y recálculo. Con los índices de
+``supabase/migrations/20261017000500_indices_temporada.sql`` (los mismos que
+crea ``backend_sqlite``) el tiempo no debe crecer con el histórico, y los
+resultados de la temporada en curso deben ser idénticos.
+
+    python -m benchmarks.bench_temporadas --usuarios 200 --pasadas 3
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, TEMPORADA
+from backend_sqlite import ClienteSQLite
+from benchmarks.datos_liga import generar_temporadas
+
+TABLAS = ["equipos", "jornadas", "usuarios", "partidos", "puntajes", "apuestas", "movimientos_puntos"]
+
+
+def medir(gestor: GestorLiga, fn, repeticiones: int = 3):
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        gestor.cache.limpiar()
+        t0 = time.perf_counter()
+        resultado = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return round(mejor * 1000, 2), resultado
+
+
+def escenario(args, pasadas: int) -> dict:
+    datos   = generar_temporadas(pasadas, args.usuarios, args.densidad, args.jornadas_jugadas)
+    cliente = ClienteSQLite(":memory:")
+    for tabla in TABLAS:
+        cliente.table(tabla).insert(datos[tabla]).execute()
+    cliente.optimizar()
+    gestor  = GestorLiga(cliente)
+    for jornada in range(1, args.jornadas_jugadas):
+        gestor.procesar_jornada(jornada, TEMPORADA)
+
+    usuarios = [u["id"] for u in datos["usuarios"][:50]]
+    ms, huella = {}, {}
+    ms["procesar_jornada"], _ = medir(gestor, lambda: gestor.procesar_jornada(args.jornadas_jugadas, TEMPORADA), 1)
+    ms["obtener_clasificacion"], r = medir(gestor, lambda: gestor.obtener_clasificacion(TEMPORADA))
+    huella["clasificacion"] = [(p["usuario_id"], p["puntos_totales"]) for p in r]
+    ms["clasificacion_usuarios"], r = medir(gestor, lambda: gestor.clasificacion_usuarios(TEMPORADA))
+    huella["tabla"] = [(f["usuario"]["id"], f["disponible"]) for f in r]
+    ms["saldo_usuario_x50"], r = medir(gestor, lambda: [gestor.saldo_usuario(u, TEMPORADA) for u in usuarios])
+    huella["saldos"] = r
+    ms["listar_jornadas"], r = medir(gestor, lambda: gestor.listar_jornadas(TEMPORADA))
+    huella["jornadas"] = [(j["numero"], j["total_partidos"]) for j in r]
+    ms["recalcular_temporada"], r = medir(gestor, lambda: gestor.recalcular_temporada(TEMPORADA), 1)
+    huella["recalculo"] = (r["apuestas_revisadas"], r["usuarios_corregidos"])
+    return {"pasadas": pasadas, "apuestas": len(datos["apuestas"]), "ms": ms, "huella": huella}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=200)
+    ap.add_argument("--densidad", type=float, default=0.3)
+    ap.add_argument("--jornadas-jugadas", type=int, default=10)
+    ap.add_argument("--pasadas", type=int, default=3)
+    args = ap.parse_args()
+
+    resultados = [escenario(args, k) for k in range(args.pasadas + 1)]
+    base   = resultados[0]["huella"]
+    fallos = [f"{r['pasadas']} temporadas pasadas: cambia {clave}"
+              for r in resultados[1:] for clave in base if r["huella"][clave] != base[clave]]
+    for r in resultados:
+        del r["huella"]
+    print(json.dumps({"resultados": resultados, "fallos": fallos}, indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Comprobación de los avisos de cambios (``avisos.py``)
+=====================================================
+Dos gestores sobre el mismo backend y el mismo ``BusAvisos``: el de la app,
+con caché larga, y el del cron / trabajador, que escribe. Tras cada evento
+``--sesiones`` sesiones refrescan ``--refrescos`` veces las páginas en vivo
+(partidos y apuestas de la jornada abierta, jornadas, dashboard,
+clasificación y saldo), y se comprueba que:
+
+1. tras ``actualizar_resultado`` sobre la jornada abierta las lecturas ya
+   traen el resultado nuevo sin ningún viaje a la base de datos (la caché se
+   parchea, no se recarga);
+2. tras ``procesar_jornada`` las lecturas coinciden con las de un gestor sin
+   caché, y solo se recargan las de la temporada liquidada;
+3. los viajes por evento no dependen de ``--refrescos``: solo el primer
+   refresco tras el aviso va a la base de datos;
+4. un usuario nuevo y sus apuestas, escritos por el otro gestor, se ven en
+   el acto (invalidación difundida) sin relanzar las páginas abiertas.
+
+    python -m benchmarks.check_avisos --backend sqlite --sesiones 50 --refrescos 5
+"""
+
+import argparse
+import json
+import sys
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import CacheLecturas, GestorLiga, TEMPORADA
+from avisos import BusAvisos
+from benchmarks.check_sincronizacion import cliente_datos
+from benchmarks.datos_liga import generar_liga
+from instrumentacion import Instrumentacion
+
+
+class _Contador(Instrumentacion):
+    """Instrumentación que solo cuenta los viajes a la base de datos."""
+
+    def __init__(self):
+        super().__init__(activa=True)
+        self.viajes = 0
+
+    def registrar(self, *args, **kwargs):
+        self.viajes += 1
+
+
+def lecturas(gestor: GestorLiga, usuario_id: int, jornada_id: int) -> dict:
+    """Lo que pinta una sesión de las páginas en vivo."""
+    return {
+        "partidos":      gestor.obtener_partidos_jornada(jornada_id),
+        "apuestas":      gestor.apuestas_usuario_jornada(usuario_id, jornada_id),
+        "jornadas":      gestor.listar_jornadas(TEMPORADA),
+        "dashboard":     gestor.resumen_dashboard(TEMPORADA),
+        "clasificacion": gestor.obtener_clasificacion(TEMPORADA),
+        "saldo":         gestor.saldo_usuario(usuario_id, TEMPORADA),
+    }
+
+
+def refrescar(app: GestorLiga, contador: _Contador, usuarios: list, jornada_id: int,
+              refrescos: int) -> list:
+    """Viajes de cada ronda de refrescos de todas las sesiones."""
+    viajes = []
+    for _ in range(refrescos):
+        antes = contador.viajes
+        for u in usuarios:
+            lecturas(app, u, jornada_id)
+        viajes.append(contador.viajes - antes)
+    return viajes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=["fake", "sqlite"], default="fake")
+    ap.add_argument("--usuarios", type=int, default=100)
+    ap.add_argument("--sesiones", type=int, default=30)
+    ap.add_argument("--refrescos", type=int, default=5)
+    ap.add_argument("--jornadas-jugadas", type=int, default=4)
+    args = ap.parse_args()
+
+    jugadas = args.jornadas_jugadas
+    cliente = cliente_datos(args.backend, generar_liga(args.usuarios, jornadas_jugadas=jugadas))
+    bus     = BusAvisos()
+    contador = _Contador()
+    app     = GestorLiga(cliente, cache=CacheLecturas(ttl=3600), instr=contador, avisos=bus)
+    cron    = GestorLiga(cliente, avisos=bus)
+    for j in range(1, jugadas):
+        cron.procesar_jornada(j, TEMPORADA)
+
+    abierta  = app.obtener_jornada(jugadas + 1, TEMPORADA)["id"]
+    usuarios = [u["id"] for u in app.listar_usuarios()[:args.sesiones]]
+    sesiones = len(usuarios)
+    fallos   = []
+
+    def frescas(evento: str):
+        referencia = GestorLiga(cliente, avisos=BusAvisos())
+        distintas  = {k for u in usuarios
+                      for k, v in lecturas(app, u, abierta).items()
+                      if v != lecturas(referencia, u, abierta)[k]}
+        if distintas:
+            fallos.append(f"{evento}: lecturas desfasadas en {sorted(distintas)}")
+
+    carga = refrescar(app, contador, usuarios, abierta, 1)[0]
+
+    # 1. Resultados de la jornada abierta, escritos por el cron
+    partidos = [p["id"] for p in app.obtener_partidos_jornada(abierta)[:3]]
+    version  = bus.version
+    for i, pid in enumerate(partidos):
+        cron.actualizar_resultado(pid, i, 1)
+    if bus.version - version != len(partidos):
+        fallos.append(f"resultados: {bus.version - version} avisos, esperados {len(partidos)}")
+    viajes_resultados = refrescar(app, contador, usuarios, abierta, args.refrescos)
+    if any(viajes_resultados):
+        fallos.append(f"resultados: viajes por refresco {viajes_resultados}, esperados 0")
+    frescas("resultados")
+
+    # 2. Liquidación de la última jornada jugada
+    cron.procesar_jornada(jugadas, TEMPORADA)
+    viajes_liquidacion = refrescar(app, contador, usuarios, abierta, args.refrescos)
+    if any(viajes_liquidacion[1:]):
+        fallos.append(f"liquidación: viajes por refresco {viajes_liquidacion}, "
+                      f"esperados solo en el primero")
+    if viajes_liquidacion[0] >= carga:
+        fallos.append(f"liquidación: {viajes_liquidacion[0]} viajes, tantos como la carga "
+                      f"inicial ({carga}): se recarga más de lo afectado")
+    frescas("liquidación")
+
+    # 3. Usuario nuevo y apuestas desde el otro gestor
+    version = bus.version
+    nuevo   = cron.insertar_usuario("Avisos", "Otro proceso")["id"]
+    if nuevo not in {u["id"] for u in app.listar_usuarios()}:
+        fallos.append("usuario nuevo: no aparece en listar_usuarios")
+    usuarios.append(nuevo)
+    lecturas(app, nuevo, abierta)
+    cron.hacer_apuestas(nuevo, [{"partido_id": p, "tipo_apuesta": "resultado", "prediccion": "1",
+                                 "puntos_apostados": 10} for p in partidos[:2]], temporada=TEMPORADA)
+    cron.hacer_apuesta(nuevo, partidos[2], "resultado", "2", 5, temporada=TEMPORADA)
+    frescas("apuestas")
+    if bus.version != version:
+        fallos.append(f"apuestas: {bus.version - version} avisos relanzan las páginas")
+
+    lecturas_sesion = len(lecturas(app, usuarios[0], abierta))
+    print(json.dumps({
+        "backend": args.backend, "sesiones": sesiones, "refrescos": args.refrescos,
+        "viajes": {"carga_inicial": carga, "tras_resultados": viajes_resultados,
+                   "tras_liquidacion": viajes_liquidacion,
+                   "sin_cache_por_evento": sesiones * args.refrescos * lecturas_sesion},
+        "cache": app.cache.estadisticas(), "fallos": fallos,
+    }, indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Comprobación del boleto de la jornada (``validar_boleto`` + ``hacer_apuestas``)
+===============================================================================
+Sobre una temporada sintética, un usuario nuevo (100 pts) rellena boletos de
+la jornada 12 y se comprueba en el backend elegido que:
+
+1. un boleto que supera el saldo se rechaza en la validación y, enviado
+   igualmente, no escribe ninguna apuesta (todo o nada);
+2. un boleto válido entra completo con un solo viaje, y reenviarlo con la
+   misma clave no lo aplica dos veces;
+3. reemplazar apuestas libera sus puntos y las que no cambian no se envían;
+4. validar y enviar cuesta los mismos viajes con 3 apuestas que con 20
+   (solo se cuentan con el cliente falso).
+
+    python -m benchmarks.check_boleto --backend sqlite
+"""
+
+import argparse
+import json
+import sys
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, REGLAS, TEMPORADA
+from benchmarks.check_sincronizacion import cliente_datos
+from benchmarks.datos_liga import generar_liga
+
+JORNADA = 12
+
+
+def boleto(partidos: list, tipos: list, puntos: int, prediccion=None) -> list:
+    por_defecto = {"resultado": "1", "marcador": "1-0", "goles_total": "alto"}
+    return [{"partido_id": p, "tipo_apuesta": t, "prediccion": prediccion or por_defecto[t],
+             "puntos_apostados": puntos} for p in partidos for t in tipos]
+
+
+def viajes_envio(gestor: GestorLiga, sb, usuario_id: int, apuestas: list) -> int:
+    """Viajes de validar (caché fría) y enviar un boleto; None si el cliente no los cuenta."""
+    if not hasattr(sb, "viajes"):
+        return None
+    gestor.cache.limpiar()
+    sb.reiniciar_contadores()
+    informe = gestor.validar_boleto(usuario_id, JORNADA, apuestas, TEMPORADA)
+    gestor.hacer_apuestas(usuario_id, informe["apuestas"], temporada=TEMPORADA)
+    return sb.viajes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=["fake", "sqlite"], default="fake")
+    ap.add_argument("--usuarios", type=int, default=20)
+    args = ap.parse_args()
+
+    sb       = cliente_datos(args.backend, generar_liga(args.usuarios, jornadas_jugadas=10))
+    gestor   = GestorLiga(sb)
+    usuario  = gestor.insertar_usuario("Boleto", "Comprobación")["id"]
+    partidos = [p["id"] for p in gestor.obtener_partidos_jornada(JORNADA)]
+    fallos   = []
+
+    def apuestas_usuario() -> list:
+        return sorted((a["partido_id"], a["tipo_apuesta"], a["prediccion"], a["puntos_apostados"])
+                      for a in gestor.apuestas_usuario_jornada(usuario, JORNADA))
+
+    # 1. Boleto por encima del saldo: 10 partidos × 3 tipos × 5 pts = 150 > 100
+    excesivo = boleto(partidos, list(REGLAS), 5)
+    informe  = gestor.validar_boleto(usuario, JORNADA, excesivo, TEMPORADA)
+    if not any("saldo insuficiente" in e["error"] for e in informe["errores"]):
+        fallos.append(f"la validación acepta un boleto de {informe['coste']} pts")
+    try:
+        gestor.hacer_apuestas(usuario, excesivo, temporada=TEMPORADA)
+        fallos.append("hacer_apuestas acepta un boleto sin saldo")
+    except ValueError:
+        pass
+    if apuestas_usuario():
+        fallos.append("el boleto rechazado dejó apuestas escritas")
+
+    # 2. Boleto válido (10 × 5 pts) y reenvío con la misma clave
+    valido   = boleto(partidos, ["resultado"], 5)
+    escritas = gestor.hacer_apuestas(usuario, valido, "clave-boleto", TEMPORADA)
+    repetido = gestor.hacer_apuestas(usuario, valido, "clave-boleto", TEMPORADA)
+    if len(escritas) != len(valido) or sorted(a["id"] for a in repetido) != sorted(a["id"] for a in escritas):
+        fallos.append(f"boleto válido: {len(escritas)} escritas, reenvío {len(repetido)}")
+    saldo = gestor.saldo_usuario(usuario, TEMPORADA)
+    if saldo["comprometidos"] != 50:
+        fallos.append(f"comprometidos {saldo['comprometidos']} tras el boleto (esperado 50)")
+
+    # 3. Reemplazo: 10 × 10 pts (neto +50) y validación sin cambios
+    cambio  = boleto(partidos, ["resultado"], 10, "2")
+    informe = gestor.validar_boleto(usuario, JORNADA, cambio, TEMPORADA)
+    if informe["errores"] or informe["coste"] != 50:
+        fallos.append(f"reemplazo: coste {informe['coste']}, errores {informe['errores']}")
+    gestor.hacer_apuestas(usuario, informe["apuestas"], temporada=TEMPORADA)
+    informe = gestor.validar_boleto(usuario, JORNADA, cambio, TEMPORADA)
+    if informe["apuestas"] or informe["sin_cambios"] != len(cambio):
+        fallos.append(f"sin cambios: {len(informe['apuestas'])} apuestas a enviar")
+    if gestor.saldo_usuario(usuario, TEMPORADA)["disponible"] != 0:
+        fallos.append("el reemplazo no deja el saldo disponible a 0")
+
+    # 4. Viajes constantes con el tamaño del boleto (usuarios nuevos, saldo suficiente)
+    pequeño = gestor.insertar_usuario("Boleto", "Pequeño")["id"]
+    grande  = gestor.insertar_usuario("Boleto", "Grande")["id"]
+    viajes  = {"3_apuestas":  viajes_envio(gestor, sb, pequeño, boleto(partidos[:1], list(REGLAS), 5)),
+               "20_apuestas": viajes_envio(gestor, sb, grande, boleto(partidos, list(REGLAS), 5)[:20])}
+    if viajes["3_apuestas"] is not None and viajes["3_apuestas"] != viajes["20_apuestas"]:
+        fallos.append(f"los viajes crecen con el boleto: {viajes}")
+
+    print(json.dumps({"backend": args.backend, "viajes_validar_y_enviar": viajes,
+                      "apuestas": len(apuestas_usuario()), "fallos": fallos},
+                     indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Comprobación del libro de puntos (``movimientos_puntos``)
+=========================================================
+Sobre una temporada sintética con ``--jornadas-jugadas`` jornadas con
+resultado, liquida todas menos la última, coloca y reemplaza apuestas de la
+jornada abierta con usuarios nuevos y comprueba en el backend elegido que:
+
+1. ``comprometidos`` de cada puntaje es la suma de sus apuestas sin liquidar;
+2. cada apuesta liquidada tiene exactamente un movimiento ``liquidacion`` y
+   las pendientes ninguno;
+3. ``reconstruir_puntajes`` no corrige nada (la proyección cuadra con el
+   libro) y ``recalcular_temporada`` tampoco (el libro cuadra con las
+   apuestas);
+4. leer el saldo cuesta un viaje y una fila, con ``--usuarios`` y con diez
+   veces más (viajes con el cliente falso; tiempos con SQLite);
+5. dos hilos que liquidan a la vez la última jornada sobre un fichero SQLite
+   dejan los mismos puntajes y foto de la clasificación que una sola
+   liquidación;
+6. si un partido ya liquidado deja de estar finalizado, ``recalcular_temporada``
+   deja de contar sus apuestas como jugadas (ni acierto ni fallo) y una
+   segunda auditoría no corrige nada.
+
+    python -m benchmarks.check_libro --backend sqlite --usuarios 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, TEMPORADA
+from backend_sqlite import ClienteSQLite
+from benchmarks.check_liquidacion import _copiar, _foto
+from benchmarks.check_sincronizacion import cliente_datos
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+
+
+def cuadre(gestor: GestorLiga) -> list:
+    """Fallos de las comprobaciones 1-3 sobre el estado actual del backend."""
+    fallos   = []
+    apuestas = list(gestor._paginar(lambda: gestor.sb.table("apuestas").select("*")))
+    liquidaciones: dict = {}
+    for m in gestor._paginar(lambda: (gestor.sb.table("movimientos_puntos")
+                                      .select("id, apuesta_id")
+                                      .eq("tipo", "liquidacion"))):
+        liquidaciones[m["apuesta_id"]] = liquidaciones.get(m["apuesta_id"], 0) + 1
+
+    pendientes: dict = {}
+    mal_liquidadas = 0
+    for a in apuestas:
+        if a["puntos_obtenidos"] is None:
+            pendientes[a["usuario_id"]] = pendientes.get(a["usuario_id"], 0) + a["puntos_apostados"]
+        mal_liquidadas += liquidaciones.get(a["id"], 0) != (a["puntos_obtenidos"] is not None)
+    if mal_liquidadas:
+        fallos.append(f"{mal_liquidadas} apuestas sin exactamente un movimiento de liquidación")
+
+    puntajes = list(gestor._paginar(
+        lambda: gestor.sb.table("puntajes").select("*").eq("temporada", TEMPORADA)))
+    descuadres = sum(p["comprometidos"] != pendientes.get(p["usuario_id"], 0) for p in puntajes)
+    if descuadres:
+        fallos.append(f"{descuadres} puntajes con comprometidos distintos de sus apuestas pendientes")
+
+    reconstruccion = gestor.reconstruir_puntajes(TEMPORADA)
+    if reconstruccion["corregidos"]:
+        fallos.append(f"reconstruir_puntajes corrige {reconstruccion['corregidos']} puntajes")
+    recalculo = gestor.recalcular_temporada(TEMPORADA)
+    if recalculo["usuarios_corregidos"] or recalculo["apuestas_corregidas"]:
+        fallos.append(f"recalcular_temporada corrige {recalculo['usuarios_corregidos']} usuarios")
+    return fallos
+
+
+def saldo_constante(usuarios: int, jornadas: int) -> dict:
+    """Viajes y filas (cliente falso) y milisegundos (SQLite) de una lectura de saldo."""
+    medidas = {}
+    for n in (usuarios, usuarios * 10):
+        datos  = generar_liga(n, jornadas_jugadas=jornadas)
+        falso  = ClienteFalso(datos)
+        gestor = GestorLiga(falso)
+        falso.reiniciar_contadores()
+        saldo  = gestor.sb.rpc("saldo_usuario", {"p_usuario_id": n,
+                                                 "p_temporada": TEMPORADA}).execute().data
+
+        sqlite = cliente_datos("sqlite", datos)
+        tiempos = []
+        for u in range(1, min(n, 200) + 1):
+            t0 = time.perf_counter()
+            sqlite.rpc("saldo_usuario", {"p_usuario_id": u, "p_temporada": TEMPORADA}).execute()
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        medidas[n] = {"apuestas": len(datos["apuestas"]), "viajes": falso.viajes, "filas": len(saldo),
+                      "ms_sqlite": round(statistics.median(tiempos), 3)}
+    return medidas
+
+
+def concurrencia(datos: dict, jornada: int) -> list:
+    """Comprobación 5: dos liquidaciones simultáneas frente a una sola."""
+    fallos = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.db")
+        cliente = ClienteSQLite(base)
+        for tabla in ["equipos", "jornadas", "usuarios", "partidos", "puntajes", "apuestas",
+                      "movimientos_puntos"]:
+            cliente.table(tabla).insert(datos[tabla]).execute()
+        for j in range(1, jornada):
+            GestorLiga(cliente).procesar_jornada(j, TEMPORADA)
+
+        referencia = os.path.join(tmp, "referencia.db")
+        _copiar(base, referencia)
+        gestor = GestorLiga(ClienteSQLite(referencia))
+        gestor.procesar_jornada(jornada, TEMPORADA)
+        esperado = _foto(gestor, jornada)
+
+        salida  = threading.Barrier(2)
+        errores = []
+
+        def liquidar():
+            gestor = GestorLiga(cliente)
+            salida.wait()
+            try:
+                gestor.procesar_jornada(jornada, TEMPORADA)
+            except Exception as e:
+                errores.append(repr(e))
+
+        hilos = [threading.Thread(target=liquidar) for _ in range(2)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        fallos += [f"liquidación concurrente: {e}" for e in errores]
+
+        gestor = GestorLiga(cliente)
+        foto   = _foto(gestor, jornada)
+        for clave in ("puntajes", "clasificacion"):
+            if foto[clave] != esperado[clave]:
+                fallos.append(f"liquidación concurrente: {clave} distintos de una sola liquidación")
+        fallos += [f"liquidación concurrente: {f}" for f in cuadre(gestor)]
+    return fallos
+
+
+def no_evaluables(backend: str, usuarios: int, jornada: int) -> list:
+    """Comprobación 6, sobre una liga nueva."""
+    gestor = GestorLiga(cliente_datos(backend, generar_liga(usuarios, jornadas_jugadas=jornada)))
+    for j in range(1, jornada):
+        gestor.procesar_jornada(j, TEMPORADA)
+    aplazado = gestor.obtener_partidos_jornada(1)[0]["id"]
+    gestor.sb.table("partidos").update({"estado": "aplazado"}).eq("id", aplazado).execute()
+    gestor.recalcular_temporada(TEMPORADA, aplicar=True)
+
+    jugadas: dict = {}
+    for a in gestor._paginar(lambda: gestor.sb.table("apuestas").select("*").gte("puntos_obtenidos", 0)):
+        if a["partido_id"] != aplazado:
+            jugadas[a["usuario_id"]] = jugadas.get(a["usuario_id"], 0) + 1
+    puntajes = list(gestor._paginar(
+        lambda: gestor.sb.table("puntajes").select("*").eq("temporada", TEMPORADA)))
+    mal = sum(p["partidos_apostados"] != jugadas.get(p["usuario_id"], 0)
+              or p["aciertos"] + p["fallos"] != p["partidos_apostados"] for p in puntajes)
+    fallos = [f"no evaluables: {mal} puntajes cuentan apuestas de un partido sin finalizar"] if mal else []
+    recalculo = gestor.recalcular_temporada(TEMPORADA)
+    if recalculo["usuarios_corregidos"] or recalculo["apuestas_corregidas"]:
+        fallos.append(f"no evaluables: una segunda auditoría corrige {recalculo['usuarios_corregidos']} usuarios")
+    return fallos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=["fake", "sqlite"], default="fake")
+    ap.add_argument("--usuarios", type=int, default=100)
+    ap.add_argument("--jornadas-jugadas", type=int, default=4)
+    args = ap.parse_args()
+
+    jornada = args.jornadas_jugadas
+    datos   = generar_liga(args.usuarios, jornadas_jugadas=jornada)
+    gestor  = GestorLiga(cliente_datos(args.backend, datos))
+    for j in range(1, jornada):
+        gestor.procesar_jornada(j, TEMPORADA)
+
+    # Usuarios nuevos (100 pts) apuestan y reemplazan apuestas en la jornada abierta
+    partidos = [p["id"] for p in gestor.obtener_partidos_jornada(jornada + 1)]
+    fallos   = []
+    for i in range(10):
+        u = gestor.insertar_usuario("Libro", f"Comprobación {i}")["id"]
+        gestor.hacer_apuestas(u, [{"partido_id": p, "tipo_apuesta": "resultado", "prediccion": "1",
+                                   "puntos_apostados": 10} for p in partidos[:3]], temporada=TEMPORADA)
+        gestor.hacer_apuesta(u, partidos[0], "resultado", "2", 20 + i, temporada=TEMPORADA)
+        try:
+            gestor.hacer_apuesta(u, partidos[1], "marcador", "1-0", 100, temporada=TEMPORADA)
+            fallos.append(f"usuario {u}: se acepta una apuesta sin saldo")
+        except ValueError:
+            pass
+        if gestor.saldo_usuario(u, TEMPORADA)["disponible"] != 100 - 40 - i:
+            fallos.append(f"usuario {u}: saldo {gestor.saldo_usuario(u, TEMPORADA)}")
+
+    fallos += cuadre(gestor)
+
+    t0 = time.perf_counter()
+    reconstruccion = gestor.reconstruir_puntajes(TEMPORADA)
+    ms_reconstruir = round((time.perf_counter() - t0) * 1000, 1)
+
+    saldo = saldo_constante(args.usuarios, jornada)
+    for n, m in saldo.items():
+        if (m["viajes"], m["filas"]) != (1, 1):
+            fallos.append(f"saldo con {n} usuarios: {m['viajes']} viajes, {m['filas']} filas")
+
+    fallos += concurrencia(datos, jornada)
+    fallos += no_evaluables(args.backend, args.usuarios, jornada)
+
+    print(json.dumps({"backend": args.backend, "usuarios": args.usuarios,
+                      "reconstruccion": {**reconstruccion, "ms": ms_reconstruir},
+                      "saldo": saldo, "fallos": fallos}, indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Comprobación de la liquidación en segundo plano ante caídas del trabajador
+==========================================================================
+Sobre una temporada sintética en SQLite (fichero) con ``--jornadas-jugadas``
+jornadas, liquida las anteriores a la última y encola la última
+(``encolar_liquidacion``). Después, para cada ``n`` de 1 al número de viajes
+de una ejecución completa:
+
+1. lanza un trabajador en otro proceso que muere (``os._exit``) justo
+   después de su viaje ``n`` a la base de datos;
+2. un trabajador nuevo retoma el trabajo (caducidad inmediata) y lo termina;
+3. comprueba que el trabajo queda ``completado``, que no quedan apuestas
+   pendientes, que puntajes y foto de la clasificación coinciden con los de
+   ``procesar_jornada`` sobre una copia, y que ``recalcular_temporada`` no
+   encuentra nada que corregir: cada apuesta se cuenta exactamente una vez.
+
+    python -m benchmarks.check_liquidacion --usuarios 40 --tam-bloque 50
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, TEMPORADA
+from backend_sqlite import ClienteSQLite
+from benchmarks.datos_liga import generar_liga
+from instrumentacion import Instrumentacion
+from trabajador_liquidacion import TrabajadorLiquidacion
+
+SALIDA_MUERTO = 86   # código con el que sale el trabajador al que se "mata"
+
+
+class _Verdugo(Instrumentacion):
+    """Instrumentación que termina el proceso tras el viaje número ``tras`` (0: nunca)."""
+
+    def __init__(self, tras: int):
+        super().__init__(activa=True)
+        self.tras   = tras
+        self.viajes = 0
+
+    def registrar(self, *args, **kwargs):
+        self.viajes += 1
+        if self.viajes == self.tras:
+            os._exit(SALIDA_MUERTO)
+
+
+def _copiar(origen: str, destino: str):
+    """Copia la base con la API de backup (el fichero solo no incluye lo que está en el WAL)."""
+    with sqlite3.connect(origen) as src, sqlite3.connect(destino) as dst:
+        src.backup(dst)
+
+
+def _gestor(ruta: str, instr=None) -> GestorLiga:
+    return GestorLiga(ClienteSQLite(ruta), instr=instr)
+
+
+def _foto(gestor: GestorLiga, jornada_id: int) -> dict:
+    puntajes = gestor.sb.table("puntajes").select("*").eq("temporada", TEMPORADA).execute().data
+    fotos    = gestor.sb.table("clasificacion_jornadas").select("*").eq("jornada_id", jornada_id).execute().data
+    return {
+        "puntajes":      sorted((p["usuario_id"], p["puntos_totales"], p["aciertos"], p["fallos"],
+                                 p["partidos_apostados"]) for p in puntajes),
+        "clasificacion": sorted((c["usuario_id"], c["posicion"], c["puntos_totales"], c["delta"])
+                                for c in fotos),
+    }
+
+
+def trabajador(args):
+    """Proceso hijo: reclama y ejecuta un trabajo, muriendo tras ``--matar-tras`` viajes."""
+    instr = _Verdugo(args.matar_tras)
+    TrabajadorLiquidacion(_gestor(args.ruta, instr), tam_bloque=args.tam_bloque,
+                          nombre="condenado").ejecutar_uno()
+    print(instr.viajes)
+
+
+def _lanzar(args, ruta: str, matar_tras: int) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "benchmarks.check_liquidacion", "--trabajador",
+                           "--ruta", ruta, "--matar-tras", str(matar_tras),
+                           "--tam-bloque", str(args.tam_bloque)],
+                          capture_output=True, text=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=40)
+    ap.add_argument("--jornadas-jugadas", type=int, default=3)
+    ap.add_argument("--tam-bloque", type=int, default=50)
+    ap.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--ruta", help=argparse.SUPPRESS)
+    ap.add_argument("--matar-tras", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.trabajador:
+        return trabajador(args)
+
+    jornada = args.jornadas_jugadas
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.db")
+        cliente = ClienteSQLite(base)
+        datos   = generar_liga(args.usuarios, jornadas_jugadas=jornada)
+        for tabla in ["equipos", "jornadas", "usuarios", "partidos", "puntajes", "apuestas",
+                  "movimientos_puntos"]:
+            cliente.table(tabla).insert(datos[tabla]).execute()
+        gestor = _gestor(base)
+        for j in range(1, jornada):
+            gestor.procesar_jornada(j, TEMPORADA)
+
+        referencia = os.path.join(tmp, "referencia.db")
+        _copiar(base, referencia)
+        gestor   = _gestor(referencia)
+        esperado = {"resumen": gestor.procesar_jornada(jornada, TEMPORADA), **_foto(gestor, jornada)}
+        total    = esperado["resumen"]["apuestas_procesadas"]
+
+        # Ejecución completa, sin caídas, para saber cuántos viajes hace
+        gestor = _gestor(base)
+        gestor.encolar_liquidacion(jornada, TEMPORADA)
+        _copiar(base, referencia)
+        completa = _lanzar(args, referencia, 0)
+        viajes   = int(completa.stdout.strip().splitlines()[-1])
+
+        fallos = []
+        for n in range(1, viajes + 1):
+            ruta = os.path.join(tmp, f"caida_{n}.db")
+            _copiar(base, ruta)
+            hijo = _lanzar(args, ruta, n)
+            if hijo.returncode not in (0, SALIDA_MUERTO):
+                fallos.append(f"n={n}: el trabajador falló ({hijo.returncode}): {hijo.stderr[-300:]}")
+                continue
+
+            gestor  = _gestor(ruta)
+            TrabajadorLiquidacion(gestor, tam_bloque=args.tam_bloque, caducidad_seg=-1,
+                                  nombre="rescate").ejecutar_pendientes()
+            estados = [t["estado"] for t in gestor.trabajos_liquidacion(TEMPORADA)]
+            if estados != ["completado"]:
+                fallos.append(f"n={n}: trabajos en estado {estados}")
+            resumen = next((t["resumen"] for t in gestor.trabajos_liquidacion(TEMPORADA)), None)
+            if resumen != esperado["resumen"]:
+                fallos.append(f"n={n}: resumen {resumen}, esperado {esperado['resumen']}")
+            pendientes = list(gestor._apuestas_pendientes_jornada(jornada))
+            if pendientes:
+                fallos.append(f"n={n}: {len(pendientes)} apuestas sin liquidar")
+            foto = _foto(gestor, jornada)
+            for clave in ("puntajes", "clasificacion"):
+                if foto[clave] != esperado[clave]:
+                    fallos.append(f"n={n}: {clave} distintos de los de procesar_jornada")
+            recalculo = gestor.recalcular_temporada(TEMPORADA)
+            if recalculo["usuarios_corregidos"] or recalculo["apuestas_corregidas"]:
+                fallos.append(f"n={n}: recalcular_temporada corrige "
+                              f"{recalculo['usuarios_corregidos']} usuarios")
+            os.remove(ruta)
+
+    print(json.dumps({"usuarios": args.usuarios, "jornada": jornada, "apuestas": total,
+                      "tam_bloque": args.tam_bloque, "viajes_trabajador": viajes,
+                      "fallos": fallos}, indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Comprobación de la paginación por keyset frente al tope de PostgREST
+====================================================================
+Carga una temporada sintética con más de ``TAM_PAGINA`` usuarios y apuestas
+por jornada en clientes falsos: uno sin tope y uno por cada ``--max-filas``
+que recorta cada select a ese número de filas, como el ``max-rows`` de
+Supabase (por defecto igual a ``TAM_PAGINA`` y menor que él). Liquida las
+jornadas jugadas en todos y comprueba que puntajes, clasificación, usuarios
+e historial de apuestas coinciden (ninguna fila se pierde tras la primera
+página, ni aunque las páginas lleguen recortadas).
+
+    python -m benchmarks.check_paginacion --usuarios 1200 --max-filas 1000 400
+"""
+
+import argparse
+import copy
+import json
+import sys
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+from app import GestorLiga, TAM_PAGINA, TEMPORADA
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+
+
+def recorrer(datos: dict, jornadas: int, max_filas) -> dict:
+    cliente  = ClienteFalso(copy.deepcopy(datos), max_filas=max_filas)
+    gestor   = GestorLiga(cliente)
+    resumenes = [gestor.procesar_jornada(j, TEMPORADA) for j in range(1, jornadas + 1)]
+    usuario  = datos["usuarios"][-1]["id"]
+    return {
+        "resumenes":     resumenes,
+        "puntajes":      sorted((p["usuario_id"], p["puntos_totales"], p["aciertos"], p["fallos"])
+                                for p in cliente.tablas["puntajes"]),
+        "pendientes":    sum(1 for a in cliente.tablas["apuestas"] if a["puntos_obtenidos"] is None),
+        "clasificacion": [p["usuario_id"] for p in gestor.obtener_clasificacion(TEMPORADA)],
+        "tabla":         [f["usuario"]["id"] for f in gestor.clasificacion_usuarios(TEMPORADA)],
+        "usuarios":      len(gestor.listar_usuarios()),
+        "historial":     sorted(a["id"] for j in range(1, jornadas + 2)
+                                for a in gestor.apuestas_usuario_jornada(usuario, j)),
+        "viajes":        cliente.viajes,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=1200)
+    ap.add_argument("--densidad", type=float, default=0.3)
+    ap.add_argument("--jornadas-jugadas", type=int, default=3)
+    ap.add_argument("--max-filas", type=int, nargs="+", default=[TAM_PAGINA, TAM_PAGINA * 2 // 5])
+    args = ap.parse_args()
+
+    datos    = generar_liga(args.usuarios, args.densidad, args.jornadas_jugadas)
+    sin_tope = recorrer(datos, args.jornadas_jugadas, None)
+    viajes, fallos = {"sin_tope": sin_tope["viajes"]}, []
+    for max_filas in args.max_filas:
+        con_tope = recorrer(datos, args.jornadas_jugadas, max_filas)
+        viajes[f"max_filas_{max_filas}"] = con_tope["viajes"]
+        fallos += [f"max_filas={max_filas}: {clave}" for clave in sin_tope
+                   if clave != "viajes" and sin_tope[clave] != con_tope[clave]]
+
+    print(json.dumps({
+        "usuarios":           args.usuarios,
+        "apuestas":           len(datos["apuestas"]),
+        "max_filas":          args.max_filas,
+        "apuestas_liquidadas": sum(r["apuestas_procesadas"] for r in sin_tope["resumenes"]),
+        "viajes":             viajes,
+        "fallos":             fallos,
+    }, indent=2, ensure_ascii=False))
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Comprobación sin red de ``GestorLiga.sincronizar_resultados``
+=============================================================
+Sobre una temporada sintética con 10 jornadas jugadas, reproduce las
+respuestas grabadas de la jornada 11 (``fixtures/resultados_jornada_11.json``)
+en tres rondas y comprueba:
+
+1. noche del partido: 8 finalizados y 2 en juego, una sola petición;
+2. día siguiente: los 2 en juego terminan y se corrige un resultado ya
+   liquidado; los 7 sin cambios se descartan por ``lastUpdated``;
+3. repetición: ningún cambio y ninguna escritura.
+
+Después repite las dos primeras rondas con un partido de la jornada 1 sin
+resultado (``fixtures/aplazado_jornada_1.json``), y una tercera cinco días más
+tarde:
+
+1. el partido viejo no retrasa a la jornada 11 (ventanas de la más reciente
+   a la más antigua) y la API lo da por aplazado;
+2. el aplazado ya no ocupa ventana; la petición sobrante lo consulta y queda
+   reprogramado con su nueva fecha;
+3. esa fecha entra en la ventana y el partido se finaliza.
+
+Con ``--liquidar`` además liquida las jornadas y recalcula tras la corrección,
+y comprueba que los puntajes cuadran con el libro de apuestas.
+
+    python -m benchmarks.check_sincronizacion --backend sqlite --liquidar
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from app import GestorLiga, TEMPORADA
+from backend_sqlite import ClienteSQLite
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+from benchmarks.fixtures_football_data import FIXTURE_APLAZADO, FIXTURE_JORNADA_11, SesionGrabada
+from football_data import ClienteFootballData, LimitadorPeticiones
+
+RONDAS = [
+    # (instante de la ejecución, cambios esperados: finalizados, en_juego, corregidos, peticiones)
+    (datetime(2025, 10, 24, 21, 30, tzinfo=timezone.utc), {"finalizados": 8, "en_juego": 2, "corregidos": 0, "peticiones": 1}),
+    (datetime(2025, 10, 25, 10, 0, tzinfo=timezone.utc),  {"finalizados": 2, "en_juego": 0, "corregidos": 1, "peticiones": 1}),
+    (datetime(2025, 10, 25, 12, 0, tzinfo=timezone.utc),  {"finalizados": 0, "en_juego": 0, "corregidos": 0, "peticiones": 1}),
+]
+PARTIDO_APLAZADO = 500000   # primer partido de la jornada 1
+RONDAS_APLAZADO = [
+    (datetime(2025, 10, 24, 21, 30, tzinfo=timezone.utc), {"finalizados": 8, "en_juego": 2, "aplazados": 1, "reprogramados": 0, "peticiones": 2}),
+    (datetime(2025, 10, 25, 10, 0, tzinfo=timezone.utc),  {"finalizados": 2, "corregidos": 1, "aplazados": 0, "reprogramados": 1, "peticiones": 2}),
+    (datetime(2025, 10, 29, 22, 0, tzinfo=timezone.utc),  {"finalizados": 1, "en_juego": 0, "corregidos": 0, "reprogramados": 0, "peticiones": 1}),
+]
+
+
+def cliente_datos(backend: str, datos: dict):
+    if backend == "fake":
+        return ClienteFalso(datos)
+    cliente = ClienteSQLite(":memory:")
+    for tabla in ["equipos", "jornadas", "usuarios", "partidos", "puntajes", "apuestas",
+                  "movimientos_puntos"]:
+        cliente.table(tabla).insert(datos[tabla]).execute()
+    return cliente
+
+
+def comprobar(args, rondas: list, aplazar: bool = False) -> tuple:
+    """Ejecuta ``rondas`` de sincronización; devuelve (peticiones a la API, informes, fallos)."""
+    datos = generar_liga(args.usuarios, jornadas_jugadas=10)
+    if aplazar:
+        for p in datos["partidos"]:
+            if p["id"] == PARTIDO_APLAZADO:
+                p.update(estado="programado", goles_local=None, goles_visitante=None)
+    sb     = cliente_datos(args.backend, datos)
+    sesion = SesionGrabada.desde_fichero(FIXTURE_JORNADA_11, *([FIXTURE_APLAZADO] if aplazar else []))
+    api    = ClienteFootballData("fixture", "https://api.football-data.org/v4", "PD",
+                                 LimitadorPeticiones(10, 60), sesion=sesion)
+    gestor = GestorLiga(sb, api=api)
+    for jornada in range(1, 11):
+        gestor.procesar_jornada(jornada, TEMPORADA)
+
+    caso = "aplazado, " if aplazar else ""
+    fallos, informes = [], []
+    for ronda, (ahora, esperado) in enumerate(rondas, 1):
+        contador = getattr(sb, "viajes_por_tabla", None)   # solo el cliente falso cuenta viajes
+        escrituras_antes = contador["partidos.upsert"] if contador is not None else 0
+        try:
+            informe = gestor.sincronizar_resultados(TEMPORADA, liquidar=args.liquidar, ahora=ahora)
+        except RuntimeError as e:
+            fallos.append(f"{caso}ronda {ronda}: {e}")
+            break
+        informes.append(informe)
+        obtenido = {k: informe[k] for k in esperado}
+        if obtenido != esperado:
+            fallos.append(f"{caso}ronda {ronda}: esperado {esperado}, obtenido {obtenido}")
+        if contador is not None:
+            escrituras = contador["partidos.upsert"] - escrituras_antes
+            if escrituras != (1 if informe["actualizados"] else 0):
+                fallos.append(f"{caso}ronda {ronda}: {escrituras} escrituras en partidos (esperado un lote)")
+
+    if aplazar:
+        partido = sb.table("partidos").select("*").eq("id", PARTIDO_APLAZADO).execute().data[0]
+        if (partido["estado"], partido["goles_local"], partido["goles_visitante"]) != ("finalizado", 2, 1):
+            fallos.append(f"{caso}el partido aplazado queda {partido['estado']}")
+    if args.liquidar:
+        recalculo = gestor.recalcular_temporada(TEMPORADA)
+        if recalculo["usuarios_corregidos"] or recalculo["apuestas_corregidas"]:
+            fallos.append(f"{caso}puntajes descuadrados tras liquidar: "
+                          f"{recalculo['usuarios_corregidos']} usuarios")
+        for jornada in [11, 1] if aplazar else [11]:
+            pendientes = list(gestor._apuestas_pendientes_jornada(jornada))
+            if pendientes:
+                fallos.append(f"{caso}{len(pendientes)} apuestas de la jornada {jornada} sin liquidar")
+
+    if api.peticiones > sum(e["peticiones"] for _, e in rondas):
+        fallos.append(f"{caso}{api.peticiones} peticiones a la API")
+    return api.peticiones, informes, fallos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=["fake", "sqlite"], default="fake")
+    ap.add_argument("--usuarios", type=int, default=50)
+    ap.add_argument("--liquidar", action="store_true")
+    args = ap.parse_args()
+
+    peticiones, informes, fallos = comprobar(args, RONDAS)
+    peticiones_aplazado, informes_aplazado, fallos_aplazado = comprobar(args, RONDAS_APLAZADO, aplazar=True)
+
+    print(json.dumps({"backend": args.backend, "peticiones_api": peticiones, "rondas": informes,
+                      "aplazado": {"peticiones_api": peticiones_aplazado, "rondas": informes_aplazado},
+                      "fallos": fallos + fallos_aplazado}, indent=2, ensure_ascii=False, default=str))
+    sys.exit(1 if fallos or fallos_aplazado else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Datos sintéticos de La Liga para benchmarks
+===========================================
+- ``calendario``: 38 jornadas (ida y vuelta, método del círculo) con los 20
+  equipos demo, en el mismo formato JSON que devuelve football-data.org.
+- ``generar_liga``: las tablas de la base de datos para una temporada
+  completa, con usuarios y apuestas a la densidad que se pida.
+- ``generar_temporadas``: la temporada en curso más temporadas anteriores
+  ya jugadas y liquidadas, para medir con histórico acumulado.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from app import EQUIPOS_DEMO, OPCIONES_APUESTA, PUNTOS_INICIALES, REGLAS, TEMPORADA
+
+EQUIPOS = EQUIPOS_DEMO
+INICIO_TEMPORADA = datetime(2025, 8, 15, 19, 0, tzinfo=timezone.utc)
+
+
+def emparejamientos(ids: List[int]) -> List[List[tuple]]:
+    """Rondas de ida y vuelta para una lista par de equipos."""
+    ids    = list(ids)
+    n      = len(ids)
+    rondas = []
+    for _ in range(n - 1):
+        rondas.append([(ids[i], ids[n - 1 - i]) for i in range(n // 2)])
+        ids = [ids[0], ids[-1]] + ids[1:-1]
+    return rondas + [[(v, l) for l, v in r] for r in rondas]
+
+
+def calendario(competicion: str = "PD", jornadas_jugadas: int = 10, semilla: int = 7) -> List[Dict]:
+    rnd      = random.Random(semilla)
+    partidos = []
+    for matchday, ronda in enumerate(emparejamientos([e["id"] for e in EQUIPOS]), 1):
+        fecha = INICIO_TEMPORADA + timedelta(days=7 * (matchday - 1))
+        for local, visitante in ronda:
+            jugado = matchday <= jornadas_jugadas
+            partidos.append({
+                "id":          500000 + len(partidos),
+                "matchday":    matchday,
+                "utcDate":     fecha.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "lastUpdated": fecha.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status":      "FINISHED" if jugado else "SCHEDULED",
+                "competition": {"code": competicion},
+                "homeTeam":    {"id": local},
+                "awayTeam":    {"id": visitante},
+                "score": {"fullTime": {
+                    "home": rnd.randint(0, 4) if jugado else None,
+                    "away": rnd.randint(0, 4) if jugado else None,
+                }},
+            })
+    return partidos
+
+
+def _prediccion(rnd: random.Random, tipo: str) -> str:
+    if tipo == "resultado":
+        return rnd.choice(["1", "X", "2"])
+    if tipo == "marcador":
+        return f"{rnd.randint(0, 3)}-{rnd.randint(0, 3)}"
+    return rnd.choice(["bajo", "alto"])
+
+
+def generar_liga(usuarios: int = 200, densidad: float = 0.3, jornadas_jugadas: int = 10,
+                 temporada: str = TEMPORADA, semilla: int = 1) -> Dict[str, List[Dict]]:
+    """
+    Tablas de una temporada completa: 20 equipos, 38 jornadas, 380 partidos,
+    ``usuarios`` usuarios con su puntaje inicial, apuestas sin liquidar y el
+    movimiento ``apuesta`` de cada una en el libro de puntos.
+
+    Las ``jornadas_jugadas`` primeras jornadas tienen resultado. Cada usuario
+    apuesta a cada (partido, tipo) con probabilidad ``densidad`` en las
+    jornadas jugadas y en la siguiente (la abierta); en la abierta nadie
+    compromete más de la mitad de sus puntos iniciales.
+    """
+    rnd      = random.Random(semilla)
+    tipos    = list(REGLAS)
+    partidos = []
+    for p in calendario(jornadas_jugadas=jornadas_jugadas, semilla=semilla):
+        goles = p["score"]["fullTime"]
+        partidos.append({
+            "id":                  p["id"],
+            "jornada_id":          p["matchday"],
+            "equipo_local_id":     p["homeTeam"]["id"],
+            "equipo_visitante_id": p["awayTeam"]["id"],
+            "fecha_hora":          p["utcDate"].replace("Z", "+00:00"),
+            "goles_local":         goles["home"],
+            "goles_visitante":     goles["away"],
+            "estado":              "finalizado" if p["status"] == "FINISHED" else "programado",
+        })
+
+    apuestas = []
+    for u in range(1, usuarios + 1):
+        comprometido = 0
+        for p in partidos:
+            if p["jornada_id"] > jornadas_jugadas + 1:
+                continue
+            for tipo in tipos:
+                if rnd.random() >= densidad:
+                    continue
+                puntos = rnd.choice(OPCIONES_APUESTA)
+                if p["estado"] != "finalizado":
+                    if comprometido + puntos > PUNTOS_INICIALES // 2:
+                        continue
+                    comprometido += puntos
+                apuestas.append({
+                    "id":               len(apuestas) + 1,
+                    "usuario_id":       u,
+                    "partido_id":       p["id"],
+                    "tipo_apuesta":     tipo,
+                    "prediccion":       _prediccion(rnd, tipo),
+                    "puntos_apostados": puntos,
+                    "puntos_obtenidos": None,
+                    "fecha_apuesta":    (INICIO_TEMPORADA - timedelta(days=1)).isoformat(),
+                })
+
+    comprometidos: Dict[int, int] = {}
+    for a in apuestas:
+        comprometidos[a["usuario_id"]] = comprometidos.get(a["usuario_id"], 0) + a["puntos_apostados"]
+    jornada_de = {p["id"]: p["jornada_id"] for p in partidos}
+
+    return {
+        "equipos":  [dict(e) for e in EQUIPOS],
+        "jornadas": [{"id": n, "numero": n, "temporada": temporada, "cerrada": n <= jornadas_jugadas}
+                     for n in range(1, 39)],
+        "usuarios": [{"id": u, "nombre": f"Usuario{u:05d}", "apellidos": "Bench",
+                      "fecha_registro": INICIO_TEMPORADA.isoformat(), "activo": True}
+                     for u in range(1, usuarios + 1)],
+        "partidos": partidos,
+        "puntajes": [{"id": u, "usuario_id": u, "temporada": temporada,
+                      "puntos_totales": PUNTOS_INICIALES, "aciertos": 0, "fallos": 0,
+                      "partidos_apostados": 0, "comprometidos": comprometidos.get(u, 0)}
+                     for u in range(1, usuarios + 1)],
+        "apuestas": apuestas,
+        "movimientos_puntos": [{
+            "id": a["id"], "usuario_id": a["usuario_id"], "temporada": temporada, "tipo": "apuesta",
+            "apuesta_id": a["id"], "jornada_id": jornada_de[a["partido_id"]], "puntos": 0,
+            "comprometidos": a["puntos_apostados"], "aciertos": 0, "fallos": 0, "partidos_apostados": 0,
+            "clave": f"datos_liga:{temporada}:{a['id']}:apuesta", "origen": "datos_liga",
+            "creado_en": a["fecha_apuesta"],
+        } for a in apuestas],
+    }
+
+
+def temporada_anterior(temporada: str, n: int = 1) -> str:
+    inicio = int(temporada[:4]) - n
+    return f"{inicio}-{inicio + 1}"
+
+
+def generar_temporadas(pasadas: int, usuarios: int = 200, densidad: float = 0.3,
+                       jornadas_jugadas: int = 10, semilla: int = 1) -> Dict[str, List[Dict]]:
+    """
+    ``generar_liga`` de ``TEMPORADA`` más ``pasadas`` temporadas anteriores con
+    las 38 jornadas jugadas y todas sus apuestas liquidadas (sin movimientos en
+    el libro). Los usuarios y equipos son los mismos; los ids de cada
+    temporada anterior se desplazan.
+    """
+    datos = generar_liga(usuarios, densidad, jornadas_jugadas, semilla=semilla)
+    for k in range(1, pasadas + 1):
+        vieja = generar_liga(usuarios, densidad, 38, temporada_anterior(TEMPORADA, k), semilla + k)
+        for j in vieja["jornadas"]:
+            j["id"] += k * 1000
+            j["cerrada"] = True
+        for p in vieja["partidos"]:
+            p["id"]         += k * 1_000_000
+            p["jornada_id"] += k * 1000
+        for a in vieja["apuestas"]:
+            a["id"]               += k * 10_000_000
+            a["partido_id"]       += k * 1_000_000
+            a["puntos_obtenidos"]  = 0
+        for p in vieja["puntajes"]:
+            p["id"]           += k * usuarios
+            p["comprometidos"] = 0
+        for tabla in ("jornadas", "partidos", "puntajes", "apuestas"):
+            datos[tabla].extend(vieja[tabla])
+    return datos
@@ -0,0 +1,517 @@
+"""
+Cliente Supabase falso, en memoria
+==================================
+Imita la cadena del query-builder de ``supabase.Client``
+(``table().select().eq().order().execute()``) sobre listas de dicts y cuenta
+cada ``execute()`` como un viaje de ida y vuelta a la base de datos.
+
+Soporta el subconjunto de PostgREST que usa ``GestorLiga``:
+
+- selects con recursos embebidos (``partidos!inner(*)``,
+  ``equipo_local:equipos!equipo_local_id(*)``, ``partidos(count)``)
+- filtros ``eq/neq/is_/in_/gt/gte/lt/lte`` sobre columnas propias o embebidas
+- ``order``, ``limit``, ``range`` y ``count="exact"``
+- el tope de filas por respuesta de PostgREST (``max_filas``, ``max-rows``)
+- ``insert``, ``upsert(on_conflict=..., ignore_duplicates=...)``, ``update``,
+  ``delete`` y ``rpc`` (funciones registradas en Python)
+
+Las funciones de ``supabase/migrations`` tienen aquí su equivalente en Python
+(``FUNCIONES_RPC``), registradas por defecto en cada ``ClienteFalso``.
+"""
+
+import copy
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from backend_sqlite import parsear_select
+
+
+class RespuestaFalsa:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data  = data
+        self.count = count
+
+
+# ── Filtros ───────────────────────────────────────────────────────────────────
+
+def _cumple(valor: Any, op: str, objetivo: Any) -> bool:
+    if op == "eq":  return valor == objetivo
+    if op == "neq": return valor != objetivo
+    if op == "is":  return valor is None if objetivo in (None, "null") else valor is objetivo
+    if op == "in":  return valor in objetivo
+    if valor is None:
+        return False
+    if op == "gt":  return valor > objetivo
+    if op == "gte": return valor >= objetivo
+    if op == "lt":  return valor < objetivo
+    if op == "lte": return valor <= objetivo
+    raise ValueError(f"Operador no soportado: {op}")
+
+
+class ConsultaFalsa:
+
+    def __init__(self, cliente: "ClienteFalso", tabla: str):
+        self.cliente   = cliente
+        self.tabla     = tabla
+        self.operacion = "select"
+        self.columnas  = "*"
+        self.payload: Any = None
+        self.filtros: List[Tuple[str, str, Any]] = []
+        self.orden: List[Tuple[str, bool]] = []
+        self.limite: Optional[int] = None
+        self.desde  = 0
+        self.contar = False
+        self.on_conflict: Optional[str] = None
+        self.ignorar_duplicados = False
+
+    # ── Operaciones ────────────────────────────────────────────
+
+    def select(self, columnas: str = "*", count: Optional[str] = None):
+        self.columnas = columnas
+        self.contar   = count is not None
+        return self
+
+    def insert(self, datos):
+        self.operacion, self.payload = "insert", datos
+        return self
+
+    def upsert(self, datos, on_conflict: str = "", ignore_duplicates: bool = False, **_):
+        self.operacion, self.payload = "upsert", datos
+        self.on_conflict        = on_conflict or "id"
+        self.ignorar_duplicados = ignore_duplicates
+        return self
+
+    def update(self, datos):
+        self.operacion, self.payload = "update", datos
+        return self
+
+    def delete(self):
+        self.operacion = "delete"
+        return self
+
+    # ── Filtros / modificadores ────────────────────────────────
+
+    def eq(self, col, v):   self.filtros.append((col, "eq", v));  return self
+    def neq(self, col, v):  self.filtros.append((col, "neq", v)); return self
+    def is_(self, col, v):  self.filtros.append((col, "is", v));  return self
+    def in_(self, col, v):  self.filtros.append((col, "in", set(v))); return self
+    def gt(self, col, v):   self.filtros.append((col, "gt", v));  return self
+    def gte(self, col, v):  self.filtros.append((col, "gte", v)); return self
+    def lt(self, col, v):   self.filtros.append((col, "lt", v));  return self
+    def lte(self, col, v):  self.filtros.append((col, "lte", v)); return self
+
+    def order(self, col: str, desc: bool = False):
+        self.orden.append((col, desc))
+        return self
+
+    def limit(self, n: int):
+        self.limite = n
+        return self
+
+    def range(self, desde: int, hasta: int):
+        self.desde, self.limite = desde, hasta - desde + 1
+        return self
+
+    # ── Ejecución ──────────────────────────────────────────────
+
+    def execute(self) -> RespuestaFalsa:
+        self.cliente._registrar_viaje(self.tabla, self.operacion)
+        return getattr(self, f"_ejecutar_{self.operacion}")()
+
+    def _filas_base(self) -> List[Dict]:
+        """Filas de la tabla que cumplen los filtros propios (sin embebidos)."""
+        propios = [f for f in self.filtros if "." not in f[0]]
+        por_id  = next((v for c, op, v in propios if c == "id" and op == "eq"), None)
+        if por_id is not None:
+            fila = self.cliente.indices[self.tabla].get(por_id)
+            candidatas = [fila] if fila is not None else []
+        else:
+            candidatas = self.cliente.tablas[self.tabla]
+        return [f for f in candidatas
+                if all(_cumple(f.get(c), op, v) for c, op, v in propios)]
+
+    def _ejecutar_select(self) -> RespuestaFalsa:
+        cols, embebidos = parsear_select(self.columnas)
+        filas = []
+        for fila in self._filas_base():
+            salida = self.cliente._proyectar(self.tabla, fila, cols, embebidos, self.filtros, "")
+            if salida is not None:
+                filas.append(salida)
+        for col, desc in reversed(self.orden):
+            filas.sort(key=lambda f: (f.get(col) is None, f.get(col)), reverse=desc)
+        total  = len(filas)
+        limite = self.limite
+        if self.cliente.max_filas is not None:
+            limite = self.cliente.max_filas if limite is None else min(limite, self.cliente.max_filas)
+        fin   = None if limite is None else self.desde + limite
+        filas = filas[self.desde:fin]
+        return RespuestaFalsa(filas, total if self.contar else None)
+
+    def _ejecutar_insert(self) -> RespuestaFalsa:
+        filas = self.payload if isinstance(self.payload, list) else [self.payload]
+        return RespuestaFalsa([copy.deepcopy(self.cliente._insertar(self.tabla, f)) for f in filas])
+
+    def _ejecutar_upsert(self) -> RespuestaFalsa:
+        filas  = self.payload if isinstance(self.payload, list) else [self.payload]
+        claves = [c.strip() for c in self.on_conflict.split(",")]
+        salida = []
+        for f in filas:
+            existente = self.cliente._buscar_por(self.tabla, claves, f)
+            if existente is None:
+                salida.append(copy.deepcopy(self.cliente._insertar(self.tabla, f)))
+            elif not self.ignorar_duplicados:
+                existente.update({k: v for k, v in f.items() if k != "id"})
+                salida.append(copy.deepcopy(existente))
+        return RespuestaFalsa(salida)
+
+    def _ejecutar_update(self) -> RespuestaFalsa:
+        salida = []
+        for fila in self._filas_base():
+            fila.update(copy.deepcopy(self.payload))   # como por la red: sin referencias compartidas
+            salida.append(copy.deepcopy(fila))
+        return RespuestaFalsa(salida)
+
+    def _ejecutar_delete(self) -> RespuestaFalsa:
+        borrar = self._filas_base()
+        ids    = {id(f) for f in borrar}
+        self.cliente.tablas[self.tabla] = [f for f in self.cliente.tablas[self.tabla] if id(f) not in ids]
+        for f in borrar:
+            self.cliente.indices[self.tabla].pop(f.get("id"), None)
+        return RespuestaFalsa(copy.deepcopy(borrar))
+
+
+class LlamadaRpcFalsa:
+
+    def __init__(self, cliente: "ClienteFalso", nombre: str, params: Dict):
+        self.cliente = cliente
+        self.nombre  = nombre
+        self.params  = params
+
+    def execute(self) -> RespuestaFalsa:
+        self.cliente._registrar_viaje(f"rpc:{self.nombre}", "rpc")
+        return RespuestaFalsa(self.cliente.funciones[self.nombre](self.cliente, **self.params))
+
+
+# ── Equivalentes en Python de las funciones SQL ───────────────────────────────
+
+DELTAS_MOVIMIENTO = ("puntos", "comprometidos", "aciertos", "fallos", "partidos_apostados")
+
+
+def _puntaje(cliente: "ClienteFalso", usuario_id: int, temporada: str) -> Optional[Dict]:
+    return next((p for p in cliente.tablas.get("puntajes", [])
+                 if p["usuario_id"] == usuario_id and p["temporada"] == temporada), None)
+
+
+def _rpc_registrar_movimientos(cliente: "ClienteFalso", p_movimientos: List[Dict],
+                               p_puntos_iniciales: int = 100) -> List[Dict]:
+    movimientos = cliente.tablas.setdefault("movimientos_puntos", [])
+    claves = cliente.indices.get("movimientos_puntos:clave")
+    if claves is None or len(claves) != len(movimientos):
+        claves = cliente.indices["movimientos_puntos:clave"] = {m["clave"]: m["id"] for m in movimientos}
+
+    nuevos = []
+    for m in p_movimientos:
+        if m["clave"] in claves:
+            continue
+        fila = cliente._insertar("movimientos_puntos", {
+            "apuesta_id": None, "jornada_id": None, "origen": None, **copy.deepcopy(m),
+            **{c: m.get(c) or 0 for c in DELTAS_MOVIMIENTO},
+            "creado_en": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+        claves[fila["clave"]] = fila["id"]
+        nuevos.append(copy.deepcopy(fila))
+
+        puntaje = _puntaje(cliente, fila["usuario_id"], fila["temporada"])
+        if puntaje is None:
+            puntaje = cliente._insertar("puntajes", {
+                "usuario_id": fila["usuario_id"], "temporada": fila["temporada"],
+                "puntos_totales": p_puntos_iniciales, "aciertos": 0, "fallos": 0,
+                "partidos_apostados": 0, "comprometidos": 0})
+        puntaje["puntos_totales"] += fila["puntos"]
+        for c in DELTAS_MOVIMIENTO[1:]:
+            puntaje[c] = puntaje.get(c, 0) + fila[c]
+        puntaje["ultimo_movimiento_id"] = max(puntaje.get("ultimo_movimiento_id") or 0, fila["id"])
+    return nuevos
+
+
+def _rpc_reconstruir_puntajes(cliente: "ClienteFalso", p_temporada: str,
+                              p_puntos_iniciales: int = 100) -> List[Dict]:
+    sumas: Dict[int, Dict[str, int]] = {p["usuario_id"]: {} for p in cliente.tablas.get("puntajes", [])
+                                        if p["temporada"] == p_temporada}
+    movimientos = [m for m in cliente.tablas.get("movimientos_puntos", []) if m["temporada"] == p_temporada]
+    for m in movimientos:
+        s = sumas.setdefault(m["usuario_id"], {})
+        for c in DELTAS_MOVIMIENTO:
+            s[c] = s.get(c, 0) + m[c]
+        s["ultimo_movimiento_id"] = max(s.get("ultimo_movimiento_id") or 0, m["id"])
+
+    corregidos = 0
+    for usuario_id, s in sumas.items():
+        nuevo = {"puntos_totales": p_puntos_iniciales + s.get("puntos", 0),
+                 **{c: s.get(c, 0) for c in DELTAS_MOVIMIENTO[1:]}}
+        puntaje = _puntaje(cliente, usuario_id, p_temporada)
+        if puntaje is None:
+            cliente._insertar("puntajes", {"usuario_id": usuario_id, "temporada": p_temporada, **nuevo,
+                                           "ultimo_movimiento_id": s.get("ultimo_movimiento_id")})
+            corregidos += 1
+        elif any(puntaje.get(c, 0) != v for c, v in nuevo.items()):
+            puntaje.update(nuevo, ultimo_movimiento_id=s.get("ultimo_movimiento_id"))
+            corregidos += 1
+    return [{"usuarios": len(sumas), "movimientos": len(movimientos), "corregidos": corregidos}]
+
+
+def _rpc_saldo_usuario(cliente: "ClienteFalso", p_usuario_id: int, p_temporada: str,
+                       p_puntos_iniciales: int = 100) -> List[Dict]:
+    puntaje = _puntaje(cliente, p_usuario_id, p_temporada)
+    total, comprometidos = ((puntaje["puntos_totales"], puntaje.get("comprometidos", 0))
+                            if puntaje else (p_puntos_iniciales, 0))
+    return [{"puntos_totales": total, "comprometidos": comprometidos,
+             "disponible": total - comprometidos}]
+
+
+def _movimientos_colocacion(usuario_id: int, temporada: str, fila: Dict, jornada_id: Optional[int],
+                            previa: Optional[int], clave: str, origen: str) -> List[Dict]:
+    comun = {"usuario_id": usuario_id, "temporada": temporada, "apuesta_id": fila["id"],
+             "jornada_id": jornada_id, "origen": origen}
+    movimientos = [{**comun, "tipo": "reembolso", "comprometidos": -previa,
+                    "clave": f"{clave}:reembolso"}] if previa is not None else []
+    return movimientos + [{**comun, "tipo": "apuesta", "comprometidos": fila["puntos_apostados"],
+                           "clave": f"{clave}:apuesta"}]
+
+
+def _rpc_colocar_apuesta(cliente: "ClienteFalso", p_usuario_id: int, p_partido_id: int,
+                         p_tipo: str, p_prediccion: str, p_puntos: int, p_temporada: str,
+                         p_clave: str, p_puntos_iniciales: int = 100) -> List[Dict]:
+    solicitudes = cliente.indices.setdefault("solicitudes_apuesta", {})
+    if p_clave in solicitudes:
+        return [copy.deepcopy(cliente.indices["apuestas"][solicitudes[p_clave]])]
+
+    clave   = ("usuario_id", "partido_id", "tipo_apuesta")
+    previa  = cliente._buscar_por("apuestas", list(clave),
+                                  {"usuario_id": p_usuario_id, "partido_id": p_partido_id,
+                                   "tipo_apuesta": p_tipo}) if "apuestas" in cliente.tablas else None
+    actual  = previa["puntos_apostados"] if previa and previa.get("puntos_obtenidos") is None else None
+    disponible = _rpc_saldo_usuario(cliente, p_usuario_id, p_temporada, p_puntos_iniciales)[0]["disponible"] \
+        + (actual or 0)
+    if p_puntos > disponible:
+        raise APIError({"message": f"Saldo insuficiente. Disponible: {disponible} pts",
+                        "code": "P0001", "hint": None, "details": None})
+    if previa and previa.get("puntos_obtenidos") is not None:
+        raise APIError({"message": "La apuesta ya está liquidada y no se puede modificar",
+                        "code": "P0001", "hint": None, "details": None})
+
+    datos = {"prediccion": p_prediccion, "puntos_apostados": p_puntos,
+             "fecha_apuesta": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if previa:
+        previa.update(datos)
+        fila = previa
+    else:
+        fila = cliente._insertar("apuestas", {"usuario_id": p_usuario_id, "partido_id": p_partido_id,
+                                              "tipo_apuesta": p_tipo, "puntos_obtenidos": None, **datos})
+    solicitudes[p_clave] = fila["id"]
+    jornada_id = (cliente.indices.get("partidos", {}).get(p_partido_id) or {}).get("jornada_id")
+    _rpc_registrar_movimientos(cliente, _movimientos_colocacion(
+        p_usuario_id, p_temporada, fila, jornada_id, actual, p_clave, "colocar_apuesta"), p_puntos_iniciales)
+    return [copy.deepcopy(fila)]
+
+
+def _rpc_colocar_apuestas(cliente: "ClienteFalso", p_usuario_id: int, p_temporada: str,
+                          p_apuestas: List[Dict], p_clave: str, p_puntos_iniciales: int = 100) -> List[Dict]:
+    solicitudes = cliente.indices.setdefault("solicitudes_apuesta", {})
+    claves = [f"{p_clave}:{a['partido_id']}:{a['tipo_apuesta']}" for a in p_apuestas]
+    if any(c in solicitudes for c in claves):
+        return [copy.deepcopy(cliente.indices["apuestas"][solicitudes[c]]) for c in claves if c in solicitudes]
+
+    cliente.tablas.setdefault("apuestas", [])
+    cliente.indices.setdefault("apuestas", {})
+    columnas = ["usuario_id", "partido_id", "tipo_apuesta"]
+    previas  = [cliente._buscar_por("apuestas", columnas, {"usuario_id": p_usuario_id, **a})
+                for a in p_apuestas]
+    actuales   = [p["puntos_apostados"] if p and p.get("puntos_obtenidos") is None else None
+                  for p in previas]
+    liberados  = sum(a for a in actuales if a is not None)
+    coste      = sum(a["puntos_apostados"] for a in p_apuestas)
+    disponible = _rpc_saldo_usuario(cliente, p_usuario_id, p_temporada, p_puntos_iniciales)[0]["disponible"] + liberados
+    if coste > disponible:
+        raise APIError({"message": f"Saldo insuficiente. Disponible: {disponible} pts, boleto: {coste} pts",
+                        "code": "P0001", "hint": None, "details": None})
+    if any(p and p.get("puntos_obtenidos") is not None for p in previas):
+        raise APIError({"message": "El boleto incluye apuestas ya liquidadas que no se pueden modificar",
+                        "code": "P0001", "hint": None, "details": None})
+
+    ahora, salida, movimientos = time.strftime("%Y-%m-%dT%H:%M:%S"), [], []
+    partidos = cliente.indices.get("partidos", {})
+    for a, previa, actual, clave in zip(p_apuestas, previas, actuales, claves):
+        datos = {"prediccion": a["prediccion"], "puntos_apostados": a["puntos_apostados"],
+                 "fecha_apuesta": ahora}
+        if previa:
+            previa.update(datos)
+            fila = previa
+        else:
+            fila = cliente._insertar("apuestas", {"usuario_id": p_usuario_id, "partido_id": a["partido_id"],
+                                                  "tipo_apuesta": a["tipo_apuesta"],
+                                                  "puntos_obtenidos": None, **datos})
+        solicitudes[clave] = fila["id"]
+        movimientos += _movimientos_colocacion(p_usuario_id, p_temporada, fila,
+                                               (partidos.get(a["partido_id"]) or {}).get("jornada_id"),
+                                               actual, clave, "colocar_apuestas")
+        salida.append(copy.deepcopy(fila))
+    _rpc_registrar_movimientos(cliente, movimientos, p_puntos_iniciales)
+    return salida
+
+
+def _rpc_resumen_dashboard(cliente: "ClienteFalso", p_temporada: str, p_top: int = 5,
+                           p_recientes: int = 5) -> List[Dict]:
+    usuarios  = cliente.indices.get("usuarios", {})
+    jornadas  = [j for j in cliente.tablas.get("jornadas", []) if j["temporada"] == p_temporada]
+    puntajes  = sorted((p for p in cliente.tablas.get("puntajes", []) if p["temporada"] == p_temporada),
+                       key=lambda p: (-p["puntos_totales"], -p["aciertos"], p["id"]))
+    partidos  = Counter(p["jornada_id"] for p in cliente.tablas.get("partidos", []))
+    recientes = sorted(jornadas, key=lambda j: j["numero"])[-p_recientes:] if p_recientes else []
+    return [{
+        "equipos":   len(cliente.tablas.get("equipos", [])),
+        "usuarios":  sum(1 for u in usuarios.values() if u.get("activo")),
+        "jornadas":  len(jornadas),
+        "top":       [{**copy.deepcopy(p), "usuarios": copy.deepcopy(usuarios.get(p["usuario_id"]))}
+                      for p in puntajes[:p_top]],
+        "recientes": [{**copy.deepcopy(j), "total_partidos": partidos[j["id"]]} for j in recientes],
+    }]
+
+
+def _rpc_reclamar_liquidacion(cliente: "ClienteFalso", p_trabajador: str,
+                              p_caducidad_seg: int = 60) -> List[Dict]:
+    ahora  = datetime.now(timezone.utc)
+    limite = ahora - timedelta(seconds=p_caducidad_seg)
+    for t in sorted(cliente.tablas.get("trabajos_liquidacion", []), key=lambda t: t["id"]):
+        caducado = (t["estado"] == "en_curso"
+                    and (not t.get("latido") or datetime.fromisoformat(t["latido"]) < limite))
+        if t["estado"] == "pendiente" or caducado:
+            t.update({"estado": "en_curso", "trabajador": p_trabajador,
+                      "intentos": t.get("intentos", 0) + 1,
+                      "latido": ahora.isoformat(timespec="seconds")})
+            return [copy.deepcopy(t)]
+    return []
+
+
+FUNCIONES_RPC: Dict[str, Callable] = {
+    "saldo_usuario":         _rpc_saldo_usuario,
+    "colocar_apuesta":       _rpc_colocar_apuesta,
+    "colocar_apuestas":      _rpc_colocar_apuestas,
+    "resumen_dashboard":     _rpc_resumen_dashboard,
+    "reclamar_liquidacion":  _rpc_reclamar_liquidacion,
+    "registrar_movimientos": _rpc_registrar_movimientos,
+    "reconstruir_puntajes":  _rpc_reconstruir_puntajes,
+}
+
+
+class ClienteFalso:
+    """
+    Sustituto de ``supabase.Client`` para benchmarks.
+
+    ``viajes`` cuenta cada ``execute()``; ``latencia_ms`` simula el coste de
+    red de un viaje a Supabase y ``max_filas`` recorta los selects como el
+    ``max-rows`` de PostgREST (1000 por defecto en Supabase).
+    """
+
+    def __init__(self, tablas: Optional[Dict[str, List[Dict]]] = None, latencia_ms: float = 0.0,
+                 max_filas: Optional[int] = None):
+        self.tablas: Dict[str, List[Dict]] = {}
+        self.indices: Dict[str, Dict[Any, Dict]] = {}
+        self.secuencias: Dict[str, int] = {}
+        self.funciones: Dict[str, Callable] = dict(FUNCIONES_RPC)
+        self.latencia_ms = latencia_ms
+        self.max_filas   = max_filas
+        self.viajes = 0
+        self.viajes_por_tabla: Counter = Counter()
+        for nombre, filas in (tablas or {}).items():
+            for f in filas:
+                self._insertar(nombre, f)
+
+    # ── API pública (igual que supabase.Client) ────────────────
+
+    def table(self, nombre: str) -> ConsultaFalsa:
+        self.tablas.setdefault(nombre, [])
+        self.indices.setdefault(nombre, {})
+        return ConsultaFalsa(self, nombre)
+
+    def rpc(self, nombre: str, params: Optional[Dict] = None) -> LlamadaRpcFalsa:
+        return LlamadaRpcFalsa(self, nombre, params or {})
+
+    # ── Utilidades ─────────────────────────────────────────────
+
+    def registrar_funcion(self, nombre: str, fn: Callable):
+        self.funciones[nombre] = fn
+
+    def reiniciar_contadores(self):
+        self.viajes = 0
+        self.viajes_por_tabla.clear()
+
+    def _registrar_viaje(self, tabla: str, operacion: str):
+        self.viajes += 1
+        self.viajes_por_tabla[f"{tabla}.{operacion}"] += 1
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000)
+
+    def _insertar(self, tabla: str, fila: Dict) -> Dict:
+        self.tablas.setdefault(tabla, [])
+        self.indices.setdefault(tabla, {})
+        nueva = dict(fila)
+        if nueva.get("id") is None:
+            nueva["id"] = self.secuencias.get(tabla, 0) + 1
+        self.secuencias[tabla] = max(self.secuencias.get(tabla, 0), nueva["id"])
+        self.tablas[tabla].append(nueva)
+        self.indices[tabla][nueva["id"]] = nueva
+        return nueva
+
+    def _buscar_por(self, tabla: str, claves: List[str], fila: Dict) -> Optional[Dict]:
+        if claves == ["id"]:
+            return self.indices[tabla].get(fila.get("id"))
+        return next((f for f in self.tablas[tabla]
+                     if all(f.get(k) == fila.get(k) for k in claves)), None)
+
+    def _relacion(self, base: str, destino: str, fk: Optional[str], fila: Dict) -> Tuple[str, str, bool]:
+        """(columna en base, columna en destino, es_a_uno) para un embebido."""
+        if fk:
+            return fk, "id", True
+        col = f"{destino[:-1]}_id"
+        if col in fila:
+            return col, "id", True
+        return "id", f"{base[:-1]}_id", False
+
+    def _proyectar(self, tabla: str, fila: Dict, cols: List[str], embebidos: List[Dict],
+                   filtros: List[Tuple[str, str, Any]], prefijo: str) -> Optional[Dict]:
+        if "*" in cols:
+            salida = copy.copy(fila)
+        else:
+            salida = {c.strip(): fila.get(c.strip()) for c in cols}
+        for emb in embebidos:
+            ruta  = f"{prefijo}{emb['alias']}"
+            local, remota, a_uno = self._relacion(tabla, emb["tabla"], emb["fk"], fila)
+            if a_uno:
+                destino    = self.indices.get(emb["tabla"], {}).get(fila.get(local))
+                candidatas = [destino] if destino is not None else []
+            else:
+                candidatas = [f for f in self.tablas.get(emb["tabla"], [])
+                              if f.get(remota) == fila.get(local)]
+            propios = [(c[len(ruta) + 1:], op, v) for c, op, v in filtros
+                       if c.startswith(ruta + ".") and "." not in c[len(ruta) + 1:]]
+            hijos = []
+            for cand in candidatas:
+                if not all(_cumple(cand.get(c), op, v) for c, op, v in propios):
+                    continue
+                sub = self._proyectar(emb["tabla"], cand, emb["cols"], emb["emb"], filtros, ruta + ".")
+                if sub is not None:
+                    hijos.append(sub)
+            if emb["inner"] and not hijos:
+                return None
+            if emb["count"]:
+                salida[emb["alias"]] = [{"count": len(hijos)}]
+            elif a_uno:
+                salida[emb["alias"]] = hijos[0] if hijos else None
+            else:
+                salida[emb["alias"]] = hijos
+        return salida
@@ -0,0 +1,200 @@
+"""
+Respuestas grabadas de football-data.org
+========================================
+Permite ejecutar ``ClienteFootballData`` sin red contra respuestas grabadas
+(``SesionGrabada``) y grabarlas de la API real (``SesionGrabadora``). Un
+fichero de fixtures es un JSON con la lista de respuestas::
+
+    {"respuestas": [{"ruta": "/competitions/PD/matches",
+                     "params": {"dateFrom": "...", "dateTo": "..."},
+                     "status": 200, "headers": {...}, "body": {...}}]}
+
+Una petición repetida recibe sus respuestas en el orden del fichero (la
+última se repite).
+
+``generar`` escribe ``fixtures/resultados_jornada_11.json``: la jornada 11 de
+``datos_liga.calendario`` vista en dos momentos (partidos en juego y, al día
+siguiente, todos finalizados con un resultado corregido), y
+``fixtures/aplazado_jornada_1.json``: un partido de la jornada 1 aplazado,
+reprogramado al día siguiente de la jornada 11 para cinco días después y
+jugado ese día.
+
+    python -m benchmarks.fixtures_football_data generar
+    python -m benchmarks.fixtures_football_data grabar salida.json --desde 2025-10-24 --hasta 2025-10-25
+"""
+
+import argparse
+import copy
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from benchmarks.datos_liga import INICIO_TEMPORADA, calendario
+
+DIRECTORIO = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_JORNADA_11 = os.path.join(DIRECTORIO, "resultados_jornada_11.json")
+FIXTURE_APLAZADO   = os.path.join(DIRECTORIO, "aplazado_jornada_1.json")
+
+
+def _clave(ruta: str, params: Optional[Dict]) -> tuple:
+    return ruta, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+
+class SesionGrabada:
+    """Sustituto de ``requests.Session`` que responde con fixtures grabadas."""
+
+    def __init__(self, respuestas: List[Dict]):
+        self.headers: Dict[str, str] = {}
+        self.peticiones: List[tuple] = []
+        self._respuestas: Dict[tuple, List[Dict]] = {}
+        for r in respuestas:
+            self._respuestas.setdefault(_clave(r["ruta"], r.get("params")), []).append(r)
+
+    @classmethod
+    def desde_fichero(cls, *rutas: str) -> "SesionGrabada":
+        respuestas = []
+        for ruta in rutas:
+            with open(ruta, encoding="utf-8") as f:
+                respuestas += json.load(f)["respuestas"]
+        return cls(respuestas)
+
+    def get(self, url: str, params: Optional[Dict] = None, **_) -> requests.Response:
+        clave = _clave(urlsplit(url).path.split("/v4", 1)[-1], params)
+        self.peticiones.append(clave)
+        grabadas = self._respuestas.get(clave)
+        r = requests.Response()
+        r.url = url
+        if not grabadas:
+            r.status_code = 404
+            r._content    = json.dumps({"message": f"Sin fixture para {clave}"}).encode()
+            return r
+        grabada = grabadas.pop(0) if len(grabadas) > 1 else grabadas[0]
+        r.status_code = grabada["status"]
+        r.headers     = CaseInsensitiveDict(grabada.get("headers", {}))
+        r._content    = json.dumps(grabada["body"]).encode()
+        return r
+
+
+class SesionGrabadora(requests.Session):
+    """``requests.Session`` que guarda cada respuesta GET en ``respuestas``."""
+
+    def __init__(self):
+        super().__init__()
+        self.respuestas: List[Dict] = []
+
+    def get(self, url, params=None, **kwargs):
+        r = super().get(url, params=params, **kwargs)
+        self.respuestas.append({
+            "ruta":    urlsplit(url).path.split("/v4", 1)[-1],
+            "params":  params or {},
+            "status":  r.status_code,
+            "headers": {k: v for k, v in r.headers.items() if k.lower().startswith("x-")},
+            "body":    r.json(),
+        })
+        return r
+
+
+# ── Fixtures sintéticas ───────────────────────────────────────────────────────
+
+def _respuesta(params: Dict, partidos: List[Dict], disponibles: int) -> Dict:
+    return {
+        "ruta":    "/competitions/PD/matches",
+        "params":  params,
+        "status":  200,
+        "headers": {"X-Requests-Available-Minute": str(disponibles), "X-RequestCounter-Reset": "60"},
+        "body":    {"resultSet": {"count": len(partidos)}, "matches": partidos},
+    }
+
+
+def _escribir(ruta: str, respuestas: List[Dict]):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"respuestas": respuestas}, f, indent=1)
+        f.write("\n")
+
+
+def generar(ruta: str = FIXTURE_JORNADA_11, ruta_aplazado: str = FIXTURE_APLAZADO, semilla: int = 1):
+    """Escribe las respuestas de la jornada 11 y las del partido aplazado de la jornada 1."""
+    partidos = calendario(jornadas_jugadas=11, semilla=semilla)
+    jornada  = [p for p in partidos if p["matchday"] == 11]
+    dia      = (INICIO_TEMPORADA + timedelta(days=70)).date()
+
+    ronda_1 = copy.deepcopy(jornada)
+    for i, p in enumerate(ronda_1):
+        if i < 2:
+            p["status"] = "IN_PLAY"
+            p["score"]["fullTime"] = {"home": 1, "away": 0}
+            p["lastUpdated"] = f"{dia}T21:25:00Z"
+        else:
+            p["lastUpdated"] = f"{dia}T21:00:00Z"
+
+    ronda_2 = copy.deepcopy(jornada)
+    for i, p in enumerate(ronda_2):
+        p["lastUpdated"] = f"{dia}T23:00:00Z" if i < 2 else f"{dia}T21:00:00Z"
+    corregido = ronda_2[2]["score"]["fullTime"]
+    corregido["home"] += 1
+    ronda_2[2]["lastUpdated"] = f"{dia + timedelta(days=1)}T09:00:00Z"
+
+    _escribir(ruta, [
+        _respuesta({"dateFrom": str(dia), "dateTo": str(dia)}, ronda_1, 9),
+        _respuesta({"dateFrom": str(dia), "dateTo": str(dia)}, ronda_2, 9),
+    ])
+
+    # Jornada 1: el primer partido se aplaza, se reprograma y se juega después de la jornada 11
+    primera  = copy.deepcopy([p for p in partidos if p["matchday"] == 1])
+    aplazado = primera[0]
+    inicio   = INICIO_TEMPORADA.date()
+    nueva    = dia + timedelta(days=5)
+    aplazado.update(status="POSTPONED", score={"fullTime": {"home": None, "away": None}},
+                    lastUpdated=f"{inicio}T17:00:00Z")
+    reprogramado = {**copy.deepcopy(aplazado), "status": "TIMED", "utcDate": f"{nueva}T19:00:00Z",
+                    "lastUpdated": f"{dia + timedelta(days=1)}T08:00:00Z"}
+    jugado = {**copy.deepcopy(reprogramado), "status": "FINISHED",
+              "score": {"fullTime": {"home": 2, "away": 1}}, "lastUpdated": f"{nueva}T21:00:00Z"}
+    _escribir(ruta_aplazado, [
+        _respuesta({"dateFrom": str(inicio), "dateTo": str(inicio)}, primera, 9),
+        {"ruta": f"/matches/{aplazado['id']}", "params": {}, "status": 200,
+         "headers": {"X-Requests-Available-Minute": "9", "X-RequestCounter-Reset": "60"},
+         "body": reprogramado},
+        _respuesta({"dateFrom": str(nueva), "dateTo": str(nueva)}, [jugado], 9),
+    ])
+
+
+def grabar(ruta: str, desde: date, hasta: date):
+    """Graba de la API real (con ``API_CONFIG``) los partidos entre dos fechas."""
+    from app import API_CONFIG
+    from football_data import ClienteFootballData, ventanas_fechas
+
+    sesion  = SesionGrabadora()
+    cliente = ClienteFootballData(API_CONFIG["key"], API_CONFIG["base_url"],
+                                  API_CONFIG["competition"], sesion=sesion)
+    for d, h in ventanas_fechas(desde, hasta):
+        cliente.partidos_fechas(d, h)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"respuestas": sesion.respuestas}, f, indent=1)
+        f.write("\n")
+
+
+def main():
+    ap  = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="orden", required=True)
+    sub.add_parser("generar")
+    g = sub.add_parser("grabar")
+    g.add_argument("salida")
+    g.add_argument("--desde", type=date.fromisoformat, required=True)
+    g.add_argument("--hasta", type=date.fromisoformat, required=True)
+    args = ap.parse_args()
+
+    if args.orden == "generar":
+        generar()
+    else:
+        grabar(args.salida, args.desde, args.hasta)
+
+
+if __name__ == "__main__":
+    main()
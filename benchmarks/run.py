@@ -0,0 +1,213 @@
+"""
+Benchmarks de los caminos calientes de ``GestorLiga``
+=====================================================
+Genera una temporada sintética (``--usuarios``, ``--densidad`` de apuestas),
+la carga en el cliente Supabase falso con ``--latencia-ms`` por viaje y mide
+tiempo y viajes a la base de datos de:
+
+- ``procesar_jornada``: liquidación de la última jornada jugada
+- ``recalcular_temporada``: recálculo completo tras liquidar las jornadas jugadas
+- ``hacer_apuesta``: ``--apuestas`` apuestas nuevas en la jornada siguiente
+- ``cargar_equipos_desde_api``: contra el stub local de football-data.org,
+  con la tabla vacía y repetida sin cambios
+- ``cargar_partidos_desde_api``: contra el stub local de football-data.org,
+  por jornada y equipo por equipo
+- cada página ``show_*``, con la caché de lecturas fría y caliente
+- ``interaccion_apuestas``: un clic en la página de apuestas, que solo
+  vuelve a ejecutar su fragmento, frente a la página completa
+
+El resultado es un JSON (en stdout o en ``--salida``) con los parámetros,
+el commit y la fecha, para comparar versión a versión.
+
+    python -m benchmarks.run --usuarios 500 --latencia-ms 20 --salida bench.json
+"""
+
+import argparse
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from streamlit import logger as st_logger
+
+# La app y sus páginas se ejecutan sin servidor de Streamlit (modo "bare")
+st_logger.set_log_level("error")
+
+import app
+from app import GestorLiga, OPCIONES_APUESTA, PUNTOS_INICIALES, REGLAS, TEMPORADA
+from benchmarks.datos_liga import generar_liga
+from benchmarks.fake_supabase import ClienteFalso
+from benchmarks.stub_football_data import ServidorStub
+from football_data import ClienteFootballData, LimitadorPeticiones
+
+PAGINAS = ["dashboard", "equipos", "usuarios", "jornadas", "apuestas", "clasificacion", "admin"]
+
+
+def _medida(cliente: ClienteFalso, t0: float, **extra) -> dict:
+    return {
+        "segundos": round(time.perf_counter() - t0, 4),
+        "viajes":   cliente.viajes,
+        "por_tabla": dict(sorted(cliente.viajes_por_tabla.items())),
+        **extra,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ── Escenarios ────────────────────────────────────────────────────────────────
+
+def procesar_jornada(args, datos: dict) -> dict:
+    cliente = ClienteFalso(datos, latencia_ms=args.latencia_ms)
+    gestor  = GestorLiga(cliente)
+    t0      = time.perf_counter()
+    resumen = gestor.procesar_jornada(args.jornadas_jugadas, TEMPORADA)
+    return _medida(cliente, t0, apuestas=resumen["apuestas_procesadas"])
+
+
+def recalcular_temporada(args, datos: dict) -> dict:
+    cliente = ClienteFalso(datos, latencia_ms=args.latencia_ms)
+    gestor  = GestorLiga(cliente)
+    for jornada in range(1, args.jornadas_jugadas + 1):
+        gestor.procesar_jornada(jornada, TEMPORADA)
+    cliente.reiniciar_contadores()
+    t0      = time.perf_counter()
+    informe = gestor.recalcular_temporada(TEMPORADA)
+    return _medida(cliente, t0, apuestas=informe["apuestas_revisadas"],
+                   usuarios_corregidos=informe["usuarios_corregidos"])
+
+
+def hacer_apuesta(args, datos: dict) -> dict:
+    cliente  = ClienteFalso(datos, latencia_ms=args.latencia_ms)
+    gestor   = GestorLiga(cliente)
+    jornada  = args.jornadas_jugadas + 2
+    partidos = [p["id"] for p in datos["partidos"] if p["jornada_id"] == jornada]
+    usuarios = [u["id"] for u in datos["usuarios"]]
+    combos   = [(p, t) for p in partidos for t in REGLAS]
+    rechazadas = 0
+    t0 = time.perf_counter()
+    for i in range(args.apuestas):
+        usuario       = usuarios[i % len(usuarios)]
+        partido, tipo = combos[i // len(usuarios) % len(combos)]
+        pred = "1" if tipo == "resultado" else "1-0" if tipo == "marcador" else "alto"
+        try:
+            gestor.hacer_apuesta(usuario, partido, tipo, pred, OPCIONES_APUESTA[0])
+        except ValueError:
+            rechazadas += 1
+    medida = _medida(cliente, t0, apuestas=args.apuestas, rechazadas=rechazadas)
+    medida["viajes_por_apuesta"] = round(cliente.viajes / max(args.apuestas, 1), 2)
+    return medida
+
+
+def cargar_equipos_desde_api(args, datos: dict) -> list:
+    resultados = []
+    with ServidorStub(limite=1000, periodo=60, latencia=args.latencia_ms / 1000) as stub:
+        cliente = ClienteFalso({}, latencia_ms=args.latencia_ms)
+        api     = ClienteFootballData("stub", stub.url, "PD", LimitadorPeticiones(1000, 60))
+        gestor  = GestorLiga(cliente, api=api)
+        for modo in ("vacia", "sin_cambios"):
+            cliente.reiniciar_contadores()
+            t0      = time.perf_counter()
+            informe = gestor.cargar_equipos_desde_api()
+            informe.pop("detalle")
+            resultados.append(_medida(cliente, t0, modo=modo, **informe))
+    return resultados
+
+
+def cargar_partidos_desde_api(args, datos: dict) -> list:
+    resultados = []
+    for modo, matchday in (("jornada", args.jornadas_jugadas + 3), ("por_equipos", None)):
+        base = {"equipos": datos["equipos"], "jornadas": datos["jornadas"]}
+        with ServidorStub(limite=1000, periodo=60, latencia=args.latencia_ms / 1000) as stub:
+            cliente = ClienteFalso(base, latencia_ms=args.latencia_ms)
+            api     = ClienteFootballData("stub", stub.url, "PD", LimitadorPeticiones(1000, 60))
+            gestor  = GestorLiga(cliente, api=api)
+            t0      = time.perf_counter()
+            informe = gestor.cargar_partidos_desde_api(args.jornadas_jugadas + 3, matchday)
+            resultados.append(_medida(cliente, t0, modo=modo, peticiones_api=len(stub.registro),
+                                      **informe))
+    return resultados
+
+
+def paginas(args, datos: dict) -> list:
+    resultados = []
+    for nombre in PAGINAS:
+        pagina  = getattr(app, f"show_{nombre}")
+        cliente = ClienteFalso(datos, latencia_ms=args.latencia_ms)
+        gestor  = GestorLiga(cliente)
+        for estado in ("fria", "caliente"):
+            cliente.reiniciar_contadores()
+            t0 = time.perf_counter()
+            pagina(gestor)
+            resultados.append(_medida(cliente, t0, pagina=nombre, cache=estado))
+    return resultados
+
+
+def interaccion_apuestas(args, datos: dict) -> list:
+    cliente = ClienteFalso(datos, latencia_ms=args.latencia_ms)
+    gestor  = GestorLiga(cliente)
+    t0 = time.perf_counter()
+    app.show_apuestas(gestor)
+    resultados = [_medida(cliente, t0, rerun="pagina")]
+
+    # Los fragmentos reciben los datos de la ejecución completa; la caché se
+    # vacía para que cualquier lectura que hicieran contase como viaje.
+    usuario  = gestor.listar_usuarios()[0]
+    jornada  = gestor.listar_jornadas(TEMPORADA)[0]
+    partidos = gestor.obtener_partidos_jornada(jornada["id"])
+    gestor.cache.limpiar()
+    cliente.reiniciar_contadores()
+    t0 = time.perf_counter()
+    app._formulario_apuesta(gestor, usuario, partidos, {}, PUNTOS_INICIALES, TEMPORADA)
+    resultados.append(_medida(cliente, t0, rerun="fragmento"))
+    return resultados
+
+
+ESCENARIOS = {
+    "procesar_jornada":          procesar_jornada,
+    "recalcular_temporada":      recalcular_temporada,
+    "hacer_apuesta":             hacer_apuesta,
+    "cargar_equipos_desde_api":  cargar_equipos_desde_api,
+    "cargar_partidos_desde_api": cargar_partidos_desde_api,
+    "paginas":                   paginas,
+    "interaccion_apuestas":      interaccion_apuestas,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=200)
+    ap.add_argument("--densidad", type=float, default=0.3,
+                    help="probabilidad de apostar a cada (partido, tipo)")
+    ap.add_argument("--jornadas-jugadas", type=int, default=10)
+    ap.add_argument("--apuestas", type=int, default=100, help="apuestas del escenario hacer_apuesta")
+    ap.add_argument("--latencia-ms", type=float, default=0.0)
+    ap.add_argument("--semilla", type=int, default=1)
+    ap.add_argument("--escenarios", nargs="+", default=list(ESCENARIOS), choices=list(ESCENARIOS))
+    ap.add_argument("--salida", help="fichero JSON de salida (por defecto, stdout)")
+    args = ap.parse_args()
+
+    datos = generar_liga(args.usuarios, args.densidad, args.jornadas_jugadas,
+                         semilla=args.semilla)
+    informe = {
+        "fecha":      datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit":     _commit(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("escenarios", "salida")},
+        "datos":      {tabla: len(filas) for tabla, filas in datos.items()},
+        "escenarios": {nombre: ESCENARIOS[nombre](args, datos) for nombre in args.escenarios},
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Prueba de estrés de ``GestorLiga.hacer_apuesta`` con concurrencia
+=================================================================
+Lanza cientos de apuestas en paralelo (cada envío repetido como un doble
+clic) para unos pocos usuarios sobre el backend SQLite, y comprueba:
+
+- ningún usuario compromete más puntos de los que tiene,
+- no hay apuestas duplicadas por (usuario, partido, tipo),
+- cada clave de idempotencia se aplica como mucho una vez,
+- los únicos errores son de saldo insuficiente o apuesta ya liquidada.
+
+    python -m benchmarks.stress_apuestas --envios 400 --hilos 64
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app import GestorLiga, OPCIONES_APUESTA, PUNTOS_INICIALES, REGLAS, TEMPORADA
+from backend_sqlite import ClienteSQLite
+
+PARTIDOS = 10
+
+
+def sembrar(ruta: str, usuarios: int):
+    conn = sqlite3.connect(ruta)
+    conn.executemany("INSERT INTO equipos (id, nombre, nombre_corto) VALUES (?, ?, ?)",
+                     [(1, "Local FC", "LOC"), (2, "Visitante CF", "VIS")])
+    conn.execute("INSERT INTO jornadas (id, numero, temporada, cerrada) VALUES (1, 1, ?, 0)", (TEMPORADA,))
+    conn.executemany(
+        "INSERT INTO partidos (id, jornada_id, equipo_local_id, equipo_visitante_id, fecha_hora, estado) "
+        "VALUES (?, 1, 1, 2, '2025-08-17T19:00:00', 'programado')",
+        [(p,) for p in range(1, PARTIDOS + 1)])
+    conn.executemany("INSERT INTO usuarios (id, nombre, apellidos, activo) VALUES (?, ?, 'Stress', 1)",
+                     [(u, f"U{u}") for u in range(1, usuarios + 1)])
+    conn.executemany(
+        "INSERT INTO puntajes (usuario_id, temporada, puntos_totales, aciertos, fallos, partidos_apostados) "
+        "VALUES (?, ?, ?, 0, 0, 0)",
+        [(u, TEMPORADA, PUNTOS_INICIALES) for u in range(1, usuarios + 1)])
+    conn.commit()
+    conn.close()
+
+
+def verificar(ruta: str, claves_ok: set) -> list:
+    conn  = sqlite3.connect(ruta)
+    fallos = []
+    for usuario, comprometido in conn.execute(
+            "SELECT usuario_id, SUM(puntos_apostados) FROM apuestas GROUP BY usuario_id"):
+        if comprometido > PUNTOS_INICIALES:
+            fallos.append(f"usuario {usuario} compromete {comprometido} > {PUNTOS_INICIALES}")
+    duplicadas = conn.execute("""
+        SELECT COUNT(*) FROM (SELECT 1 FROM apuestas
+                              GROUP BY usuario_id, partido_id, tipo_apuesta HAVING COUNT(*) > 1)
+    """).fetchone()[0]
+    if duplicadas:
+        fallos.append(f"{duplicadas} apuestas duplicadas")
+    registradas = {c for (c,) in conn.execute("SELECT clave FROM solicitudes_apuesta")}
+    if registradas != claves_ok:
+        fallos.append(f"claves registradas {len(registradas)} != envíos aceptados {len(claves_ok)}")
+    conn.close()
+    return fallos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--envios", type=int, default=400)
+    ap.add_argument("--repeticiones", type=int, default=2, help="veces que se reenvía cada clave")
+    ap.add_argument("--usuarios", type=int, default=3)
+    ap.add_argument("--hilos", type=int, default=64)
+    ap.add_argument("--semilla", type=int, default=1)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.semilla)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta   = os.path.join(tmp, "stress.db")
+        gestor = GestorLiga(ClienteSQLite(ruta))
+        sembrar(ruta, args.usuarios)
+
+        envios = []
+        for _ in range(args.envios):
+            tipo = rnd.choice(list(REGLAS))
+            envio = (rnd.randint(1, args.usuarios), rnd.randint(1, PARTIDOS), tipo,
+                     "1" if tipo == "resultado" else "1-0" if tipo == "marcador" else "alto",
+                     rnd.choice(OPCIONES_APUESTA), uuid.uuid4().hex)
+            envios.extend([envio] * args.repeticiones)
+        rnd.shuffle(envios)
+
+        resultados: Counter = Counter()
+        claves_ok = set()
+
+        def enviar(envio):
+            *datos, clave = envio
+            try:
+                gestor.hacer_apuesta(*datos, clave=clave)
+                claves_ok.add(clave)
+                resultados["ok"] += 1
+            except ValueError as e:
+                resultados["rechazada: " + str(e).split(".")[0]] += 1
+            except Exception as e:
+                resultados[f"error: {type(e).__name__}: {e}"] += 1
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+            list(pool.map(enviar, envios))
+        segundos = time.perf_counter() - t0
+
+        fallos = verificar(ruta, claves_ok)
+        fallos += [k for k in resultados if k.startswith("error")]
+        print(json.dumps({
+            "envios":     len(envios),
+            "segundos":   round(segundos, 3),
+            "resultados": dict(resultados),
+            "fallos":     fallos,
+        }, indent=2, ensure_ascii=False))
+        sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Servidor stub de football-data.org
+==================================
+Servidor HTTP local que imita los endpoints usados por ``ClienteFootballData``
+y la cuota del plan gratuito (``limite`` peticiones por ventana de ``periodo``
+segundos, con las cabeceras ``X-Requests-Available-Minute`` y
+``X-RequestCounter-Reset``). Registra el instante y la ruta de cada petición.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.datos_liga import EQUIPOS, calendario
+
+
+class ServidorStub:
+
+    def __init__(self, limite: int = 10, periodo: float = 60.0, latencia: float = 0.0,
+                 competicion: str = "PD"):
+        self.limite      = limite
+        self.periodo     = periodo
+        self.latencia    = latencia
+        self.competicion = competicion
+        self.registro: List[Dict] = []
+        self._lock       = threading.Lock()
+        self._ventana    = None
+        self._usadas     = 0
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+        self.equipos  = [{"id": e["id"], "name": e["nombre"], "tla": e["nombre_corto"],
+                          "venue": e["estadio"]} for e in EQUIPOS]
+        self.partidos = calendario(competicion)
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._servidor.server_address
+        return f"http://{host}:{puerto}"
+
+    # ── Cuota ──────────────────────────────────────────────────
+
+    def _consumir(self) -> Dict:
+        with self._lock:
+            ahora = time.monotonic()
+            if self._ventana is None or ahora >= self._ventana + self.periodo:
+                self._ventana, self._usadas = ahora, 0
+            self._usadas += 1
+            reinicio = self._ventana + self.periodo - ahora
+            return {
+                "ok":          self._usadas <= self.limite,
+                "disponibles": max(self.limite - self._usadas, 0),
+                "reinicio":    reinicio,
+            }
+
+    # ── Rutas ──────────────────────────────────────────────────
+
+    def _responder(self, ruta: str, query: Dict) -> Optional[Dict]:
+        if ruta == f"/competitions/{self.competicion}/teams":
+            return {"teams": self.equipos}
+        if ruta == f"/competitions/{self.competicion}/matches":
+            partidos = self.partidos
+            if "matchday" in query:
+                partidos = [p for p in partidos if p["matchday"] == int(query["matchday"][0])]
+            if "dateFrom" in query and "dateTo" in query:
+                desde, hasta = query["dateFrom"][0], query["dateTo"][0]
+                partidos = [p for p in partidos if desde <= p["utcDate"][:10] <= hasta]
+            if "status" in query:
+                partidos = [p for p in partidos if p["status"] == query["status"][0]]
+            return {"matches": partidos}
+        m = re.fullmatch(r"/teams/(\d+)/matches", ruta)
+        if m:
+            eid = int(m.group(1))
+            partidos = [p for p in self.partidos
+                        if eid in (p["homeTeam"]["id"], p["awayTeam"]["id"])]
+            if "status" in query:
+                partidos = [p for p in partidos if p["status"] == query["status"][0]]
+            return {"matches": partidos}
+        return None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                inicio = time.monotonic()
+                url    = urlparse(self.path)
+                cuota  = stub._consumir()
+                if stub.latencia:
+                    time.sleep(stub.latencia)
+                cuerpo = stub._responder(url.path, parse_qs(url.query)) if cuota["ok"] else None
+                status = 200 if cuerpo is not None else (429 if not cuota["ok"] else 404)
+                datos  = json.dumps(cuerpo or {"message": "Too Many Requests"}).encode()
+                etag   = f'"{hashlib.sha1(datos).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, datos = 304, b""
+                with stub._lock:
+                    stub.registro.append({"t": inicio, "ruta": self.path, "status": status})
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                if status in (200, 304):
+                    self.send_header("ETag", etag)
+                self.send_header("X-Requests-Available-Minute", str(cuota["disponibles"]))
+                self.send_header("X-RequestCounter-Reset", f"{cuota['reinicio']:.3f}")
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # ── Ciclo de vida ──────────────────────────────────────────
+
+    def __enter__(self) -> "ServidorStub":
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
@@ -0,0 +1,427 @@
+"""
+CLIENTE FOOTBALL-DATA.ORG
+=========================
+Cliente HTTP para la API v4 de football-data.org con:
+
+- un limitador tipo token-bucket que se sincroniza con las cabeceras
+  ``X-Requests-Available-Minute`` / ``X-RequestCounter-Reset`` de la API,
+- una ``requests.Session`` con pool de conexiones compartida entre hilos,
+- descarga concurrente de partidos por equipo o, mejor, una sola petición al
+  endpoint de competición ``/competitions/{code}/matches?matchday=N``,
+- consultas por rango de fechas (``dateFrom``/``dateTo``) troceadas en ventanas
+  del tamaño máximo que admite la API,
+- una caché HTTP en disco (``CacheHTTP``) con TTL por endpoint y peticiones
+  condicionales (ETag / Last-Modified): repetir una carga no gasta cuota.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CABECERA_DISPONIBLES = "X-Requests-Available-Minute"
+CABECERA_REINICIO    = "X-RequestCounter-Reset"
+DIAS_MAX_VENTANA     = 10   # rango máximo dateFrom–dateTo que acepta la API
+
+
+def fecha_utc(texto: str) -> datetime:
+    """Fecha ISO 8601 (con ``Z``, con offset o sin zona, que se toma como UTC) → datetime UTC."""
+    fecha = datetime.fromisoformat(texto.replace("Z", "+00:00"))
+    return fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+
+
+def ventanas_fechas(desde: date, hasta: date, dias: int = DIAS_MAX_VENTANA) -> List[Tuple[date, date]]:
+    """Trocea ``[desde, hasta]`` (ambos incluidos) en ventanas de como mucho ``dias`` días."""
+    ventanas = []
+    while desde <= hasta:
+        fin = min(desde + timedelta(days=dias - 1), hasta)
+        ventanas.append((desde, fin))
+        desde = fin + timedelta(days=1)
+    return ventanas
+
+
+def ventanas_alrededor(fechas: Iterable[date], dias: int = DIAS_MAX_VENTANA) -> List[Tuple[date, date]]:
+    """
+    Ventanas de como mucho ``dias`` días que cubren ``fechas``, de la más
+    reciente a la más antigua; los días sin ninguna fecha no se consultan.
+    """
+    ventanas: List[Tuple[date, date]] = []
+    for d in sorted(set(fechas), reverse=True):
+        if ventanas and (ventanas[-1][1] - d).days < dias:
+            ventanas[-1] = (d, ventanas[-1][1])
+        else:
+            ventanas.append((d, d))
+    return ventanas
+
+
+class LimitadorPeticiones:
+    """
+    Token-bucket de ``capacidad`` peticiones por ``periodo`` segundos.
+
+    Mientras la API no informe de su cuota, las fichas se reponen de forma
+    continua. En cuanto llegan las cabeceras de cuota, el servidor manda: las
+    fichas disponibles nunca superan lo que dice la API y se reponen de golpe
+    cuando su contador se reinicia.
+    """
+
+    def __init__(self, capacidad: int = 10, periodo: float = 60.0,
+                 reloj: Callable[[], float] = time.monotonic,
+                 dormir: Callable[[float], None] = time.sleep):
+        self.capacidad = capacidad
+        self.periodo   = periodo
+        self._reloj    = reloj
+        self._dormir   = dormir
+        self._lock     = threading.Lock()
+        self._tokens   = float(capacidad)
+        self._ultimo   = reloj()
+        self._reinicio_en: Optional[float] = None
+        self.esperas   = 0.0
+
+    def _rellenar(self, ahora: float):
+        if self._reinicio_en is not None:
+            if ahora >= self._reinicio_en:
+                self._tokens, self._reinicio_en = float(self.capacidad), None
+        else:
+            ritmo = self.capacidad / self.periodo
+            self._tokens = min(float(self.capacidad), self._tokens + (ahora - self._ultimo) * ritmo)
+        self._ultimo = ahora
+
+    def adquirir(self):
+        """Bloquea hasta que haya una ficha disponible y la consume."""
+        while True:
+            with self._lock:
+                ahora = self._reloj()
+                self._rellenar(ahora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                if self._reinicio_en is not None:
+                    espera = self._reinicio_en - ahora
+                else:
+                    espera = (1 - self._tokens) * self.periodo / self.capacidad
+            espera = max(espera, 0.01)
+            self.esperas += espera
+            self._dormir(espera)
+
+    def actualizar(self, cabeceras) -> None:
+        """Ajusta el cubo con la cuota que informa la API en la respuesta."""
+        disponibles = cabeceras.get(CABECERA_DISPONIBLES)
+        reinicio    = cabeceras.get(CABECERA_REINICIO)
+        if disponibles is None and reinicio is None:
+            return
+        with self._lock:
+            ahora = self._reloj()
+            self._rellenar(ahora)
+            if reinicio is not None:
+                self._reinicio_en = ahora + float(reinicio)
+            if disponibles is not None:
+                self._tokens = min(self._tokens, float(disponibles))
+
+    def agotar(self, segundos: float):
+        """Vacía el cubo hasta dentro de ``segundos`` (tras un 429)."""
+        with self._lock:
+            self._tokens      = 0.0
+            self._reinicio_en = self._reloj() + segundos
+
+
+class CacheHTTP:
+    """
+    Caché en disco de respuestas GET, una entrada JSON por URL.
+
+    Una entrada está fresca durante el TTL de su endpoint (``ttls``: patrón
+    sobre ``ruta?query`` → segundos, gana el primero que coincide) o el
+    ``max-age`` de ``Cache-Control``, el menor de los dos. ``no-cache`` (y
+    ``must-revalidate`` sin ``max-age``) la deja caducada desde el principio:
+    se guarda, pero cada uso la revalida. Pasado ese tiempo se revalida con
+    ``If-None-Match`` / ``If-Modified-Since`` y un 304 la renueva sin
+    descargar el cuerpo. Las respuestas ``no-store`` no se guardan.
+
+    El tamaño total se lleva en memoria; solo al superar ``max_bytes`` se
+    recorre el directorio y se expulsan las entradas usadas hace más tiempo
+    (LRU por fecha de modificación) hasta bajar a ``RECORTE`` × ``max_bytes``.
+    """
+
+    RECORTE = 0.9   # holgura tras expulsar: no recorrer el directorio en cada guardado
+
+    def __init__(self, directorio: str, max_bytes: int = 50 * 1024 * 1024,
+                 ttls: Optional[Dict[str, float]] = None, reloj: Callable[[], float] = time.time):
+        self.directorio = directorio
+        self.max_bytes  = max_bytes
+        self.ttls       = [(re.compile(patron), ttl) for patron, ttl in (ttls or {}).items()]
+        self._reloj     = reloj
+        self._lock      = threading.Lock()
+        self.aciertos = self.revalidados = self.fallos = self.expulsadas = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._bytes = sum(tam for _, tam, _ in self._ficheros())
+
+    @staticmethod
+    def clave(ruta: str, params: Optional[Dict] = None) -> str:
+        return f"{ruta}?{urlencode(sorted((params or {}).items()))}" if params else ruta
+
+    def _fichero(self, clave: str) -> str:
+        return os.path.join(self.directorio, hashlib.sha256(clave.encode()).hexdigest() + ".json")
+
+    def _ficheros(self) -> List[Tuple[float, int, str]]:
+        """(mtime, tamaño, ruta) de cada entrada del directorio."""
+        ficheros = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".json"):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    st = os.stat(ruta)
+                except OSError:
+                    continue
+                ficheros.append((st.st_mtime, st.st_size, ruta))
+        return ficheros
+
+    @staticmethod
+    def _directivas(cabeceras) -> Dict[str, str]:
+        """``Cache-Control`` como {directiva: valor}."""
+        directivas = {}
+        for parte in cabeceras.get("Cache-Control", "").split(","):
+            nombre, _, valor = parte.strip().partition("=")
+            if nombre:
+                directivas[nombre.lower()] = valor.strip('"')
+        return directivas
+
+    def _ttl(self, clave: str, cabeceras) -> float:
+        directivas = self._directivas(cabeceras)
+        if "no-cache" in directivas:
+            return 0.0
+        ttl = next((ttl for patron, ttl in self.ttls if patron.search(clave)), None)
+        try:
+            max_age = float(directivas["max-age"])
+        except (KeyError, ValueError):
+            # Sin max-age el TTL del endpoint hace de frescura heurística, que
+            # must-revalidate no permite
+            return 0.0 if ttl is None or "must-revalidate" in directivas else ttl
+        return max_age if ttl is None else min(ttl, max_age)
+
+    def leer(self, clave: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._fichero(clave), encoding="utf-8") as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entrada if entrada.get("clave") == clave else None
+
+    def fresca(self, entrada: Dict[str, Any]) -> bool:
+        return self._reloj() < entrada["guardada"] + entrada["ttl"]
+
+    def condicionales(self, entrada: Dict[str, Any]) -> Dict[str, str]:
+        """Cabeceras para revalidar la entrada con el servidor."""
+        cabeceras = {}
+        if entrada.get("etag"):
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras
+
+    def usar(self, clave: str):
+        """Marca la entrada como recién usada (orden LRU)."""
+        try:
+            os.utime(self._fichero(clave))
+        except OSError:
+            pass
+        with self._lock:
+            self.aciertos += 1
+
+    def guardar(self, clave: str, cabeceras, cuerpo: Any,
+                anterior: Optional[Dict[str, Any]] = None):
+        """Guarda una respuesta 200 o, con ``anterior``, renueva la entrada tras un 304."""
+        if "no-store" in self._directivas(cabeceras):
+            return
+        anterior = anterior or {}
+        entrada  = {
+            "clave":         clave,
+            "guardada":      self._reloj(),
+            "ttl":           self._ttl(clave, cabeceras),
+            "etag":          cabeceras.get("ETag") or anterior.get("etag"),
+            "last_modified": cabeceras.get("Last-Modified") or anterior.get("last_modified"),
+            "cuerpo":        cuerpo,
+        }
+        fichero = self._fichero(clave)
+        temporal = f"{fichero}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(entrada, f)
+        nuevo = os.path.getsize(temporal)
+        try:
+            viejo = os.path.getsize(fichero)
+        except OSError:
+            viejo = 0
+        os.replace(temporal, fichero)
+        with self._lock:
+            self._bytes += nuevo - viejo
+            if anterior:
+                self.revalidados += 1
+            else:
+                self.fallos += 1
+            lleno = self._bytes > self.max_bytes
+        if lleno:
+            self._recortar()
+
+    def _recortar(self):
+        """Expulsa por LRU; el total se rehace del directorio (otros procesos escriben)."""
+        with self._lock:
+            ficheros = self._ficheros()
+            total    = sum(tam for _, tam, _ in ficheros)
+            for _, tam, ruta in sorted(ficheros):
+                if total <= self.max_bytes * self.RECORTE:
+                    break
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    continue
+                total -= tam
+                self.expulsadas += 1
+            self._bytes = total
+
+    def limpiar(self):
+        with self._lock:
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(".json"):
+                    os.remove(os.path.join(self.directorio, nombre))
+            self.aciertos = self.revalidados = self.fallos = self.expulsadas = 0
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            tamanos = [os.path.getsize(os.path.join(self.directorio, n))
+                       for n in os.listdir(self.directorio) if n.endswith(".json")]
+            total = self.aciertos + self.revalidados + self.fallos
+            return {
+                "entradas":     len(tamanos),
+                "bytes":        sum(tamanos),
+                "aciertos":     self.aciertos,
+                "revalidados":  self.revalidados,
+                "fallos":       self.fallos,
+                "expulsadas":   self.expulsadas,
+                "tasa_acierto": (self.aciertos + self.revalidados) / total if total else 0.0,
+            }
+
+
+class ClienteFootballData:
+    """Cliente de football-data.org con sesión compartida y control de cuota."""
+
+    def __init__(self, token: str, base_url: str, competicion: str,
+                 limitador: Optional[LimitadorPeticiones] = None,
+                 max_hilos: int = 4, timeout: float = 15, reintentos: int = 3,
+                 sesion: Optional[requests.Session] = None, cache: Optional[CacheHTTP] = None):
+        self.base_url    = base_url.rstrip("/")
+        self.competicion = competicion
+        self.limitador   = limitador or LimitadorPeticiones()
+        self.max_hilos   = max_hilos
+        self.timeout     = timeout
+        self.reintentos  = reintentos
+        self.cache       = cache
+        self.peticiones  = 0
+
+        if sesion is None:
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_hilos)
+            sesion.mount("http://", adaptador)
+            sesion.mount("https://", adaptador)
+        self.sesion = sesion
+        self.sesion.headers["X-Auth-Token"] = token
+
+    def get(self, ruta: str, params: Optional[Dict] = None, refrescar: bool = False) -> Dict:
+        """
+        GET con limitador; reintenta los 429 esperando al reinicio de la cuota.
+
+        Con caché, una entrada fresca se devuelve sin tocar la red ni la cuota
+        (salvo ``refrescar``) y una caducada se revalida de forma condicional.
+        """
+        clave   = CacheHTTP.clave(ruta, params)
+        entrada = self.cache.leer(clave) if self.cache else None
+        if entrada and not refrescar and self.cache.fresca(entrada):
+            self.cache.usar(clave)
+            return entrada["cuerpo"]
+        cabeceras = self.cache.condicionales(entrada) if entrada else {}
+
+        for intento in range(self.reintentos + 1):
+            self.limitador.adquirir()
+            self.peticiones += 1
+            r = self.sesion.get(f"{self.base_url}{ruta}", params=params, timeout=self.timeout,
+                                headers=cabeceras)
+            self.limitador.actualizar(r.headers)
+            if r.status_code == 429:
+                self.limitador.agotar(float(r.headers.get(CABECERA_REINICIO, 60)))
+                if intento == self.reintentos:
+                    raise requests.exceptions.RetryError(
+                        f"Cuota agotada tras {self.reintentos} reintentos: {ruta}")
+                continue
+            if r.status_code == 304 and entrada:
+                self.cache.guardar(clave, r.headers, entrada["cuerpo"], anterior=entrada)
+                return entrada["cuerpo"]
+            r.raise_for_status()
+            datos = r.json()
+            if self.cache:
+                self.cache.guardar(clave, r.headers, datos)
+            return datos
+
+    # ── Endpoints ──────────────────────────────────────────────
+
+    def equipos(self) -> List[Dict]:
+        return self.get(f"/competitions/{self.competicion}/teams").get("teams", [])
+
+    def partidos_jornada(self, matchday: int, status: Optional[str] = None) -> List[Dict]:
+        """Todos los partidos de una jornada de la competición en una sola petición."""
+        params = {"matchday": matchday}
+        if status:
+            params["status"] = status
+        return self.get(f"/competitions/{self.competicion}/matches", params).get("matches", [])
+
+    def partidos_fechas(self, desde: date, hasta: date, status: Optional[str] = None) -> List[Dict]:
+        """Partidos de la competición entre dos fechas (incluidas; como mucho ``DIAS_MAX_VENTANA``)."""
+        params = {"dateFrom": desde.isoformat(), "dateTo": hasta.isoformat()}
+        if status:
+            params["status"] = status
+        return self.get(f"/competitions/{self.competicion}/matches", params).get("matches", [])
+
+    def partido(self, partido_id: int) -> Dict:
+        """Un partido por su id, con su estado y fecha actuales (p. ej. un aplazado ya reprogramado)."""
+        return self.get(f"/matches/{partido_id}")
+
+    def partidos_equipo(self, equipo_id: int, status: Optional[str] = None) -> List[Dict]:
+        params = {"status": status} if status else None
+        partidos = self.get(f"/teams/{equipo_id}/matches", params).get("matches", [])
+        return [p for p in partidos
+                if p.get("competition", {}).get("code") == self.competicion]
+
+    def partidos_por_equipos(
+        self,
+        equipo_ids: Iterable[int],
+        status: Optional[str] = None,
+        al_avanzar: Optional[Callable[[int, int, int, Optional[Exception]], None]] = None,
+    ) -> Tuple[List[Dict], Dict[int, Exception]]:
+        """
+        Descarga en paralelo los partidos de cada equipo y los deduplica por id.
+
+        ``al_avanzar(hechos, total, equipo_id, error)`` se invoca desde el hilo
+        que llama (no desde los hilos del pool), así que puede tocar la UI.
+        Devuelve (partidos únicos, errores por equipo).
+        """
+        equipo_ids = list(equipo_ids)
+        unicos: Dict[int, Dict] = {}
+        errores: Dict[int, Exception] = {}
+        with ThreadPoolExecutor(max_workers=self.max_hilos) as pool:
+            futuros = {pool.submit(self.partidos_equipo, eid, status): eid for eid in equipo_ids}
+            for hechos, fut in enumerate(as_completed(futuros), 1):
+                eid, error = futuros[fut], None
+                try:
+                    for p in fut.result():
+                        unicos.setdefault(p["id"], p)
+                except Exception as e:
+                    errores[eid] = error = e
+                if al_avanzar:
+                    al_avanzar(hechos, len(equipo_ids), eid, error)
+        return list(unicos.values()), errores
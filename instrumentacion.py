@@ -0,0 +1,239 @@
+"""
+INSTRUMENTACIÓN DE LOS CAMINOS CALIENTES
+========================================
+Mide cada viaje que hace ``GestorLiga``:
+
+- ``ClienteInstrumentado`` envuelve el cliente de datos (Supabase o SQLite):
+  cada ``table(...)...execute()`` y ``rpc(...).execute()`` registra tabla,
+  operación, tiempo, filas devueltas y el método del gestor que la originó;
+- ``Instrumentacion.instrumentar_sesion`` hace lo mismo con los GET de la
+  sesión HTTP de football-data.org;
+- ``Instrumentacion.ambito(pagina)`` agrupa lo medido por ejecución (rerun)
+  de Streamlit y por página.
+
+Los agregados se exportan en JSON (``a_json``) o en el formato de texto de
+Prometheus (``a_prometheus``). Desactivada, cada consulta paga una sola
+comprobación de ``activa``: el query-builder no se envuelve.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+OPERACIONES = ("select", "insert", "upsert", "update", "delete")
+SIN_METODO  = "-"   # consultas hechas fuera de un método del propietario
+
+
+class Instrumentacion:
+    """Registro de consultas y peticiones con agregados por página y por ejecución."""
+
+    def __init__(self, activa: bool = False, max_ejecuciones: int = 200,
+                 propietario: Any = None):
+        self.activa      = activa
+        self.propietario = propietario
+        self._lock       = threading.Lock()
+        self._local      = threading.local()
+        self._ejecuciones: deque = deque(maxlen=max_ejecuciones)
+        self._reruns     = 0
+        self.limpiar()
+
+    def limpiar(self):
+        with self._lock:
+            # (origen, recurso, operacion, metodo) → [llamadas, segundos, filas]
+            self._consultas: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0.0, 0])
+            # pagina → [ejecuciones, segundos, viajes, segundos en viajes]
+            self._paginas: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0.0])
+            self._ejecuciones.clear()
+
+    # ── Registro ───────────────────────────────────────────────
+
+    def _metodo(self) -> str:
+        """Método del propietario más externo en la pila (el que llamó la página)."""
+        if self.propietario is None:
+            return SIN_METODO
+        clase, metodo = type(self.propietario), SIN_METODO
+        frame = sys._getframe(2)
+        while frame is not None:
+            nombre = frame.f_code.co_name
+            if hasattr(clase, nombre) and frame.f_locals.get("self") is self.propietario:
+                metodo = nombre
+            frame = frame.f_back
+        return metodo
+
+    def registrar(self, origen: str, recurso: str, operacion: str, segundos: float,
+                  filas: Optional[int] = None):
+        metodo = self._metodo()
+        actual = getattr(self._local, "ejecucion", None)
+        with self._lock:
+            c = self._consultas[(origen, recurso, operacion, metodo)]
+            c[0] += 1
+            c[1] += segundos
+            c[2] += filas or 0
+            if actual is not None:
+                actual["viajes"] += 1
+                actual[f"segundos_{origen}"] += segundos
+
+    @contextmanager
+    def ambito(self, pagina: str) -> Iterator[None]:
+        """Agrupa lo que se mida dentro como una ejecución de ``pagina``."""
+        if not self.activa:
+            yield
+            return
+        with self._lock:
+            self._reruns += 1
+            rerun = self._reruns
+        ejecucion = {"rerun": rerun, "pagina": pagina,
+                     "inicio": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "viajes": 0, "segundos_supabase": 0.0, "segundos_http": 0.0}
+        anterior, self._local.ejecucion = getattr(self._local, "ejecucion", None), ejecucion
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ejecucion["segundos"] = time.perf_counter() - t0
+            self._local.ejecucion = anterior
+            with self._lock:
+                self._ejecuciones.append(ejecucion)
+                p = self._paginas[pagina]
+                p[0] += 1
+                p[1] += ejecucion["segundos"]
+                p[2] += ejecucion["viajes"]
+                p[3] += ejecucion["segundos_supabase"] + ejecucion["segundos_http"]
+
+    def instrumentar_sesion(self, sesion) -> None:
+        """Envuelve ``sesion.get`` (``requests.Session`` o compatible) para medir cada GET."""
+        get = sesion.get
+
+        def get_medido(url, *args, **kwargs):
+            if not self.activa:
+                return get(url, *args, **kwargs)
+            t0 = time.perf_counter()
+            r  = get(url, *args, **kwargs)
+            ruta = url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0]
+            self.registrar("http", f"/{ruta}", f"GET {r.status_code}", time.perf_counter() - t0)
+            return r
+
+        sesion.get = get_medido
+
+    # ── Consulta de agregados ──────────────────────────────────
+
+    def resumen(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = [{
+                "origen": o, "recurso": r, "operacion": op, "metodo": m,
+                "llamadas": int(n), "segundos": round(seg, 6), "filas": int(filas),
+                "ms_medio": round(seg / n * 1000, 3) if n else 0.0,
+            } for (o, r, op, m), (n, seg, filas) in self._consultas.items()]
+            paginas = [{
+                "pagina": pagina, "ejecuciones": int(n), "segundos": round(seg, 6),
+                "viajes": int(viajes), "segundos_viajes": round(seg_v, 6),
+                "ms_medio": round(seg / n * 1000, 3) if n else 0.0,
+                "viajes_medio": round(viajes / n, 2) if n else 0.0,
+            } for pagina, (n, seg, viajes, seg_v) in self._paginas.items()]
+            ejecuciones = [{k: round(v, 6) if isinstance(v, float) else v for k, v in e.items()}
+                           for e in self._ejecuciones]
+        consultas.sort(key=lambda c: -c["segundos"])
+        return {"activa": self.activa, "consultas": consultas, "paginas": paginas,
+                "ejecuciones": ejecuciones}
+
+    def a_json(self) -> str:
+        return json.dumps(self.resumen(), indent=2, ensure_ascii=False)
+
+    def a_prometheus(self, prefijo: str = "la_polla") -> str:
+        """Agregados en el formato de exposición de texto de Prometheus."""
+        datos  = self.resumen()
+        lineas = []
+
+        def metrica(nombre: str, ayuda: str, muestras: List[tuple]):
+            lineas.append(f"# HELP {prefijo}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {prefijo}_{nombre} counter")
+            for etiquetas, valor in muestras:
+                texto = ",".join(f'{k}="{_escapar(v)}"' for k, v in etiquetas.items())
+                lineas.append(f"{prefijo}_{nombre}{{{texto}}} {valor}")
+
+        claves = lambda c: {k: c[k] for k in ("origen", "recurso", "operacion", "metodo")}
+        metrica("consultas_total", "Consultas y peticiones ejecutadas.",
+                [(claves(c), c["llamadas"]) for c in datos["consultas"]])
+        metrica("consultas_segundos_total", "Tiempo acumulado en consultas y peticiones.",
+                [(claves(c), c["segundos"]) for c in datos["consultas"]])
+        metrica("consultas_filas_total", "Filas devueltas por las consultas.",
+                [(claves(c), c["filas"]) for c in datos["consultas"] if c["origen"] != "http"])
+        metrica("pagina_ejecuciones_total", "Ejecuciones (reruns) de cada página.",
+                [({"pagina": p["pagina"]}, p["ejecuciones"]) for p in datos["paginas"]])
+        metrica("pagina_segundos_total", "Tiempo acumulado de cada página.",
+                [({"pagina": p["pagina"]}, p["segundos"]) for p in datos["paginas"]])
+        metrica("pagina_viajes_total", "Viajes hechos por cada página.",
+                [({"pagina": p["pagina"]}, p["viajes"]) for p in datos["paginas"]])
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor: Any) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# =============================================================================
+# CLIENTE DE DATOS INSTRUMENTADO
+# =============================================================================
+
+class _ConsultaMedida:
+    """Query-builder envuelto: reenvía la cadena y mide ``execute()``."""
+
+    __slots__ = ("_consulta", "_instr", "_recurso", "_operacion")
+
+    def __init__(self, consulta, instr: Instrumentacion, recurso: str, operacion: str):
+        self._consulta  = consulta
+        self._instr     = instr
+        self._recurso   = recurso
+        self._operacion = operacion
+
+    def __getattr__(self, nombre: str):
+        atributo = getattr(self._consulta, nombre)
+        if not callable(atributo):
+            return atributo
+
+        def encadenar(*args, **kwargs):
+            resultado = atributo(*args, **kwargs)
+            if not hasattr(resultado, "execute"):
+                return resultado
+            operacion = nombre if nombre in OPERACIONES else self._operacion
+            return _ConsultaMedida(resultado, self._instr, self._recurso, operacion)
+        return encadenar
+
+    def execute(self):
+        t0   = time.perf_counter()
+        resp = self._consulta.execute()
+        datos = getattr(resp, "data", None)
+        self._instr.registrar("supabase", self._recurso, self._operacion, time.perf_counter() - t0,
+                              len(datos) if isinstance(datos, list) else None)
+        return resp
+
+
+class ClienteInstrumentado:
+    """
+    Envoltorio de un cliente con la interfaz de ``supabase.Client``. Con la
+    instrumentación desactivada devuelve el query-builder original.
+    """
+
+    def __init__(self, cliente, instr: Instrumentacion):
+        self._cliente = cliente
+        self.instr    = instr
+
+    def table(self, nombre: str):
+        consulta = self._cliente.table(nombre)
+        if not self.instr.activa:
+            return consulta
+        return _ConsultaMedida(consulta, self.instr, nombre, "select")
+
+    def rpc(self, nombre: str, *args, **kwargs):
+        llamada = self._cliente.rpc(nombre, *args, **kwargs)
+        if not self.instr.activa:
+            return llamada
+        return _ConsultaMedida(llamada, self.instr, f"rpc:{nombre}", "rpc")
+
+    def __getattr__(self, nombre: str):
+        return getattr(self._cliente, nombre)
@@ -0,0 +1,31 @@
+"""
+Sincronización automática de resultados
+=======================================
+Ejecuta ``GestorLiga.sincronizar_resultados`` con la configuración de
+``.streamlit/secrets.toml`` y ``API_CONFIG``. Pensado para lanzarse
+periódicamente, p. ej. desde cron cada 15 minutos en días de partido:
+
+    */15 * * * *  cd /ruta/la_polla && python sincronizar_resultados.py --liquidar
+
+Cada ejecución gasta como mucho ``SINCRO_MAX_PETICIONES`` peticiones de la cuota.
+"""
+
+import argparse
+import json
+
+from app import GestorLiga, TEMPORADA
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--temporada", default=TEMPORADA)
+    ap.add_argument("--liquidar", action="store_true",
+                    help="liquidar las jornadas con partidos recién finalizados")
+    args = ap.parse_args()
+
+    informe = GestorLiga().sincronizar_resultados(args.temporada, liquidar=args.liquidar)
+    print(json.dumps(informe, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+-- Saldo de un usuario en una temporada en un solo viaje:
+-- puntos totales (o los iniciales si aún no tiene puntaje) y puntos
+-- comprometidos en apuestas sin liquidar de partidos no finalizados.
+
+create or replace function saldo_usuario(
+    p_usuario_id        bigint,
+    p_temporada         text,
+    p_puntos_iniciales  integer default 100
+)
+returns table (puntos_totales integer, comprometidos integer, disponible integer)
+language sql
+stable
+as $$
+    with total as (
+        select coalesce(
+            (select pu.puntos_totales
+               from puntajes pu
+              where pu.usuario_id = p_usuario_id
+                and pu.temporada  = p_temporada),
+            p_puntos_iniciales) as puntos
+    ),
+    comprometido as (
+        select coalesce(sum(a.puntos_apostados), 0)::integer as puntos
+          from apuestas a
+          join partidos pa on pa.id = a.partido_id
+          join jornadas j  on j.id  = pa.jornada_id
+         where a.usuario_id = p_usuario_id
+           and a.puntos_obtenidos is null
+           and pa.estado is distinct from 'finalizado'
+           and j.temporada = p_temporada
+    )
+    select total.puntos, comprometido.puntos, total.puntos - comprometido.puntos
+      from total, comprometido;
+$$;
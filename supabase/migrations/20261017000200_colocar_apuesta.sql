@@ -0,0 +1,82 @@
+-- Colocación atómica e idempotente de apuestas.
+--
+-- La comprobación de saldo y el upsert sobre (usuario_id, partido_id,
+-- tipo_apuesta) ocurren en la misma transacción, serializada por usuario con
+-- un advisory lock. Cada envío lleva una clave de idempotencia: reenviar la
+-- misma clave devuelve la apuesta ya registrada sin volver a aplicarla.
+
+create table if not exists solicitudes_apuesta (
+    clave       text primary key,
+    apuesta_id  bigint not null references apuestas (id) on delete cascade,
+    creada_en   timestamptz not null default now()
+);
+
+create or replace function colocar_apuesta(
+    p_usuario_id        bigint,
+    p_partido_id        bigint,
+    p_tipo              text,
+    p_prediccion        text,
+    p_puntos            integer,
+    p_temporada         text,
+    p_clave             text,
+    p_puntos_iniciales  integer default 100
+)
+returns setof apuestas
+language plpgsql
+as $$
+declare
+    v_apuesta_id  bigint;
+    v_actual      integer;
+    v_disponible  integer;
+begin
+    perform pg_advisory_xact_lock(p_usuario_id);
+
+    select s.apuesta_id into v_apuesta_id
+      from solicitudes_apuesta s
+     where s.clave = p_clave;
+    if found then
+        return query select * from apuestas where id = v_apuesta_id;
+        return;
+    end if;
+
+    -- La apuesta que se reemplaza libera sus puntos comprometidos
+    select coalesce(sum(a.puntos_apostados), 0)::integer into v_actual
+      from apuestas a
+      join partidos pa on pa.id = a.partido_id
+      join jornadas j  on j.id  = pa.jornada_id
+     where a.usuario_id   = p_usuario_id
+       and a.partido_id   = p_partido_id
+       and a.tipo_apuesta = p_tipo
+       and a.puntos_obtenidos is null
+       and pa.estado is distinct from 'finalizado'
+       and j.temporada = p_temporada;
+
+    select s.disponible + v_actual into v_disponible
+      from saldo_usuario(p_usuario_id, p_temporada, p_puntos_iniciales) s;
+
+    if p_puntos > v_disponible then
+        raise exception 'Saldo insuficiente. Disponible: % pts', v_disponible
+              using errcode = 'P0001';
+    end if;
+
+    insert into apuestas as a
+           (usuario_id, partido_id, tipo_apuesta, prediccion,
+            puntos_apostados, puntos_obtenidos, fecha_apuesta)
+    values (p_usuario_id, p_partido_id, p_tipo, p_prediccion,
+            p_puntos, null, now())
+    on conflict (usuario_id, partido_id, tipo_apuesta) do update
+       set prediccion       = excluded.prediccion,
+           puntos_apostados = excluded.puntos_apostados,
+           fecha_apuesta    = excluded.fecha_apuesta
+     where a.puntos_obtenidos is null
+    returning a.id into v_apuesta_id;
+
+    if v_apuesta_id is null then
+        raise exception 'La apuesta ya está liquidada y no se puede modificar'
+              using errcode = 'P0001';
+    end if;
+
+    insert into solicitudes_apuesta (clave, apuesta_id) values (p_clave, v_apuesta_id);
+    return query select * from apuestas where id = v_apuesta_id;
+end;
+$$;
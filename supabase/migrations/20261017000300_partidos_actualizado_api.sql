@@ -0,0 +1,7 @@
+-- Marca de agua de la sincronización de resultados: el ``lastUpdated`` de
+-- football-data.org con el que se escribió por última vez cada partido.
+-- ``GestorLiga.sincronizar_resultados`` ignora los partidos de la API cuyo
+-- ``lastUpdated`` no es posterior a esta marca.
+
+alter table partidos
+    add column if not exists actualizado_api timestamptz;
@@ -0,0 +1,22 @@
+-- Fotos de la clasificación por jornada.
+--
+-- ``GestorLiga.procesar_jornada`` escribe, tras liquidar una jornada, una fila
+-- por usuario con puntaje en la temporada: puntos, posición, aciertos, fallos
+-- y ``delta`` (puntos ganados en la jornada). El histórico de posiciones se
+-- lee de aquí, sin volver a recorrer las apuestas.
+
+create table if not exists clasificacion_jornadas (
+    id              bigint generated by default as identity primary key,
+    jornada_id      bigint      not null references jornadas (id) on delete cascade,
+    temporada       varchar(10) not null,
+    usuario_id      bigint      not null references usuarios (id) on delete cascade,
+    posicion        integer     not null,
+    puntos_totales  integer     not null,
+    aciertos        integer     not null,
+    fallos          integer     not null,
+    delta           integer     not null,
+    constraint uq_clasificacion_jornada_usuario unique (jornada_id, usuario_id)
+);
+
+create index if not exists ix_clasificacion_temporada_usuario
+    on clasificacion_jornadas (temporada, usuario_id);
@@ -0,0 +1,21 @@
+-- Índices por temporada.
+--
+-- Todas las lecturas calientes filtran por temporada (jornadas, puntajes) o
+-- llegan a las apuestas a través de partido y jornada. Con varias temporadas
+-- acumuladas, estos índices mantienen el coste de la temporada en curso
+-- independiente del histórico. Son los mismos que crea ``backend_sqlite``.
+
+create index if not exists ix_jornadas_temporada_numero
+    on jornadas (temporada, numero);
+
+create index if not exists ix_partidos_jornada_fecha
+    on partidos (jornada_id, fecha_hora);
+
+create index if not exists ix_apuestas_partido
+    on apuestas (partido_id);
+
+create index if not exists ix_apuestas_pendientes_usuario
+    on apuestas (usuario_id) where puntos_obtenidos is null;
+
+create index if not exists ix_puntajes_temporada_puntos
+    on puntajes (temporada, puntos_totales desc, aciertos desc);
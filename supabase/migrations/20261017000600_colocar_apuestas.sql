@@ -0,0 +1,91 @@
+-- Colocación de un boleto completo (varias apuestas) en una sola transacción.
+--
+-- ``p_apuestas`` es un array JSON de {partido_id, tipo_apuesta, prediccion,
+-- puntos_apostados}. El saldo se comprueba una vez para todo el boleto (las
+-- apuestas que se reemplazan liberan sus puntos) y las filas se escriben con
+-- un único upsert: o entra el boleto entero o no entra nada. Cada apuesta
+-- registra en ``solicitudes_apuesta`` la clave ``p_clave:partido_id:tipo``;
+-- reenviar el mismo boleto devuelve las apuestas ya registradas.
+
+create or replace function colocar_apuestas(
+    p_usuario_id        bigint,
+    p_temporada         text,
+    p_apuestas          jsonb,
+    p_clave             text,
+    p_puntos_iniciales  integer default 100
+)
+returns setof apuestas
+language plpgsql
+as $$
+declare
+    v_claves      text[];
+    v_liberados   integer;
+    v_coste       integer;
+    v_disponible  integer;
+    v_filas       integer;
+begin
+    perform pg_advisory_xact_lock(p_usuario_id);
+
+    select array_agg(p_clave || ':' || b.partido_id || ':' || b.tipo_apuesta),
+           coalesce(sum(b.puntos_apostados), 0)::integer
+      into v_claves, v_coste
+      from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text,
+                                                puntos_apostados integer);
+
+    if exists (select 1 from solicitudes_apuesta s where s.clave = any(v_claves)) then
+        return query select a.* from apuestas a
+                       join solicitudes_apuesta s on s.apuesta_id = a.id
+                      where s.clave = any(v_claves);
+        return;
+    end if;
+
+    -- Las apuestas que se reemplazan liberan sus puntos comprometidos
+    select coalesce(sum(a.puntos_apostados), 0)::integer into v_liberados
+      from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text)
+      join apuestas a  on a.usuario_id   = p_usuario_id
+                      and a.partido_id   = b.partido_id
+                      and a.tipo_apuesta = b.tipo_apuesta
+      join partidos pa on pa.id = a.partido_id
+      join jornadas j  on j.id  = pa.jornada_id
+     where a.puntos_obtenidos is null
+       and pa.estado is distinct from 'finalizado'
+       and j.temporada = p_temporada;
+
+    select s.disponible + v_liberados into v_disponible
+      from saldo_usuario(p_usuario_id, p_temporada, p_puntos_iniciales) s;
+
+    if v_coste > v_disponible then
+        raise exception 'Saldo insuficiente. Disponible: % pts, boleto: % pts', v_disponible, v_coste
+              using errcode = 'P0001';
+    end if;
+
+    with escritas as (
+        insert into apuestas as a
+               (usuario_id, partido_id, tipo_apuesta, prediccion,
+                puntos_apostados, puntos_obtenidos, fecha_apuesta)
+        select p_usuario_id, b.partido_id, b.tipo_apuesta, b.prediccion,
+               b.puntos_apostados, null, now()
+          from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text,
+                                                    prediccion text, puntos_apostados integer)
+        on conflict (usuario_id, partido_id, tipo_apuesta) do update
+           set prediccion       = excluded.prediccion,
+               puntos_apostados = excluded.puntos_apostados,
+               fecha_apuesta    = excluded.fecha_apuesta
+         where a.puntos_obtenidos is null
+        returning a.id, a.partido_id, a.tipo_apuesta
+    )
+    insert into solicitudes_apuesta (clave, apuesta_id)
+    select p_clave || ':' || e.partido_id || ':' || e.tipo_apuesta, e.id
+      from escritas e;
+    get diagnostics v_filas = row_count;
+
+    if v_filas < jsonb_array_length(p_apuestas) then
+        raise exception 'El boleto incluye apuestas ya liquidadas que no se pueden modificar'
+              using errcode = 'P0001';
+    end if;
+
+    return query select a.* from apuestas a
+                   join solicitudes_apuesta s on s.apuesta_id = a.id
+                  where s.clave = any(v_claves);
+end;
+$$;
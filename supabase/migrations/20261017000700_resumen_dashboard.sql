@@ -0,0 +1,42 @@
+-- Resumen del dashboard en un solo viaje.
+--
+-- Devuelve una fila con los recuentos (equipos, usuarios activos, jornadas de
+-- la temporada), las ``p_top`` primeras posiciones de la clasificación con su
+-- usuario embebido y las ``p_recientes`` últimas jornadas con su número de
+-- partidos. El tamaño de la respuesta no depende del número de usuarios: el
+-- top sale del índice ``ix_puntajes_temporada_puntos``.
+
+create or replace function resumen_dashboard(
+    p_temporada   text,
+    p_top         integer default 5,
+    p_recientes   integer default 5
+)
+returns table (equipos integer, usuarios integer, jornadas integer, top jsonb, recientes jsonb)
+language sql
+stable
+as $$
+    select
+        (select count(*) from equipos)::integer,
+        (select count(*) from usuarios u where u.activo)::integer,
+        (select count(*) from jornadas j where j.temporada = p_temporada)::integer,
+        coalesce((
+            select jsonb_agg(t.fila order by t.puntos_totales desc, t.aciertos desc, t.id)
+              from (select pu.id, pu.puntos_totales, pu.aciertos,
+                           to_jsonb(pu) || jsonb_build_object('usuarios', to_jsonb(u)) as fila
+                      from puntajes pu
+                      left join usuarios u on u.id = pu.usuario_id
+                     where pu.temporada = p_temporada
+                     order by pu.puntos_totales desc, pu.aciertos desc, pu.id
+                     limit p_top) t
+        ), '[]'::jsonb),
+        coalesce((
+            select jsonb_agg(to_jsonb(r) order by r.numero)
+              from (select j.*,
+                           (select count(*) from partidos pa where pa.jornada_id = j.id)::integer
+                               as total_partidos
+                      from jornadas j
+                     where j.temporada = p_temporada
+                     order by j.numero desc
+                     limit p_recientes) r
+        ), '[]'::jsonb);
+$$;
@@ -0,0 +1,64 @@
+-- Cola de trabajos de liquidación.
+--
+-- ``GestorLiga.encolar_liquidacion`` crea un trabajo por jornada (como mucho
+-- uno activo a la vez) y ``trabajador_liquidacion.py`` los ejecuta por
+-- bloques. Cada bloque deja en el trabajo su checkpoint: ``cursor_id`` (última
+-- apuesta vista), ``deltas`` acumulados por usuario, ``resumen`` y, en
+-- ``pendiente``, las filas que se van a escribir a continuación; si el
+-- trabajador cae, otro retoma el trabajo desde ahí cuando ``latido`` caduca.
+
+create table if not exists trabajos_liquidacion (
+    id            bigint generated by default as identity primary key,
+    jornada_id    bigint      not null references jornadas (id) on delete cascade,
+    temporada     varchar(10) not null,
+    estado        varchar(12) not null default 'pendiente',   -- pendiente | en_curso | completado | fallido
+    fase          varchar(12) not null default 'apuestas',    -- apuestas | puntajes
+    total         integer     not null default 0,
+    procesadas    integer     not null default 0,
+    cursor_id     bigint      not null default 0,
+    deltas        jsonb,
+    resumen       jsonb,
+    pendiente     jsonb,
+    trabajador    text,
+    intentos      integer     not null default 0,
+    error         text,
+    creado_en     timestamptz not null default now(),
+    latido        timestamptz,
+    terminado_en  timestamptz
+);
+
+create index if not exists ix_trabajos_liquidacion_estado
+    on trabajos_liquidacion (estado, id);
+
+create unique index if not exists uq_trabajo_liquidacion_activo
+    on trabajos_liquidacion (jornada_id)
+    where estado in ('pendiente', 'en_curso');
+
+
+-- Reclama el trabajo pendiente más antiguo, o uno en curso cuyo trabajador no
+-- ha dado señales en ``p_caducidad_seg`` segundos. ``skip locked`` evita que
+-- dos trabajadores se lleven el mismo trabajo.
+
+create or replace function reclamar_liquidacion(
+    p_trabajador     text,
+    p_caducidad_seg  integer default 60
+)
+returns setof trabajos_liquidacion
+language sql
+as $$
+    update trabajos_liquidacion
+       set estado     = 'en_curso',
+           trabajador = p_trabajador,
+           intentos   = intentos + 1,
+           latido     = now()
+     where id = (select t.id
+                   from trabajos_liquidacion t
+                  where t.estado = 'pendiente'
+                     or (t.estado = 'en_curso'
+                         and (t.latido is null
+                              or t.latido < now() - make_interval(secs => p_caducidad_seg)))
+                  order by t.id
+                  limit 1
+                    for update skip locked)
+    returning *;
+$$;
@@ -0,0 +1,407 @@
+-- Libro de puntos: movimientos de solo inserción y puntajes como proyección.
+--
+-- Cada cambio en los puntos de un usuario es una fila de ``movimientos_puntos``
+-- con sus deltas sobre la proyección (``puntos``, ``comprometidos``,
+-- ``aciertos``, ``fallos``, ``partidos_apostados``):
+--
+--   apuesta      comprometidos +apostado              (colocar_apuesta/s)
+--   reembolso    comprometidos -apostado              (la apuesta se reemplaza)
+--   liquidacion  puntos +neta, comprometidos -apostado, aciertos/fallos, partidos_apostados +1
+--   ajuste       deltas de una corrección             (recalcular_temporada)
+--
+-- ``registrar_movimientos`` inserta los movimientos y suma a ``puntajes`` solo
+-- los que entran: ``clave`` es única, así que repetir una liquidación (un
+-- reintento, dos liquidaciones a la vez) no cuenta nada dos veces y no hace
+-- falta bloquear. El saldo disponible es ``puntos_totales - comprometidos`` de
+-- una sola fila de ``puntajes``; ``reconstruir_puntajes`` la rehace desde el
+-- libro.
+
+-- Saldo de apertura de cada puntaje. Se supone que todas las temporadas
+-- empezaron con ``PUNTOS_INICIALES`` de app.py (el valor por defecto de
+-- ``p_puntos_iniciales``): si cambia allí, cámbialo aquí antes de migrar. Lo
+-- usan el ajuste de apertura y la reconstrucción final.
+select set_config('la_polla.puntos_iniciales', '100', false);
+
+-- Los trabajos a medias guardan deltas que el libro no conoce: se migra con
+-- la cola de liquidación vacía
+do $$
+begin
+    if exists (select 1 from trabajos_liquidacion where estado in ('pendiente', 'en_curso')) then
+        raise exception 'Hay trabajos de liquidación activos: termínalos antes de migrar';
+    end if;
+end;
+$$;
+
+create table if not exists movimientos_puntos (
+    id                  bigint generated by default as identity primary key,
+    usuario_id          bigint      not null references usuarios (id) on delete cascade,
+    temporada           varchar(10) not null,
+    tipo                varchar(12) not null,
+    apuesta_id          bigint,
+    jornada_id          bigint,
+    puntos              integer     not null default 0,
+    comprometidos       integer     not null default 0,
+    aciertos            integer     not null default 0,
+    fallos              integer     not null default 0,
+    partidos_apostados  integer     not null default 0,
+    clave               text        not null unique,
+    origen              text,
+    creado_en           timestamptz not null default now()
+);
+
+create index if not exists ix_movimientos_temporada_usuario
+    on movimientos_puntos (temporada, usuario_id);
+create index if not exists ix_movimientos_jornada
+    on movimientos_puntos (jornada_id) where puntos <> 0;
+
+alter table puntajes add column if not exists comprometidos        integer not null default 0;
+alter table puntajes add column if not exists ultimo_movimiento_id bigint;
+
+-- Los trabajos de liquidación ya no acumulan deltas: los suma el libro
+alter table trabajos_liquidacion drop column if exists deltas;
+alter table trabajos_liquidacion alter column fase type varchar(16);   -- apuestas | clasificacion
+
+
+create or replace function registrar_movimientos(
+    p_movimientos       jsonb,
+    p_puntos_iniciales  integer default 100
+)
+returns setof movimientos_puntos
+language sql
+as $$
+    with nuevos as (
+        insert into movimientos_puntos
+               (usuario_id, temporada, tipo, apuesta_id, jornada_id, puntos, comprometidos,
+                aciertos, fallos, partidos_apostados, clave, origen)
+        select m.usuario_id, m.temporada, m.tipo, m.apuesta_id, m.jornada_id,
+               coalesce(m.puntos, 0), coalesce(m.comprometidos, 0), coalesce(m.aciertos, 0),
+               coalesce(m.fallos, 0), coalesce(m.partidos_apostados, 0), m.clave, m.origen
+          from jsonb_to_recordset(p_movimientos) as m(
+                   usuario_id bigint, temporada text, tipo text, apuesta_id bigint,
+                   jornada_id bigint, puntos integer, comprometidos integer, aciertos integer,
+                   fallos integer, partidos_apostados integer, clave text, origen text)
+        on conflict (clave) do nothing
+        returning *
+    ),
+    proyeccion as (
+        insert into puntajes as pu
+               (usuario_id, temporada, puntos_totales, comprometidos, aciertos, fallos,
+                partidos_apostados, ultimo_movimiento_id)
+        select n.usuario_id, n.temporada, p_puntos_iniciales + sum(n.puntos), sum(n.comprometidos),
+               sum(n.aciertos), sum(n.fallos), sum(n.partidos_apostados), max(n.id)
+          from nuevos n
+         group by n.usuario_id, n.temporada
+        on conflict (usuario_id, temporada) do update
+           set puntos_totales       = pu.puntos_totales + excluded.puntos_totales - p_puntos_iniciales,
+               comprometidos        = pu.comprometidos + excluded.comprometidos,
+               aciertos             = pu.aciertos + excluded.aciertos,
+               fallos               = pu.fallos + excluded.fallos,
+               partidos_apostados   = pu.partidos_apostados + excluded.partidos_apostados,
+               ultimo_movimiento_id = greatest(pu.ultimo_movimiento_id, excluded.ultimo_movimiento_id)
+    )
+    select * from nuevos;
+$$;
+
+
+create or replace function reconstruir_puntajes(
+    p_temporada         text,
+    p_puntos_iniciales  integer default 100
+)
+returns table (usuarios integer, movimientos integer, corregidos integer)
+language sql
+as $$
+    with sumas as (
+        select u.usuario_id,
+               p_puntos_iniciales + coalesce(sum(m.puntos), 0)::integer as puntos_totales,
+               coalesce(sum(m.comprometidos), 0)::integer               as comprometidos,
+               coalesce(sum(m.aciertos), 0)::integer                    as aciertos,
+               coalesce(sum(m.fallos), 0)::integer                      as fallos,
+               coalesce(sum(m.partidos_apostados), 0)::integer          as partidos_apostados,
+               max(m.id)                                                as ultimo_movimiento_id,
+               count(m.id)::integer                                     as movimientos
+          from (select usuario_id from puntajes where temporada = p_temporada
+                union
+                select usuario_id from movimientos_puntos where temporada = p_temporada) u
+          left join movimientos_puntos m on m.usuario_id = u.usuario_id
+                                        and m.temporada  = p_temporada
+         group by u.usuario_id
+    ),
+    escritas as (
+        insert into puntajes as pu
+               (usuario_id, temporada, puntos_totales, comprometidos, aciertos, fallos,
+                partidos_apostados, ultimo_movimiento_id)
+        select s.usuario_id, p_temporada, s.puntos_totales, s.comprometidos, s.aciertos,
+               s.fallos, s.partidos_apostados, s.ultimo_movimiento_id
+          from sumas s
+        on conflict (usuario_id, temporada) do update
+           set puntos_totales       = excluded.puntos_totales,
+               comprometidos        = excluded.comprometidos,
+               aciertos             = excluded.aciertos,
+               fallos               = excluded.fallos,
+               partidos_apostados   = excluded.partidos_apostados,
+               ultimo_movimiento_id = excluded.ultimo_movimiento_id
+         where (pu.puntos_totales, pu.comprometidos, pu.aciertos, pu.fallos, pu.partidos_apostados)
+               is distinct from
+               (excluded.puntos_totales, excluded.comprometidos, excluded.aciertos,
+                excluded.fallos, excluded.partidos_apostados)
+        returning 1
+    )
+    select (select count(*) from sumas)::integer,
+           (select coalesce(sum(s.movimientos), 0) from sumas s)::integer,
+           (select count(*) from escritas)::integer;
+$$;
+
+
+-- El saldo es una sola fila de la proyección
+create or replace function saldo_usuario(
+    p_usuario_id        bigint,
+    p_temporada         text,
+    p_puntos_iniciales  integer default 100
+)
+returns table (puntos_totales integer, comprometidos integer, disponible integer)
+language sql
+stable
+as $$
+    select coalesce(pu.puntos_totales, p_puntos_iniciales),
+           coalesce(pu.comprometidos, 0),
+           coalesce(pu.puntos_totales - pu.comprometidos, p_puntos_iniciales)
+      from (select 1) uno
+      left join puntajes pu on pu.usuario_id = p_usuario_id
+                           and pu.temporada  = p_temporada;
+$$;
+
+
+-- Colocar apuestas escribe su movimiento (y el reembolso de la que reemplaza)
+create or replace function colocar_apuesta(
+    p_usuario_id        bigint,
+    p_partido_id        bigint,
+    p_tipo              text,
+    p_prediccion        text,
+    p_puntos            integer,
+    p_temporada         text,
+    p_clave             text,
+    p_puntos_iniciales  integer default 100
+)
+returns setof apuestas
+language plpgsql
+as $$
+declare
+    v_apuesta_id  bigint;
+    v_jornada_id  bigint;
+    v_actual      integer;
+    v_disponible  integer;
+begin
+    perform pg_advisory_xact_lock(p_usuario_id);
+
+    select s.apuesta_id into v_apuesta_id
+      from solicitudes_apuesta s
+     where s.clave = p_clave;
+    if found then
+        return query select * from apuestas where id = v_apuesta_id;
+        return;
+    end if;
+
+    -- La apuesta que se reemplaza libera sus puntos comprometidos
+    select a.puntos_apostados into v_actual
+      from apuestas a
+     where a.usuario_id   = p_usuario_id
+       and a.partido_id   = p_partido_id
+       and a.tipo_apuesta = p_tipo
+       and a.puntos_obtenidos is null;
+
+    select s.disponible + coalesce(v_actual, 0) into v_disponible
+      from saldo_usuario(p_usuario_id, p_temporada, p_puntos_iniciales) s;
+
+    if p_puntos > v_disponible then
+        raise exception 'Saldo insuficiente. Disponible: % pts', v_disponible
+              using errcode = 'P0001';
+    end if;
+
+    insert into apuestas as a
+           (usuario_id, partido_id, tipo_apuesta, prediccion,
+            puntos_apostados, puntos_obtenidos, fecha_apuesta)
+    values (p_usuario_id, p_partido_id, p_tipo, p_prediccion,
+            p_puntos, null, now())
+    on conflict (usuario_id, partido_id, tipo_apuesta) do update
+       set prediccion       = excluded.prediccion,
+           puntos_apostados = excluded.puntos_apostados,
+           fecha_apuesta    = excluded.fecha_apuesta
+     where a.puntos_obtenidos is null
+    returning a.id into v_apuesta_id;
+
+    if v_apuesta_id is null then
+        raise exception 'La apuesta ya está liquidada y no se puede modificar'
+              using errcode = 'P0001';
+    end if;
+
+    insert into solicitudes_apuesta (clave, apuesta_id) values (p_clave, v_apuesta_id);
+
+    select pa.jornada_id into v_jornada_id from partidos pa where pa.id = p_partido_id;
+    perform registrar_movimientos(
+        case when v_actual is null then '[]'::jsonb
+             else jsonb_build_array(jsonb_build_object(
+                 'usuario_id', p_usuario_id, 'temporada', p_temporada, 'tipo', 'reembolso',
+                 'apuesta_id', v_apuesta_id, 'jornada_id', v_jornada_id, 'comprometidos', -v_actual,
+                 'clave', p_clave || ':reembolso', 'origen', 'colocar_apuesta'))
+        end
+        || jsonb_build_array(jsonb_build_object(
+            'usuario_id', p_usuario_id, 'temporada', p_temporada, 'tipo', 'apuesta',
+            'apuesta_id', v_apuesta_id, 'jornada_id', v_jornada_id, 'comprometidos', p_puntos,
+            'clave', p_clave || ':apuesta', 'origen', 'colocar_apuesta')),
+        p_puntos_iniciales);
+
+    return query select * from apuestas where id = v_apuesta_id;
+end;
+$$;
+
+
+create or replace function colocar_apuestas(
+    p_usuario_id        bigint,
+    p_temporada         text,
+    p_apuestas          jsonb,
+    p_clave             text,
+    p_puntos_iniciales  integer default 100
+)
+returns setof apuestas
+language plpgsql
+as $$
+declare
+    v_claves      text[];
+    v_liberados   integer;
+    v_coste       integer;
+    v_disponible  integer;
+    v_filas       integer;
+    v_previas     jsonb;
+begin
+    perform pg_advisory_xact_lock(p_usuario_id);
+
+    select array_agg(p_clave || ':' || b.partido_id || ':' || b.tipo_apuesta),
+           coalesce(sum(b.puntos_apostados), 0)::integer
+      into v_claves, v_coste
+      from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text,
+                                                puntos_apostados integer);
+
+    if exists (select 1 from solicitudes_apuesta s where s.clave = any(v_claves)) then
+        return query select a.* from apuestas a
+                       join solicitudes_apuesta s on s.apuesta_id = a.id
+                      where s.clave = any(v_claves);
+        return;
+    end if;
+
+    -- Las apuestas que se reemplazan liberan sus puntos comprometidos
+    select coalesce(sum(a.puntos_apostados), 0)::integer,
+           coalesce(jsonb_agg(jsonb_build_object(
+               'usuario_id', p_usuario_id, 'temporada', p_temporada, 'tipo', 'reembolso',
+               'apuesta_id', a.id, 'comprometidos', -a.puntos_apostados,
+               'clave', p_clave || ':' || a.partido_id || ':' || a.tipo_apuesta || ':reembolso',
+               'origen', 'colocar_apuestas')), '[]'::jsonb)
+      into v_liberados, v_previas
+      from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text)
+      join apuestas a on a.usuario_id   = p_usuario_id
+                     and a.partido_id   = b.partido_id
+                     and a.tipo_apuesta = b.tipo_apuesta
+     where a.puntos_obtenidos is null;
+
+    select s.disponible + v_liberados into v_disponible
+      from saldo_usuario(p_usuario_id, p_temporada, p_puntos_iniciales) s;
+
+    if v_coste > v_disponible then
+        raise exception 'Saldo insuficiente. Disponible: % pts, boleto: % pts', v_disponible, v_coste
+              using errcode = 'P0001';
+    end if;
+
+    with escritas as (
+        insert into apuestas as a
+               (usuario_id, partido_id, tipo_apuesta, prediccion,
+                puntos_apostados, puntos_obtenidos, fecha_apuesta)
+        select p_usuario_id, b.partido_id, b.tipo_apuesta, b.prediccion,
+               b.puntos_apostados, null, now()
+          from jsonb_to_recordset(p_apuestas) as b(partido_id bigint, tipo_apuesta text,
+                                                    prediccion text, puntos_apostados integer)
+        on conflict (usuario_id, partido_id, tipo_apuesta) do update
+           set prediccion       = excluded.prediccion,
+               puntos_apostados = excluded.puntos_apostados,
+               fecha_apuesta    = excluded.fecha_apuesta
+         where a.puntos_obtenidos is null
+        returning a.id, a.partido_id, a.tipo_apuesta
+    )
+    insert into solicitudes_apuesta (clave, apuesta_id)
+    select p_clave || ':' || e.partido_id || ':' || e.tipo_apuesta, e.id
+      from escritas e;
+    get diagnostics v_filas = row_count;
+
+    if v_filas < jsonb_array_length(p_apuestas) then
+        raise exception 'El boleto incluye apuestas ya liquidadas que no se pueden modificar'
+              using errcode = 'P0001';
+    end if;
+
+    perform registrar_movimientos(v_previas || (
+        select jsonb_agg(jsonb_build_object(
+                   'usuario_id', p_usuario_id, 'temporada', p_temporada, 'tipo', 'apuesta',
+                   'apuesta_id', a.id, 'jornada_id', pa.jornada_id,
+                   'comprometidos', a.puntos_apostados,
+                   'clave', s.clave || ':apuesta', 'origen', 'colocar_apuestas'))
+          from solicitudes_apuesta s
+          join apuestas a  on a.id  = s.apuesta_id
+          join partidos pa on pa.id = a.partido_id
+         where s.clave = any(v_claves)),
+        p_puntos_iniciales);
+
+    return query select a.* from apuestas a
+                   join solicitudes_apuesta s on s.apuesta_id = a.id
+                  where s.clave = any(v_claves);
+end;
+$$;
+
+
+-- Libro inicial a partir de las apuestas existentes. Un ajuste de apertura por
+-- usuario cuadra el libro con los puntajes guardados (las apuestas anuladas no
+-- se distinguen de las perdidas en ``puntos_obtenidos``).
+insert into movimientos_puntos
+       (usuario_id, temporada, tipo, apuesta_id, jornada_id, comprometidos, clave, origen)
+select a.usuario_id, j.temporada, 'apuesta', a.id, pa.jornada_id, a.puntos_apostados,
+       'migracion:' || a.id || ':apuesta', 'migracion'
+  from apuestas a
+  join partidos pa on pa.id = a.partido_id
+  join jornadas j  on j.id  = pa.jornada_id
+on conflict (clave) do nothing;
+
+insert into movimientos_puntos
+       (usuario_id, temporada, tipo, apuesta_id, jornada_id, puntos, comprometidos,
+        aciertos, fallos, partidos_apostados, clave, origen)
+select a.usuario_id, j.temporada, 'liquidacion', a.id, pa.jornada_id,
+       case when a.puntos_obtenidos > 0 then a.puntos_obtenidos - a.puntos_apostados
+            else -a.puntos_apostados end,
+       -a.puntos_apostados,
+       (a.puntos_obtenidos > 0)::integer, (a.puntos_obtenidos <= 0)::integer, 1,
+       'migracion:' || a.id || ':liquidacion', 'migracion'
+  from apuestas a
+  join partidos pa on pa.id = a.partido_id
+  join jornadas j  on j.id  = pa.jornada_id
+ where a.puntos_obtenidos is not null
+on conflict (clave) do nothing;
+
+insert into movimientos_puntos
+       (usuario_id, temporada, tipo, puntos, aciertos, fallos, partidos_apostados, clave, origen)
+select pu.usuario_id, pu.temporada, 'ajuste',
+       pu.puntos_totales - c.iniciales - coalesce(l.puntos, 0),
+       pu.aciertos - coalesce(l.aciertos, 0),
+       pu.fallos - coalesce(l.fallos, 0),
+       pu.partidos_apostados - coalesce(l.partidos_apostados, 0),
+       'migracion:' || pu.usuario_id || ':' || pu.temporada || ':apertura', 'migracion'
+  from puntajes pu
+ cross join (select current_setting('la_polla.puntos_iniciales')::integer as iniciales) c
+  left join (select usuario_id, temporada, sum(puntos) as puntos, sum(aciertos) as aciertos,
+                    sum(fallos) as fallos, sum(partidos_apostados) as partidos_apostados
+               from movimientos_puntos
+              group by usuario_id, temporada) l
+         on l.usuario_id = pu.usuario_id and l.temporada = pu.temporada
+ where (pu.puntos_totales - c.iniciales, pu.aciertos, pu.fallos, pu.partidos_apostados)
+       is distinct from
+       (coalesce(l.puntos, 0), coalesce(l.aciertos, 0), coalesce(l.fallos, 0),
+        coalesce(l.partidos_apostados, 0))
+on conflict (clave) do nothing;
+
+select reconstruir_puntajes(t.temporada, c.iniciales)
+  from (select distinct temporada from movimientos_puntos) t
+ cross join (select current_setting('la_polla.puntos_iniciales')::integer as iniciales) c;
@@ -0,0 +1,123 @@
+"""
+Trabajador de liquidación
+=========================
+Ejecuta los trabajos de ``trabajos_liquidacion`` que encola la página de
+Administración (``GestorLiga.encolar_liquidacion``). Cada hilo reclama un
+trabajo (``reclamar_liquidacion``), lo ejecuta por bloques con checkpoint
+(``ejecutar_liquidacion``) y vuelve a sondear la cola.
+
+Por defecto la app arranca un trabajador en segundo plano
+(``LIQUIDACION["en_app"]``); con ``en_app = False`` se lanza aparte:
+
+    python trabajador_liquidacion.py --hilos 2
+    python trabajador_liquidacion.py --una-vez     # vacía la cola y termina
+
+Un trabajo cuyo trabajador muere (sin latido durante ``caducidad_seg``) lo
+retoma otro desde su último checkpoint.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class TrabajadorLiquidacion:
+    """Hilos que reclaman y ejecutan trabajos de liquidación de un ``GestorLiga``."""
+
+    def __init__(self, gestor, hilos: int = 1, espera_seg: float = 2, caducidad_seg: int = 60,
+                 tam_bloque: int = 1000, max_intentos: int = 5, nombre: Optional[str] = None):
+        self.gestor        = gestor
+        self.hilos         = hilos
+        self.espera_seg    = espera_seg
+        self.caducidad_seg = caducidad_seg
+        self.tam_bloque    = tam_bloque
+        self.max_intentos  = max_intentos
+        self.nombre        = nombre or f"{socket.gethostname()}:{os.getpid()}"
+        self._parar        = threading.Event()
+        self._hilos: List[threading.Thread] = []
+
+    def ejecutar_uno(self, trabajador: Optional[str] = None) -> Optional[Dict]:
+        """Reclama y ejecuta un trabajo; devuelve el trabajo con su resumen, o ``None`` si la cola está vacía."""
+        trabajador = trabajador or self.nombre
+        trabajo = self.gestor.reclamar_liquidacion(trabajador, self.caducidad_seg)
+        if trabajo is None:
+            return None
+        try:
+            trabajo["resumen"] = self.gestor.ejecutar_liquidacion(trabajo, trabajador, self.tam_bloque)
+            trabajo["estado"]  = "completado"
+        except Exception as e:
+            log.exception("Fallo en el trabajo de liquidación %s", trabajo["id"])
+            trabajo["estado"] = self.gestor.liberar_liquidacion(trabajo, trabajador, str(e),
+                                                                self.max_intentos)
+            trabajo["error"]  = str(e)
+        return trabajo
+
+    def ejecutar_pendientes(self) -> List[Dict]:
+        """Ejecuta trabajos hasta vaciar la cola."""
+        hechos = []
+        while (trabajo := self.ejecutar_uno()) is not None:
+            hechos.append(trabajo)
+        return hechos
+
+    def _bucle(self, trabajador: str):
+        while not self._parar.is_set():
+            try:
+                trabajo = self.ejecutar_uno(trabajador)
+            except Exception:
+                log.exception("Error al reclamar trabajos de liquidación")
+                trabajo = None
+            if trabajo is None:
+                self._parar.wait(self.espera_seg)
+
+    def iniciar(self) -> "TrabajadorLiquidacion":
+        """Arranca ``hilos`` hilos demonio que sondean la cola hasta ``detener``."""
+        self._parar.clear()
+        for i in range(self.hilos):
+            hilo = threading.Thread(target=self._bucle, args=(f"{self.nombre}/{i}",),
+                                    name=f"liquidacion-{i}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        return self
+
+    @property
+    def activo(self) -> bool:
+        return any(h.is_alive() for h in self._hilos)
+
+    def detener(self, timeout: Optional[float] = None):
+        self._parar.set()
+        for hilo in self._hilos:
+            hilo.join(timeout)
+        self._hilos.clear()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--hilos", type=int, default=None)
+    ap.add_argument("--una-vez", action="store_true", help="ejecutar lo que haya en cola y terminar")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s")
+
+    from app import GestorLiga, LIQUIDACION
+    trabajador = TrabajadorLiquidacion(
+        GestorLiga(), hilos=args.hilos or LIQUIDACION["hilos"],
+        espera_seg=LIQUIDACION["espera_seg"], caducidad_seg=LIQUIDACION["caducidad_seg"],
+        tam_bloque=LIQUIDACION["tam_bloque"], max_intentos=LIQUIDACION["max_intentos"])
+    if args.una_vez:
+        print(json.dumps(trabajador.ejecutar_pendientes(), indent=2, ensure_ascii=False, default=str))
+        return
+    trabajador.iniciar()
+    try:
+        while trabajador.activo:
+            threading.Event().wait(1)
+    except KeyboardInterrupt:
+        trabajador.detener()
+
+
+if __name__ == "__main__":
+    main()